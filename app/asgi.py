@@ -13,4 +13,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup: it needs the app registry.
+from realtime.asgi import EventStreamApp  # noqa: E402
+
+# /api/realtime/events/ is served as a long-lived event stream outside Django's
+# request cycle; everything else goes to Django.
+application = EventStreamApp(django_application)
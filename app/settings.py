@@ -50,10 +50,16 @@ INSTALLED_APPS = [
     "django_filters",
     "core",
     "scheduler",
-    "planetary_hours"
+    "planetary_hours",
+    "jobs",
+    "realtime",
+    "reminders",
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestIdMiddleware",
+    "core.middleware.ServerTimingMiddleware",
+    "core.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -63,6 +69,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.SlowQueryMiddleware",
 ]
 
 if DEBUG:
@@ -102,6 +109,13 @@ TEMPLATES = [
 WSGI_APPLICATION = "app.wsgi.application"
 
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -152,17 +166,34 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "core.User"
 
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+    "DEFAULT_AUTHENTICATION_CLASSES": ("core.authentication.JWTAuthentication",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
+    "DEFAULT_THROTTLE_CLASSES": ("core.throttling.TokenBucketThrottle",),
+    # Reverse proxies in front of the app. Throttles identify anonymous
+    # clients by the address the outermost one saw; with none configured,
+    # X-Forwarded-For is client-supplied and only REMOTE_ADDR is used. Set
+    # NUM_PROXIES=1 behind a single router such as the hosting platform's.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
 }
 
 SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "ACCESS_TOKEN_LIFETIME": timedelta(days=7),
     "REFRESH_TOEKN_LIFETIME": timedelta(days=14),
+    "TOKEN_OBTAIN_SERIALIZER": "core.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "core.serializers.TokenRefreshSerializer",
 }
 
+# Seconds between incremental reloads of revoked tokens (see core.revocation).
+TOKEN_REVOCATION_REFRESH_INTERVAL = 5
+
+# Per-process cache of authenticated users (see core.authentication).
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = 60
+
 DJOSER = {
     "SERIALIZERS": {
         "user_create": "core.serializers.UserCreateSerializer",
@@ -171,27 +202,143 @@ DJOSER = {
 }
 
 
+# Serve task tags from the denormalized Task.tag_snapshot column instead of
+# joining TaggedItem/Tag on every read (see scheduler.tag_snapshot).
+TASK_TAG_SNAPSHOT = True
+
+# Seconds to cache a user's category/tag ids across requests for write
+# validation (see scheduler.ownership). 0 disables; needs a shared cache.
+OWNERSHIP_CACHE_TIMEOUT = 0
+
+# Completed tasks scheduled more than this many days ago are moved to the
+# archive tables by `manage.py archive_tasks` (see scheduler.archive).
+TASK_ARCHIVE_HORIZON_DAYS = 90
+
+
+# background jobs (see jobs.worker; run with `manage.py run_jobs`)
+# Seconds a worker may go without a heartbeat on a job before it is presumed
+# dead and the job is released, how often a running job's heartbeat is sent,
+# the cap on the exponential retry backoff, and the idle poll delay.
+JOB_LOCK_TIMEOUT = 600
+JOB_HEARTBEAT_INTERVAL = 60
+JOB_MAX_BACKOFF = 3600
+JOB_POLL_INTERVAL = 1.0
+
+
+# realtime change streams (see realtime.asgi; served under ASGI only)
+# InProcessBroker only reaches streams in the process that made the change;
+# use realtime.broker.PostgresNotifyBroker with several workers or when
+# changes come from job workers.
+REALTIME_BROKER = "realtime.broker.InProcessBroker"
+REALTIME_PG_CHANNEL = "realtime"
+REALTIME_QUEUE_SIZE = 100
+REALTIME_HEARTBEAT = 15
+REALTIME_IDLE_TIMEOUT = 600
+REALTIME_RETRY_MS = 3000
+REALTIME_MAX_STREAMS_PER_USER = 5
+
+
+# task reminders (see reminders.scheduling; run with `manage.py run_reminders`)
+# The worker reloads reminders due within REMINDER_WINDOW seconds every
+# REMINDER_REFRESH_INTERVAL seconds; REMINDER_SINK delivers them.
+REMINDER_SINK = "reminders.delivery.LogSink"
+REMINDER_WINDOW = 300
+REMINDER_REFRESH_INTERVAL = 30
+REMINDER_BATCH_SIZE = 1000
+
+
+# planetary hours
+# Per-process LRU of computed hour tables, keyed on coordinates rounded to
+# PLANETARY_COORD_PRECISION decimals, date and time zone.
+PLANETARY_CACHE_SIZE = 4096
+PLANETARY_COORD_PRECISION = 2
+# Sunrise/sunset implementation: "noaa" (planetary_hours.modules.solar) or
+# "astral".
+PLANETARY_SOLAR_ENGINE = "noaa"
+# Coordinates-to-time-zone index written by `manage.py build_tz_index`. Until
+# it exists every location uses Asia/Tehran.
+PLANETARY_TZ_INDEX = BASE_DIR / "data" / "timezones.idx"
+# Precomputed sunrise/sunset for the cities in PLANETARY_GAZETTEER, written by
+# `manage.py build_sun_tables`. A request naming one of them, within
+# PLANETARY_CITY_TOLERANCE degrees and in its zone, is read from the table.
+PLANETARY_SUN_TABLE = BASE_DIR / "data" / "sun_tables.bin"
+PLANETARY_GAZETTEER = BASE_DIR / "planetary_hours" / "data" / "cities.json"
+PLANETARY_CITY_TOLERANCE = 0.1
+# Longest range, in days, served by /api/planetary/hours/range/.
+PLANETARY_RANGE_MAX_DAYS = 366
+# Most hours after the current one served by /api/planetary/hours/now/.
+PLANETARY_UPCOMING_MAX_HOURS = 168
+# Batches with at least PLANETARY_BATCH_PARALLEL_THRESHOLD uncached locations
+# are computed on a pool of PLANETARY_BATCH_WORKERS processes (None: one per
+# core, 1: no pool).
+PLANETARY_BATCH_MAX_SIZE = 1000
+PLANETARY_BATCH_PARALLEL_THRESHOLD = 64
+PLANETARY_BATCH_WORKERS = None
+
+
+# rate limiting
+# Token buckets per client and endpoint (approximated by sliding windows, see
+# core.throttling): `capacity` is the burst size and `refill_rate` the
+# sustained requests per second. Point RATE_LIMIT_CACHE at a
+# shared cache (e.g. Redis) to enforce the limits across processes.
+RATE_LIMITS = {
+    "anon": {"capacity": 30, "refill_rate": 0.5},
+    "user": {"capacity": 120, "refill_rate": 2},
+    "planetary": {"capacity": 20, "refill_rate": 0.2},
+    "planetary_batch": {"capacity": 5, "refill_rate": 0.05},
+}
+RATE_LIMIT_STORE = "core.throttling.CacheBucketStore"
+RATE_LIMIT_CACHE = "default"
+
+
+# request profiling
+# SERVER_TIMING adds a Server-Timing header to every response; staff users can
+# profile a single request with ?profile=1.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "") == "1"
+PROFILE_DIR = BASE_DIR / "profiles"
+PROFILE_KEEP = 50
+PROFILE_INTERVAL_MS = 1
+
+
+# slow query log
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_EXPLAIN = True
+SLOW_QUERY_LOG_SIZE = 100
+
+
+# logging
+# Request threads only enqueue records; a background listener writes JSON lines
+# to a rotating file. LOG_SAMPLE_RATE keeps a fraction of DEBUG/INFO records.
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", 1.0))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "handlers": {
-        "console": {"class": "logging.StreamHandler"},
-        "file": {
-            "class": "logging.FileHandler",
+        "background": {
+            "class": "core.log.BackgroundLogHandler",
             "filename": "general.log",
-            "formatter": "verbose",
+            "max_bytes": 10 * 1024 * 1024,
+            "backup_count": 5,
+            "sample_rate": LOG_SAMPLE_RATE,
+        },
+        "slow_queries": {
+            "class": "core.log.BackgroundLogHandler",
+            "filename": "slow_queries.log",
+            "max_bytes": 5 * 1024 * 1024,
+            "backup_count": 3,
+            "console": False,
         },
     },
     "loggers": {
         "": {
-            "handlers": ["console", "file"],
+            "handlers": ["background"],
             "level": os.environ.get("DJANGO_LOG_LEVEL", "INFO"),
-        }
-    },
-    "formatters": {
-        "verbose": {
-            "format": "{asctime} ({levelname}) - {name} - {message}",
-            "style": "{",
-        }
+        },
+        "core.slow_queries": {
+            "handlers": ["slow_queries"],
+            "level": "WARNING",
+            "propagate": False,
+        },
     },
 }
@@ -26,7 +26,9 @@ urlpatterns = [
     path("api/auth/", include("djoser.urls")),
     path("api/auth/", include("djoser.urls.jwt")),
     path("api/schedule/", include("scheduler.urls")),
-    path("api/planetary/", include("planetary_hours.urls"))
+    path("api/schedule/", include("reminders.urls")),
+    path("api/planetary/", include("planetary_hours.urls")),
+    path("api/jobs/", include("jobs.urls")),
 ]
 
 
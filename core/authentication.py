@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication as BaseJWTAuthentication,
+)
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .cache import TTLCache
+from .models import ClaimsUser
+from .revocation import revocation_filter
+from .timing import timed
+
+User = get_user_model()
+
+# Claims copied into every token so a user can be rebuilt without a query.
+USER_CLAIMS = ("username", "is_active", "is_staff", "is_superuser")
+
+# Per-process cache of concrete field values, keyed by user id. Entries are
+# dropped when the user is saved or deleted in this process; the TTL bounds how
+# long other processes can serve a stale copy.
+user_cache = TTLCache(
+    maxsize=getattr(settings, "AUTH_USER_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "AUTH_USER_CACHE_TTL", 60),
+)
+
+
+def get_cached_user(user_id):
+    """Return a fresh `User` instance for `user_id`, hitting the DB on a miss."""
+    field_names = [field.attname for field in User._meta.concrete_fields]
+
+    values = user_cache.get(user_id)
+    if values is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        values = tuple(getattr(user, name) for name in field_names)
+        user_cache.set(user_id, values)
+        return user
+
+    # Build a new instance per request so callers never share mutable state.
+    return User.from_db(router.db_for_read(User), field_names, values)
+
+
+class JWTAuthentication(BaseJWTAuthentication):
+    """JWT authentication that resolves the full user through `user_cache`."""
+
+    def authenticate(self, request):
+        with timed("auth"):
+            header = self.get_header(request)
+            raw_token = None if header is None else self.get_raw_token(header)
+            if raw_token is None:
+                return None
+            validated_token = self.validated_token_for(request, raw_token)
+            return self.get_user(validated_token), validated_token
+
+    def validated_token_for(self, request, raw_token):
+        """
+        `get_validated_token(raw_token)`, remembered on the underlying
+        HttpRequest so a request authenticated before the view runs (see
+        ProfilingMiddleware) is not validated twice.
+        """
+        http_request = getattr(request, "_request", request)
+        cached = getattr(http_request, "_validated_token", None)
+        if cached is not None and cached[0] == raw_token:
+            return cached[1]
+        validated_token = self.get_validated_token(raw_token)
+        http_request._validated_token = (raw_token, validated_token)
+        return validated_token
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_filter.is_revoked(validated_token):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            # simplejwt stores the id as a string; normalize it for cache keys.
+            return User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError) as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+    def get_user(self, validated_token):
+        user = get_cached_user(self.get_user_id(validated_token))
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds a `ClaimsUser` from the token alone.
+
+    Meant for endpoints that only need the user's id and flags. Tokens issued
+    before the extra claims existed fall back to the cached lookup.
+    """
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not validated_token["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        user = ClaimsUser(
+            pk=self.get_user_id(validated_token),
+            **{claim: validated_token[claim] for claim in USER_CLAIMS},
+        )
+        user._state.adding = False
+        user._state.db = router.db_for_read(ClaimsUser)
+        return user
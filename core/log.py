@@ -0,0 +1,157 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+
+def new_request_id():
+    return uuid.uuid4().hex
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request's correlation id to every record."""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of records below `level`.
+
+    `rate` is the probability of keeping a record, e.g. 0.1 keeps one INFO line
+    in ten. Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rate=1.0, level="WARNING"):
+        super().__init__()
+        self.rate = float(rate)
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+        if not isinstance(self.level, int):
+            raise ValueError(f"Unknown level: {level!r}")
+
+    def filter(self, record):
+        if record.levelno >= self.level or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        if hasattr(record, "data"):
+            payload["data"] = record.data
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class BackgroundLogHandler(QueueHandler):
+    """
+    Enqueue records and write them from a background listener thread.
+
+    Calling threads only pay for a `put_nowait()` on a bounded queue; the
+    listener writes JSON lines to a rotating file and, optionally, plain text to
+    stderr. When the queue is full the record is dropped and counted in
+    `dropped` instead of blocking the request.
+    """
+
+    def __init__(
+        self,
+        filename,
+        max_bytes=10 * 1024 * 1024,
+        backup_count=5,
+        console=True,
+        queue_size=10000,
+        sample_rate=1.0,
+    ):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.queue_size = queue_size
+        self.dropped = 0
+
+        self.addFilter(RequestIdFilter())
+        self.addFilter(SamplingFilter(sample_rate))
+
+        targets = []
+        file_handler = RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, delay=True
+        )
+        file_handler.setFormatter(JsonFormatter())
+        targets.append(file_handler)
+
+        if console:
+            console_handler = logging.StreamHandler(sys.stderr)
+            console_handler.setFormatter(
+                logging.Formatter(
+                    "{asctime} ({levelname}) [{request_id}] - {name} - {message}",
+                    style="{",
+                )
+            )
+            targets.append(console_handler)
+
+        self.targets = targets
+        self._start_listener()
+        atexit.register(self.stop)
+        # Listener threads do not survive fork(); give each worker its own.
+        os.register_at_fork(after_in_child=self._restart_after_fork)
+
+    def _start_listener(self):
+        self.listener = QueueListener(
+            self.queue, *self.targets, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def _restart_after_fork(self):
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self._start_listener()
+
+    def prepare(self, record):
+        # QueueHandler.prepare() folds the traceback into the message; keep it
+        # apart, formatted here while exc_info is still alive, so the JSON
+        # line records it as its own field.
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        if self.listener._thread is None:
+            return
+        try:
+            self.listener.stop()
+        except queue.Full:
+            # No room for the sentinel; the daemon thread dies with the process.
+            pass
+
+    def close(self):
+        self.stop()
+        super().close()
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.revocation import prune_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete revoked-token rows whose tokens have already expired."
+
+    def handle(self, *args, **options):
+        deleted = prune_revoked_tokens()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired rows."))
@@ -0,0 +1,122 @@
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from .authentication import JWTAuthentication
+from .log import new_request_id, request_id_var
+from .profiling import SamplingProfiler, save_profile
+from .slow_queries import install_recorder
+from .timing import RequestTimer, current_timer
+
+
+class RequestIdMiddleware:
+    """
+    Bind a correlation id to the request for log records.
+
+    An incoming `X-Request-ID` header is reused so ids can be followed across
+    proxies; otherwise a new one is generated. The id is echoed back in the
+    response.
+    """
+
+    header = "X-Request-ID"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get(self.header, "")[:64] or new_request_id()
+        request.request_id = request_id
+
+        # Left bound after the response so the handler's own "Not Found" /
+        # "Server Error" records, logged outside the middleware, still carry it.
+        request_id_var.set(request_id)
+        response = self.get_response(request)
+
+        response[self.header] = request_id
+        return response
+
+
+class SlowQueryMiddleware:
+    """Capture SQL statements slower than `SLOW_QUERY_THRESHOLD_MS`."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold_ms = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None)
+        self.capture_explain = getattr(settings, "SLOW_QUERY_EXPLAIN", True)
+
+        if self.threshold_ms is None:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        with ExitStack() as stack:
+            install_recorder(stack, request, self.threshold_ms, self.capture_explain)
+            return self.get_response(request)
+
+
+class ServerTimingMiddleware:
+    """
+    Add a `Server-Timing` header with auth, db, serialize, render, app and
+    total time.
+
+    Enabled with the `SERVER_TIMING` setting. "app" is whatever is left of the
+    total: view code and middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if not getattr(settings, "SERVER_TIMING", False):
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        timer = RequestTimer()
+        token = current_timer.set(timer)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(timer.db_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+
+        response["Server-Timing"] = timer.header_value()
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile a single request when a staff user passes `?profile=1`.
+
+    The collapsed-stack report is stored on disk and its id returned in the
+    `X-Profile-Id` header; download it from `/api/debug/profiles/<id>/`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.interval = getattr(settings, "PROFILE_INTERVAL_MS", 1) / 1000
+
+    def __call__(self, request):
+        if request.GET.get("profile") != "1" or not self.is_staff(request):
+            return self.get_response(request)
+
+        with SamplingProfiler(interval=self.interval) as profiler:
+            response = self.get_response(request)
+
+        response["X-Profile-Id"] = save_profile(profiler.collapsed())
+        return response
+
+    def is_staff(self, request):
+        """
+        Authenticate the bearer token up front, since DRF only resolves the
+        user once the view runs. The validated token is kept on the request,
+        so the view does not validate it again.
+        """
+        try:
+            result = JWTAuthentication().authenticate(Request(request))
+        except APIException:
+            return False
+        return result is not None and result[0].is_staff
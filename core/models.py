@@ -1,6 +1,61 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
+# Flags copied into every token (see core.authentication.USER_CLAIMS).
+TOKEN_FLAGS = ("is_active", "is_staff", "is_superuser")
+
 
 class User(AbstractUser):
     email = models.EmailField(unique=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Picked up by core.signals to revoke tokens carrying the old flags.
+        instance._loaded_flags = instance.token_flags()
+        return instance
+
+    def token_flags(self):
+        # Read from __dict__ so deferred fields are not loaded.
+        return tuple(self.__dict__.get(name) for name in TOKEN_FLAGS)
+
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        # Picked up by core.signals to revoke tokens issued before the change.
+        self._password_changed = True
+
+
+class ClaimsUser(User):
+    """
+    A user built from verified JWT claims instead of a database row.
+
+    Only `id`, `username`, `is_active`, `is_staff` and `is_superuser` are
+    populated. It works anywhere a `User` is used as a foreign key value or
+    filter, but must never be saved.
+    """
+
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        raise TypeError("ClaimsUser is built from token claims and cannot be saved.")
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("ClaimsUser is built from token claims and cannot be deleted.")
+
+
+class RevokedToken(models.Model):
+    """
+    A revoked JWT, or every token of `user` issued before `issued_before`.
+
+    Rows are only needed until `expires_at`, after which the tokens they
+    revoke are rejected by their own expiry.
+    """
+
+    jti = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="revoked_tokens"
+    )
+    issued_before = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
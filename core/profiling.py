@@ -0,0 +1,89 @@
+import os
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+from django.conf import settings
+
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class SamplingProfiler:
+    """
+    Samples the call stack of one thread at a fixed interval.
+
+    The result is rendered as collapsed stacks ("outer;inner;leaf count" per
+    line), the input format of flamegraph.pl, speedscope and friends.
+    """
+
+    def __init__(self, thread_id=None, interval=0.001):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+
+def profile_dir():
+    return Path(getattr(settings, "PROFILE_DIR", settings.BASE_DIR / "profiles"))
+
+
+def save_profile(content):
+    """Store a report and prune the oldest ones beyond `PROFILE_KEEP`."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    profile_id = uuid.uuid4().hex
+    (directory / f"{profile_id}.collapsed").write_text(content)
+
+    keep = getattr(settings, "PROFILE_KEEP", 50)
+    reports = sorted(directory.glob("*.collapsed"), key=os.path.getmtime)
+    for old in reports[:-keep]:
+        old.unlink(missing_ok=True)
+
+    return profile_id
+
+
+def list_profiles():
+    directory = profile_dir()
+    if not directory.exists():
+        return []
+    reports = sorted(directory.glob("*.collapsed"), key=os.path.getmtime, reverse=True)
+    return [report.stem for report in reports]
+
+
+def profile_path(profile_id):
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = profile_dir() / f"{profile_id}.collapsed"
+    return path if path.exists() else None
@@ -0,0 +1,8 @@
+from rest_framework.renderers import JSONRenderer as BaseJSONRenderer
+from .timing import timed
+
+
+class JSONRenderer(BaseJSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed("render"):
+            return super().render(data, accepted_media_type, renderer_context)
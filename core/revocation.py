@@ -0,0 +1,124 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from .models import RevokedToken
+
+
+class RevocationFilter:
+    """
+    In-process view of `RevokedToken`, checked on every authenticated request.
+
+    Lookups are a set membership test and a dict lookup. The table is re-read
+    incrementally (rows created since the last sync, with an overlap for
+    transactions that committed late) at most every `refresh_interval`
+    seconds, and entries are pruned once the tokens they cover have expired.
+    """
+
+    def __init__(self, refresh_interval=5, overlap=30):
+        self.refresh_interval = refresh_interval
+        self.overlap = timedelta(seconds=overlap)
+        self._jtis = {}
+        self._cutoffs = {}
+        self._synced_at = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        if not force and time.monotonic() < self._next_refresh:
+            return
+        with self._lock:
+            if not force and time.monotonic() < self._next_refresh:
+                return
+
+            now = datetime.now(timezone.utc)
+            rows = RevokedToken.objects.filter(expires_at__gt=now)
+            if self._synced_at is not None:
+                rows = rows.filter(created_at__gte=self._synced_at - self.overlap)
+
+            for jti, user_id, issued_before, expires_at in rows.values_list(
+                "jti", "user_id", "issued_before", "expires_at"
+            ):
+                self._add(jti, str(user_id), issued_before, expires_at)
+            self._prune(now.timestamp())
+
+            self._synced_at = now
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def _add(self, jti, user_id, issued_before, expires_at):
+        expires = expires_at.timestamp()
+        if jti:
+            self._jtis[jti] = expires
+        if issued_before is not None:
+            # `iat` is whole seconds, so a token issued in the same second as
+            # the revocation (a login right after a password change) must
+            # compare equal, not below.
+            cutoff = math.floor(issued_before.timestamp())
+            current = self._cutoffs.get(user_id)
+            if current is None or cutoff > current[0]:
+                self._cutoffs[user_id] = (cutoff, expires)
+
+    def _prune(self, now):
+        self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+        self._cutoffs = {
+            user_id: entry for user_id, entry in self._cutoffs.items() if entry[1] > now
+        }
+
+    def is_revoked(self, token):
+        self.refresh()
+        if token.get(api_settings.JTI_CLAIM) in self._jtis:
+            return True
+
+        cutoff = self._cutoffs.get(str(token.get(api_settings.USER_ID_CLAIM)))
+        return cutoff is not None and token.get("iat", 0) < cutoff[0]
+
+    def remember(self, revoked):
+        """Apply a row created in this process without waiting for a refresh."""
+        with self._lock:
+            self._add(
+                revoked.jti,
+                str(revoked.user_id),
+                revoked.issued_before,
+                revoked.expires_at,
+            )
+
+
+revocation_filter = RevocationFilter(
+    refresh_interval=getattr(settings, "TOKEN_REVOCATION_REFRESH_INTERVAL", 5)
+)
+
+
+def revoke_token(token):
+    """Revoke a single validated simplejwt token."""
+    expires_at = datetime.fromtimestamp(token["exp"], tz=timezone.utc)
+    revoked, _ = RevokedToken.objects.get_or_create(
+        jti=token[api_settings.JTI_CLAIM],
+        defaults={
+            "user_id": token[api_settings.USER_ID_CLAIM],
+            "expires_at": expires_at,
+        },
+    )
+    revocation_filter.remember(revoked)
+    return revoked
+
+
+def revoke_user_tokens(user):
+    """Revoke every token issued to `user` up to now."""
+    lifetime = max(
+        api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME
+    )
+    now = datetime.now(timezone.utc)
+    revoked = RevokedToken.objects.create(
+        user=user, issued_before=now, expires_at=now + lifetime
+    )
+    revocation_filter.remember(revoked)
+    return revoked
+
+
+def prune_revoked_tokens():
+    """Delete rows whose tokens have all expired; returns the number deleted."""
+    now = datetime.now(timezone.utc)
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+    return deleted
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .authentication import user_cache
+from .revocation import revoke_user_tokens
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.pop(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def revoke_tokens_on_credential_change(sender, instance, created, **kwargs):
+    # A new password, or flags the existing tokens carry as claims (stateless
+    # authentication trusts them until the token expires).
+    password_changed = getattr(instance, "_password_changed", False)
+    instance._password_changed = False
+    loaded_flags = getattr(instance, "_loaded_flags", None)
+    flags = instance.token_flags()
+    instance._loaded_flags = flags
+    if created:
+        return
+    if password_changed or (loaded_flags is not None and loaded_flags != flags):
+        revoke_user_tokens(instance)
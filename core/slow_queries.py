@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from collections import deque
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class SlowQueryLog:
+    """Thread-safe bounded ring buffer of slow query entries (per process)."""
+
+    def __init__(self, maxlen):
+        self._entries = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self):
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(maxlen=getattr(settings, "SLOW_QUERY_LOG_SIZE", 100))
+
+
+def explain(connection, sql, params):
+    """
+    Return the execution plan for `sql` as a list of text lines.
+
+    PostgreSQL gets `EXPLAIN (ANALYZE, BUFFERS)` for read-only statements and a
+    plain `EXPLAIN` for writes (ANALYZE would execute them a second time).
+    SQLite falls back to `EXPLAIN QUERY PLAN`.
+    """
+    vendor = connection.vendor
+    if vendor == "postgresql":
+        is_select = sql.lstrip().upper().startswith(("SELECT", "WITH"))
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if is_select else "EXPLAIN "
+    elif vendor == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        prefix = "EXPLAIN "
+
+    _local.explaining = True
+    try:
+        # A savepoint keeps a failing EXPLAIN from breaking the caller's transaction.
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                rows = cursor.fetchall()
+    except DatabaseError as exc:
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        _local.explaining = False
+
+    if vendor == "sqlite":
+        # (id, parent, notused, detail)
+        return [str(row[-1]) for row in rows]
+    return [" ".join(str(col) for col in row) for row in rows]
+
+
+class SlowQueryRecorder:
+    """
+    Database execute wrapper that records statements slower than the threshold.
+
+    Installed per request by `core.middleware.SlowQueryMiddleware`.
+    """
+
+    def __init__(self, request, threshold_ms, capture_explain=True):
+        self.request = request
+        self.threshold_ms = threshold_ms
+        self.capture_explain = capture_explain
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_local, "explaining", False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if duration_ms >= self.threshold_ms:
+                self.record(context["connection"], sql, params, many, duration_ms)
+
+    def record(self, connection, sql, params, many, duration_ms):
+        plan = []
+        if self.capture_explain and not many:
+            plan = explain(connection, sql, params)
+
+        match = getattr(self.request, "resolver_match", None)
+        entry = {
+            "timestamp": timezone.now().isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "database": connection.alias,
+            "view": match.view_name if match else None,
+            "method": self.request.method,
+            "path": self.request.path,
+            "sql": sql,
+            "params": [repr(param) for param in params] if params and not many else [],
+            "explain": plan,
+        }
+        slow_query_log.append(entry)
+        logger.warning("slow query (%.1f ms)", duration_ms, extra={"data": entry})
+
+
+def install_recorder(stack, request, threshold_ms, capture_explain=True):
+    """Install a `SlowQueryRecorder` on every configured connection."""
+    recorder = SlowQueryRecorder(request, threshold_ms, capture_explain)
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(recorder))
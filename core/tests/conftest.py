@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from core.authentication import user_cache
+import pytest
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    # Rolled-back test transactions reuse primary keys the cache still holds.
+    user_cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authentication(api_client):
+    def inner_function(is_staff=False):
+        user = User.objects.create_user(
+            username="user_test",
+            email="user@example.com",
+            password="password123",
+            is_staff=is_staff,
+        )
+        api_client.force_authenticate(user=user)
+        return user
+
+    return inner_function
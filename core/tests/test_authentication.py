@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from core import authentication
+from core.authentication import get_cached_user
+from core.serializers import TokenObtainPairSerializer
+from model_bakery import baker
+import pytest
+
+User = get_user_model()
+
+
+def claims_token(user):
+    return TokenObtainPairSerializer.get_token(user).access_token
+
+
+@pytest.mark.django_db
+class TestCachedAuthentication:
+    def test_user_is_loaded_once(self, api_client, django_assert_num_queries):
+        user = baker.make(User)
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        api_client.get("/api/schedule/categories/")
+
+        # Only the category query; the user comes from the cache.
+        with django_assert_num_queries(1):
+            response = api_client.get("/api/schedule/categories/")
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_saving_user_invalidates_cache(self, api_client):
+        user = baker.make(User)
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        api_client.get("/api/schedule/categories/")
+
+        user.is_active = False
+        user.save()
+        response = api_client.get("/api/schedule/categories/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_cached_user_uses_the_routed_database(self, monkeypatch):
+        user = baker.make(User)
+        get_cached_user(user.pk)
+        monkeypatch.setattr(
+            authentication.router, "db_for_read", lambda model, **hints: "replica"
+        )
+
+        assert get_cached_user(user.pk)._state.db == "replica"
+
+
+@pytest.mark.django_db
+class TestStatelessAuthentication:
+    def test_tag_list_runs_without_auth_queries(
+        self, api_client, django_assert_num_queries
+    ):
+        user = baker.make(User)
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {claims_token(user)}")
+
+        with django_assert_num_queries(1):
+            response = api_client.get("/api/schedule/tags/")
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_tag_is_created_for_token_user(self, api_client):
+        user = baker.make(User)
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {claims_token(user)}")
+
+        response = api_client.post("/api/schedule/tags/", {"title": "work"})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert user.tags.filter(title="Work").exists()
@@ -0,0 +1,74 @@
+import json
+import logging
+from core.log import BackgroundLogHandler, SamplingFilter, request_id_var
+import pytest
+
+
+def make_record(level=logging.INFO, msg="hello"):
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+class TestSamplingFilter:
+    def test_zero_rate_drops_info(self):
+        assert not SamplingFilter(rate=0).filter(make_record())
+
+    def test_warnings_are_never_sampled(self):
+        assert SamplingFilter(rate=0).filter(make_record(logging.WARNING))
+
+    def test_level_by_name_or_number(self):
+        assert SamplingFilter(level="ERROR").level == logging.ERROR
+        assert SamplingFilter(level=logging.INFO).level == logging.INFO
+        with pytest.raises(ValueError):
+            SamplingFilter(level="LOUD")
+
+
+class TestBackgroundLogHandler:
+    def test_writes_json_lines_with_request_id(self, tmp_path):
+        path = tmp_path / "app.log"
+        handler = BackgroundLogHandler(str(path), console=False)
+        token = request_id_var.set("abc123")
+        try:
+            handler.handle(make_record())
+        finally:
+            request_id_var.reset(token)
+        handler.close()
+
+        line = json.loads(path.read_text().splitlines()[0])
+        assert line["message"] == "hello"
+        assert line["request_id"] == "abc123"
+
+    def test_traceback_is_kept_apart_from_message(self, tmp_path):
+        path = tmp_path / "app.log"
+        handler = BackgroundLogHandler(str(path), console=False)
+        logger = logging.getLogger("test.traceback")
+        logger.addHandler(handler)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed %s", "here")
+        finally:
+            logger.removeHandler(handler)
+        handler.close()
+
+        line = json.loads(path.read_text().splitlines()[0])
+        assert line["message"] == "failed here"
+        assert "ValueError: boom" in line["exc_info"]
+
+    def test_full_queue_drops_instead_of_blocking(self, tmp_path):
+        handler = BackgroundLogHandler(
+            str(tmp_path / "app.log"), console=False, queue_size=1
+        )
+        handler.listener.stop()
+
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        assert handler.dropped == 1
+        handler.close()
+
+
+@pytest.mark.django_db
+def test_request_id_is_echoed(api_client):
+    response = api_client.get("/api/schedule/tags/", HTTP_X_REQUEST_ID="req-1")
+
+    assert response["X-Request-ID"] == "req-1"
@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from core import middleware
+from core.authentication import JWTAuthentication
+from model_bakery import baker
+import pytest
+
+User = get_user_model()
+
+
+@pytest.fixture
+def bearer(api_client):
+    def inner_function(is_staff=False):
+        user = baker.make(User, is_staff=is_staff)
+        token = AccessToken.for_user(user)
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return user
+
+    return inner_function
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+    def test_header_breaks_down_request(self, settings, bearer, api_client):
+        settings.SERVER_TIMING = True
+        bearer()
+
+        response = api_client.get("/api/schedule/tags/")
+
+        phases = [part.split(";")[0] for part in response["Server-Timing"].split(", ")]
+        assert {"auth", "db", "serialize", "render", "app", "total"} <= set(phases)
+        assert phases.index("serialize") < phases.index("render")
+
+    def test_disabled_by_default(self, settings, bearer, api_client):
+        settings.SERVER_TIMING = False
+        bearer()
+
+        response = api_client.get("/api/schedule/tags/")
+
+        assert "Server-Timing" not in response
+
+
+@pytest.mark.django_db
+class TestProfiling:
+    def test_staff_request_is_profiled(self, profile_dir, bearer, api_client):
+        bearer(is_staff=True)
+
+        response = api_client.get("/api/schedule/tags/?profile=1")
+        profile_id = response["X-Profile-Id"]
+        download = api_client.get(f"/api/debug/profiles/{profile_id}/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert download.status_code == status.HTTP_200_OK
+        assert (profile_dir / f"{profile_id}.collapsed").exists()
+
+    def test_token_is_validated_once(
+        self, profile_dir, bearer, api_client, monkeypatch
+    ):
+        bearer(is_staff=True)
+        calls = []
+        validate = JWTAuthentication.get_validated_token
+
+        def counting(self, raw_token):
+            calls.append(raw_token)
+            return validate(self, raw_token)
+
+        monkeypatch.setattr(JWTAuthentication, "get_validated_token", counting)
+
+        response = api_client.get("/api/schedule/tags/?profile=1")
+
+        assert "X-Profile-Id" in response
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize("staff", [None, False])
+    def test_only_staff_requests_are_sampled(
+        self, profile_dir, bearer, api_client, monkeypatch, staff
+    ):
+        if staff is not None:
+            bearer(is_staff=staff)
+        profilers = []
+        monkeypatch.setattr(middleware, "SamplingProfiler", profilers.append)
+
+        response = api_client.get("/api/schedule/tags/?profile=1")
+
+        assert "X-Profile-Id" not in response
+        assert profilers == []
+
+    def test_non_staff_request_is_not_profiled(self, profile_dir, bearer, api_client):
+        bearer()
+
+        response = api_client.get("/api/schedule/tags/?profile=1")
+
+        assert "X-Profile-Id" not in response
+        assert list(profile_dir.iterdir()) == []
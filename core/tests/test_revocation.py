@@ -0,0 +1,124 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.revocation import revocation_filter
+from core.serializers import TokenObtainPairSerializer
+from model_bakery import baker
+import pytest
+
+User = get_user_model()
+
+
+def claims_token(user):
+    return TokenObtainPairSerializer.get_token(user).access_token
+
+
+@pytest.fixture
+def login(api_client):
+    def inner_function():
+        user = User.objects.create_user(
+            username="user_test", email="user@example.com", password="password123"
+        )
+        refresh = RefreshToken.for_user(user)
+        access = refresh.access_token
+        # Issued a second before anything the test does, since `iat` is in
+        # whole seconds.
+        access["iat"] -= 1
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return user, refresh
+
+    return inner_function
+
+
+@pytest.fixture(autouse=True)
+def fresh_filter():
+    revocation_filter.__init__()
+
+
+@pytest.mark.django_db
+class TestTokenRevocation:
+    def test_logout_revokes_access_and_refresh_tokens(self, login, api_client):
+        _, refresh = login()
+
+        response = api_client.post("/api/auth/jwt/logout/", {"refresh": str(refresh)})
+        after_logout = api_client.get("/api/schedule/categories/")
+        refreshed = api_client.post("/api/auth/jwt/refresh/", {"refresh": str(refresh)})
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert after_logout.status_code == status.HTTP_401_UNAUTHORIZED
+        assert refreshed.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_password_change_revokes_existing_tokens(self, login, api_client):
+        login()
+
+        response = api_client.post(
+            "/api/auth/users/set_password/",
+            {"current_password": "password123", "new_password": "new-password456"},
+        )
+        after_change = api_client.get("/api/schedule/categories/")
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert after_change.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_right_after_password_change(self, login, api_client):
+        login()
+        api_client.post(
+            "/api/auth/users/set_password/",
+            {"current_password": "password123", "new_password": "new-password456"},
+        )
+
+        response = api_client.post(
+            "/api/auth/jwt/create/",
+            {"username": "user_test", "password": "new-password456"},
+        )
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        after_login = api_client.get("/api/schedule/categories/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert after_login.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize("flag, value", [("is_active", False), ("is_staff", False)])
+    def test_flag_change_revokes_claims_tokens(self, login, api_client, flag, value):
+        user, _ = login()
+        User.objects.filter(pk=user.pk).update(is_staff=True)
+        user = User.objects.get(pk=user.pk)
+        access = claims_token(user)
+        access["iat"] -= 1
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        assert api_client.get("/api/schedule/tags/").status_code == status.HTTP_200_OK
+
+        setattr(user, flag, value)
+        user.save()
+        response = api_client.get("/api/schedule/tags/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_other_saves_keep_tokens(self, login, api_client):
+        user, _ = login()
+        user = User.objects.get(pk=user.pk)
+
+        user.first_name = "Renamed"
+        user.save()
+        response = api_client.get("/api/schedule/categories/")
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_check_does_not_query_between_refreshes(
+        self, login, api_client, django_assert_num_queries
+    ):
+        login()
+        api_client.get("/api/schedule/categories/")
+
+        # Only the category query: no user lookup, no revocation lookup.
+        with django_assert_num_queries(1):
+            api_client.get("/api/schedule/categories/")
+
+    def test_other_users_tokens_are_not_revoked(self, login, api_client):
+        login()
+        other = baker.make(User)
+        other.set_password("whatever123")
+        other.save()
+
+        response = api_client.get("/api/schedule/categories/")
+
+        assert response.status_code == status.HTTP_200_OK
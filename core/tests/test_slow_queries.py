@@ -0,0 +1,45 @@
+from rest_framework import status
+from core.slow_queries import slow_query_log
+import pytest
+
+
+@pytest.fixture
+def record_everything(settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    slow_query_log.clear()
+    yield
+    slow_query_log.clear()
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+    def test_non_staff_user_returns_403(self, authentication, api_client):
+        authentication()
+
+        response = api_client.get("/api/debug/slow-queries/")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_slow_queries_are_captured_with_plan(
+        self, record_everything, authentication, api_client
+    ):
+        authentication(is_staff=True)
+        api_client.get("/api/schedule/tags/")
+
+        response = api_client.get("/api/debug/slow-queries/")
+
+        assert response.status_code == status.HTTP_200_OK
+        entry = next(e for e in response.data if "scheduler_tag" in e["sql"])
+        assert entry["view"] == "tag-list"
+        assert entry["path"] == "/api/schedule/tags/"
+        assert entry["explain"]
+        assert not entry["explain"][0].startswith("EXPLAIN failed")
+
+    def test_delete_clears_log(self, record_everything, authentication, api_client):
+        authentication(is_staff=True)
+        api_client.get("/api/schedule/tags/")
+
+        response = api_client.delete("/api/debug/slow-queries/")
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert slow_query_log.entries() == []
@@ -0,0 +1,102 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from rest_framework import status
+from core.throttling import CacheBucketStore
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def tight_limits(settings):
+    settings.RATE_LIMITS = {
+        "anon": {"capacity": 2, "refill_rate": 0.01},
+        "user": {"capacity": 3, "refill_rate": 0.01},
+        "planetary": {"capacity": 1, "refill_rate": 0.01},
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestTokenBucketThrottle:
+    def test_burst_is_allowed_then_429_with_retry_after(
+        self, authentication, api_client
+    ):
+        authentication()
+
+        statuses = [api_client.get("/api/schedule/tags/").status_code for _ in range(4)]
+        response = api_client.get("/api/schedule/tags/")
+
+        assert statuses[:3] == [status.HTTP_200_OK] * 3
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response["Retry-After"]) > 0
+
+    def test_endpoints_have_separate_buckets(self, authentication, api_client):
+        authentication()
+        for _ in range(3):
+            api_client.get("/api/schedule/tags/")
+
+        response = api_client.get("/api/schedule/categories/")
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_anonymous_planetary_hours_are_limited(self, api_client):
+        url = "/api/planetary/hours/?lat=35.7&lon=51.4&city=Tehran"
+
+        first = api_client.get(url)
+        second = api_client.get(url)
+
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_forwarded_for_does_not_reset_the_bucket(self, api_client):
+        url = "/api/planetary/hours/?lat=35.7&lon=51.4&city=Tehran"
+
+        first = api_client.get(url, HTTP_X_FORWARDED_FOR="10.0.0.1")
+        second = api_client.get(url, HTTP_X_FORWARDED_FOR="10.0.0.2")
+
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_configured_proxy_hop_is_trusted(self, api_client, settings):
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        url = "/api/planetary/hours/?lat=35.7&lon=51.4&city=Tehran"
+
+        first = api_client.get(url, HTTP_X_FORWARDED_FOR="10.0.0.1")
+        spoofed = api_client.get(url, HTTP_X_FORWARDED_FOR="10.0.0.2, 10.0.0.1")
+        other = api_client.get(url, HTTP_X_FORWARDED_FOR="10.0.0.2")
+
+        assert first.status_code == status.HTTP_200_OK
+        assert spoofed.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert other.status_code == status.HTTP_200_OK
+
+
+class TestCacheBucketStore:
+    def test_concurrent_burst_is_limited(self):
+        store = CacheBucketStore()
+        start = threading.Barrier(20)
+
+        def consume():
+            start.wait()
+            return store.consume("throttle:test", capacity=5, refill_rate=0.01)
+
+        with ThreadPoolExecutor(20) as pool:
+            waits = list(pool.map(lambda _: consume(), range(20)))
+
+        assert waits.count(0) == 5
+
+    def test_wait_until_tokens_are_back(self, monkeypatch):
+        store = CacheBucketStore()
+        now = 1_000_000.0
+        monkeypatch.setattr(time, "time", lambda: now)
+
+        for _ in range(2):
+            assert store.consume("throttle:test", capacity=2, refill_rate=1) == 0
+        wait = store.consume("throttle:test", capacity=2, refill_rate=1)
+
+        assert wait > 0
+        now += wait
+        assert store.consume("throttle:test", capacity=2, refill_rate=1) == 0
+        assert store.consume("throttle:test", capacity=2, refill_rate=1) > 0
@@ -0,0 +1,122 @@
+import math
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+
+class BucketStore:
+    """
+    Storage for token buckets.
+
+    `consume()` takes `cost` tokens from the bucket at `key` and returns 0 when
+    the request is allowed, or the number of seconds until enough tokens will
+    be available.
+    """
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        raise NotImplementedError
+
+
+class CacheBucketStore(BucketStore):
+    """
+    Token buckets kept in a Django cache (`RATE_LIMIT_CACHE`, default "default").
+
+    A bucket is approximated by a sliding window of `capacity / refill_rate`
+    seconds, the time it takes to refill: the requests counted in the current
+    window plus the previous window's count, weighted by how much of it still
+    overlaps, may not exceed `capacity`. Counting uses only the atomic
+    `cache.add()` and `cache.incr()`/`decr()`, so concurrent requests from one
+    client cannot slip through, whether the cache is the per-process
+    local-memory one or a shared backend such as Redis or Memcached.
+    """
+
+    def __init__(self, alias=None):
+        self.cache = caches[alias or getattr(settings, "RATE_LIMIT_CACHE", "default")]
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        window = capacity / refill_rate
+        now = time.time()
+        index, offset = divmod(now, window)
+        current_key = f"{key}:{int(index)}"
+        timeout = math.ceil(2 * window) + 1
+
+        self.cache.add(current_key, 0, timeout)
+        try:
+            count = self.cache.incr(current_key, cost)
+        except ValueError:
+            # Evicted between add() and incr().
+            self.cache.add(current_key, cost, timeout)
+            count = cost
+        previous = self.cache.get(f"{key}:{int(index) - 1}", 0)
+        overlap = 1 - offset / window
+        if previous * overlap + count <= capacity:
+            return 0
+
+        # Rejected requests do not count against the client.
+        self.cache.decr(current_key, cost)
+        count -= cost
+        if count + cost <= capacity and previous:
+            # Later in this window, once enough of the previous one has slid out.
+            needed = 1 - (capacity - cost - count) / previous
+            return max((needed - offset / window) * window, 0.001)
+        # In the next window, where this one's count becomes the previous one.
+        needed = max(1 - (capacity - cost) / count, 0) if count else 0
+        return (1 - offset / window + needed) * window
+
+
+_store = None
+
+
+def get_bucket_store():
+    global _store
+    if _store is None:
+        store_class = getattr(
+            settings, "RATE_LIMIT_STORE", "core.throttling.CacheBucketStore"
+        )
+        _store = import_string(store_class)()
+    return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket rate limit per client and endpoint.
+
+    Clients are identified by user id, or by IP address for anonymous
+    requests. The bucket size and refill rate come from `RATE_LIMITS[scope]`,
+    where the scope is the class's `scope`, the view's `throttle_scope`, or
+    "user"/"anon".
+    """
+
+    scope = None
+
+    def get_scope(self, request, view):
+        scope = self.scope or getattr(view, "throttle_scope", None)
+        if scope:
+            return scope
+        return "user" if request.user and request.user.is_authenticated else "anon"
+
+    def get_client_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def get_endpoint(self, view):
+        view_class = view.__class__
+        return f"{view_class.__module__}.{view_class.__name__}"
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        limits = getattr(settings, "RATE_LIMITS", {}).get(scope)
+        if limits is None:
+            return True
+
+        key = f"throttle:{scope}:{self.get_endpoint(view)}:{self.get_client_ident(request)}"
+        self._wait = get_bucket_store().consume(
+            key, limits["capacity"], limits["refill_rate"]
+        )
+        return self._wait == 0
+
+    def wait(self):
+        return self._wait
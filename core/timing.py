@@ -0,0 +1,96 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+current_timer = contextvars.ContextVar("current_timer", default=None)
+
+
+class RequestTimer:
+    """
+    Accumulates wall time per phase for one request.
+
+    Phases are disjoint: while a `timed()` block is active, database time is
+    attributed to that block rather than to "db".
+
+    Phases appear in the header in the order they were first seen, which for
+    an API request is auth, db, serialize, render.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.active = None
+        self.active_includes_db = True
+
+    def add(self, name, duration_ms):
+        self.phases[name] = self.phases.get(name, 0.0) + duration_ms
+
+    def total_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        if self.active is not None and self.active_includes_db:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add("db", (time.perf_counter() - start) * 1000)
+
+    def header_value(self):
+        total = self.total_ms()
+        phases = dict(self.phases)
+        phases["app"] = max(total - sum(phases.values()), 0.0)
+        phases["total"] = total
+        return ", ".join(f"{name};dur={ms:.2f}" for name, ms in phases.items())
+
+
+@contextmanager
+def timed(name, include_db=True):
+    """
+    Attribute the enclosed block to `name` on the current request timer.
+
+    With `include_db=False` queries run inside the block still count as "db",
+    for blocks such as serialization that evaluate lazy querysets.
+    """
+    timer = current_timer.get()
+    if timer is None or timer.active is not None:
+        yield
+        return
+
+    timer.active = name
+    timer.active_includes_db = include_db
+    db_before = timer.phases.get("db", 0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.active = None
+        timer.active_includes_db = True
+        db_ms = timer.phases.get("db", 0.0) - db_before
+        timer.add(name, (time.perf_counter() - start) * 1000 - db_ms)
+
+
+def install_serializer_timing():
+    """
+    Attribute `serializer.data` to the "serialize" phase.
+
+    DRF has no hook around serialization and views read `.data` before the
+    response exists, so the property is wrapped once on the two classes every
+    serializer derives it from. Nested serializers fall inside the outer
+    block, queries from lazy querysets still count as "db", and the cost
+    without a request timer is one context lookup.
+    """
+    from rest_framework.serializers import ListSerializer, Serializer
+
+    for serializer_class in (Serializer, ListSerializer):
+        data = serializer_class.data
+        if getattr(data.fget, "timed", False):
+            continue
+
+        def get_data(self, fget=data.fget):
+            with timed("serialize", include_db=False):
+                return fget(self)
+
+        get_data.timed = True
+        serializer_class.data = property(get_data)
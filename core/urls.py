@@ -1,4 +1,11 @@
 from django.urls import path
 from django.views.generic import TemplateView
+from . import views
 
-urlpatterns = [path("", TemplateView.as_view(template_name="core/index.html"))]
+urlpatterns = [
+    path("", TemplateView.as_view(template_name="core/index.html")),
+    path("api/auth/jwt/logout/", views.LogoutView.as_view()),
+    path("api/debug/slow-queries/", views.SlowQueryListView.as_view()),
+    path("api/debug/profiles/", views.ProfileListView.as_view()),
+    path("api/debug/profiles/<str:profile_id>/", views.ProfileDownloadView.as_view()),
+]
@@ -1,3 +1,66 @@
-from django.shortcuts import render
+from django.http import FileResponse, Http404
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework import status
+from .profiling import list_profiles, profile_path
+from .revocation import revoke_token
+from .serializers import LogoutSerializer
+from .slow_queries import slow_query_log
 
-# Create your views here.
+
+class SlowQueryListView(APIView):
+    """Slow queries captured by this process, newest first."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(slow_query_log.entries(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        slow_query_log.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProfileListView(APIView):
+    """Ids of stored request profiles, newest first."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(list_profiles(), status=status.HTTP_200_OK)
+
+
+class ProfileDownloadView(APIView):
+    """Collapsed-stack report of one profiled request."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        path = profile_path(profile_id)
+        if path is None:
+            raise Http404
+        return FileResponse(
+            open(path, "rb"),
+            as_attachment=True,
+            filename=path.name,
+            content_type="text/plain",
+        )
+
+
+class LogoutView(APIView):
+    """Revoke the access token used for this request and, if given, its refresh token."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if request.auth is not None:
+            revoke_token(request.auth)
+        refresh = serializer.validated_data.get("refresh")
+        if refresh is not None:
+            revoke_token(refresh)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,73 @@
+import signal
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from jobs.worker import claim_job, default_worker_id, release_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--name",
+            action="append",
+            dest="names",
+            help="Only run jobs with this name (repeatable).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=getattr(settings, "JOB_POLL_INTERVAL", 1.0),
+            help="Seconds to wait when no job is due.",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when no job is due."
+        )
+        parser.add_argument("--max-jobs", type=int, help="Exit after this many jobs.")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        previous = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            self.work(options)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def work(self, options):
+        worker_id = default_worker_id()
+        processed = 0
+        last_release = float("-inf")
+        self.stdout.write(f"Worker {worker_id} started.")
+
+        while not self.stopping:
+            close_old_connections()
+            if time.monotonic() - last_release > 60:
+                released = release_stale_jobs()
+                if released:
+                    self.stdout.write(f"Released {released} stale jobs.")
+                last_release = time.monotonic()
+
+            job = claim_job(worker_id, options["names"])
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+                continue
+
+            run_job(job)
+            processed += 1
+            self.stdout.write(f"{job} after {job.attempts} attempt(s).")
+            if options["max_jobs"] and processed >= options["max_jobs"]:
+                break
+
+        self.stdout.write(f"Worker {worker_id} stopped after {processed} jobs.")
+
+    def stop(self, signum, frame):
+        # Finish the current job, then exit.
+        self.stopping = True
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from django.utils import timezone
+from .models import Job
+
+
+class JobSpec:
+    """
+    A registered job function.
+
+    `concurrency` caps how many jobs of this name run at once (None for no
+    limit) and `backoff` is the delay in seconds before the first retry,
+    doubled after every failed attempt.
+    """
+
+    def __init__(self, name, func, max_attempts=5, concurrency=None, backoff=30):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.backoff = backoff
+
+
+_registry = {}
+
+
+def register(name=None, *, max_attempts=5, concurrency=None, backoff=30):
+    """
+    Register a job function under `name` (default "module.function").
+
+    The function is called with the job's payload as keyword arguments and
+    may return a JSON-serializable result.
+    """
+
+    def decorator(func):
+        job_name = name or f"{func.__module__}.{func.__name__}"
+        if job_name in _registry and _registry[job_name].func is not func:
+            raise ValueError(f"A job named {job_name!r} is already registered.")
+        _registry[job_name] = JobSpec(
+            job_name, func, max_attempts, concurrency, backoff
+        )
+        return func
+
+    return decorator
+
+
+def get_spec(name):
+    return _registry.get(name)
+
+
+def registered():
+    return dict(_registry)
+
+
+def enqueue(name, payload=None, *, user=None, delay=None):
+    """Queue a run of the job registered as `name` and return the `Job`."""
+    spec = get_spec(name)
+    if spec is None:
+        raise KeyError(f"No job registered as {name!r}.")
+    run_at = timezone.now()
+    if delay:
+        run_at += timedelta(seconds=delay)
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        user=user,
+        max_attempts=spec.max_attempts,
+        run_at=run_at,
+    )
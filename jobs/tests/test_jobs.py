@@ -0,0 +1,159 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from jobs.models import Job
+from jobs.registry import enqueue, register
+from jobs.worker import beat, claim_job, release_stale_jobs, run_job
+from model_bakery import baker
+import pytest
+
+calls = []
+
+
+@register("tests.add", backoff=10, max_attempts=2)
+def add(a, b):
+    calls.append((a, b))
+    return {"sum": a + b}
+
+
+@register("tests.flaky", backoff=10, max_attempts=2)
+def flaky():
+    raise RuntimeError("boom")
+
+
+@register("tests.single", concurrency=1)
+def single():
+    return None
+
+
+@pytest.mark.django_db
+class TestWorker:
+    def test_enqueue_and_run(self):
+        job = enqueue("tests.add", {"a": 2, "b": 3})
+
+        claimed = claim_job("worker-1")
+        run_job(claimed)
+
+        job.refresh_from_db()
+        assert claimed.id == job.id
+        assert job.status == Job.STATUS_SUCCEEDED
+        assert job.attempts == 1
+        assert job.result == {"sum": 5}
+        assert job.finished_at is not None
+
+    def test_enqueue_unknown_job(self):
+        with pytest.raises(KeyError):
+            enqueue("tests.missing")
+
+    def test_a_job_is_claimed_once(self):
+        enqueue("tests.add", {"a": 1, "b": 1})
+
+        assert claim_job("worker-1") is not None
+        assert claim_job("worker-2") is None
+
+    def test_future_jobs_wait(self):
+        enqueue("tests.add", {"a": 1, "b": 1}, delay=60)
+
+        assert claim_job("worker-1") is None
+
+    def test_failure_backs_off_then_fails(self):
+        job = enqueue("tests.flaky")
+
+        run_job(claim_job("worker-1"))
+        job.refresh_from_db()
+        assert job.status == Job.STATUS_QUEUED
+        assert job.run_at > timezone.now() + timedelta(seconds=5)
+        assert "boom" in job.last_error
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        run_job(claim_job("worker-1"))
+        job.refresh_from_db()
+        assert job.status == Job.STATUS_FAILED
+        assert job.attempts == 2
+
+    def test_concurrency_limit(self):
+        enqueue("tests.single")
+        enqueue("tests.single")
+
+        assert claim_job("worker-1") is not None
+        assert claim_job("worker-2") is None
+
+    def test_stale_jobs_are_released(self):
+        job = enqueue("tests.add", {"a": 1, "b": 1})
+        claim_job("worker-1")
+        Job.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        assert release_stale_jobs(timeout=60) == 1
+        job.refresh_from_db()
+        assert job.status == Job.STATUS_QUEUED
+
+    def test_heartbeat_keeps_a_running_job(self):
+        job = enqueue("tests.add", {"a": 1, "b": 1})
+        claimed = claim_job("worker-1")
+        Job.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        assert beat(claimed)
+        assert release_stale_jobs(timeout=60) == 0
+
+    def test_released_job_keeps_the_new_claimants_state(self):
+        job = enqueue("tests.add", {"a": 1, "b": 1})
+        claimed = claim_job("worker-1")
+        Job.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        release_stale_jobs(timeout=60)
+        claim_job("worker-2")
+
+        assert not beat(claimed)
+        run_job(claimed)
+
+        job.refresh_from_db()
+        assert job.status == Job.STATUS_RUNNING
+        assert job.locked_by == "worker-2"
+        assert job.attempts == 2
+
+    def test_run_jobs_command(self):
+        calls.clear()
+        enqueue("tests.add", {"a": 1, "b": 2})
+        enqueue("tests.add", {"a": 3, "b": 4})
+
+        call_command("run_jobs", "--once", stdout=StringIO())
+
+        assert calls == [(1, 2), (3, 4)]
+        assert not Job.objects.exclude(status=Job.STATUS_SUCCEEDED).exists()
+
+    def test_scheduler_jobs_are_registered(self):
+        enqueue("scheduler.archive_tasks", {"horizon_days": 30})
+
+        run_job(claim_job("worker-1"))
+
+        assert Job.objects.get().result["archived"] == 0
+
+
+@pytest.mark.django_db
+class TestJobStatus:
+    def test_users_see_their_own_jobs(self, authentication, api_client):
+        user = authentication()
+        own = baker.make(Job, name="tests.add", user=user)
+        baker.make(Job, name="tests.add")
+
+        response = api_client.get("/api/jobs/")
+        detail = api_client.get(f"/api/jobs/{own.id}/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [job["id"] for job in response.data] == [own.id]
+        assert detail.data["status"] == Job.STATUS_QUEUED
+
+    def test_staff_see_every_job(self, authentication, api_client):
+        authentication(is_staff=True)
+        baker.make(Job, name="tests.add", _quantity=2)
+
+        response = api_client.get("/api/jobs/", {"status": Job.STATUS_QUEUED})
+
+        assert len(response.data) == 2
@@ -0,0 +1,20 @@
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.viewsets import ReadOnlyModelViewSet
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewSet(ReadOnlyModelViewSet):
+    """Status of background jobs: the user's own, or every job for staff."""
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = JobSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["name", "status"]
+
+    def get_queryset(self):
+        queryset = Job.objects.order_by("-id")
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
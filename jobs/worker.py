@@ -0,0 +1,215 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from .models import Job
+from .registry import get_spec, registered
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def saturated_names():
+    """Registered job names that are at their concurrency limit."""
+    limits = {
+        name: spec.concurrency
+        for name, spec in registered().items()
+        if spec.concurrency is not None
+    }
+    if not limits:
+        return []
+    running = (
+        Job.objects.filter(status=Job.STATUS_RUNNING, name__in=limits)
+        .values("name")
+        .annotate(count=Count("id"))
+    )
+    return [row["name"] for row in running if row["count"] >= limits[row["name"]]]
+
+
+def claimable_jobs(names=None):
+    queryset = Job.objects.filter(
+        status=Job.STATUS_QUEUED, run_at__lte=timezone.now()
+    ).order_by("run_at", "id")
+    if names:
+        queryset = queryset.filter(name__in=names)
+    saturated = saturated_names()
+    if saturated:
+        queryset = queryset.exclude(name__in=saturated)
+    return queryset
+
+
+def claim_job(worker_id, names=None):
+    """
+    Mark the next due job as running for `worker_id` and return it, or None.
+
+    Where the database supports it the row is claimed with
+    `SELECT ... FOR UPDATE SKIP LOCKED`, so workers never wait on each other.
+    Elsewhere (SQLite) the claim is a compare-and-set `UPDATE ... WHERE status =
+    'queued'` and a worker that loses the race moves on to the next candidate.
+
+    Concurrency limits are checked at claim time, so workers claiming at the
+    same instant can briefly exceed a limit.
+    """
+    candidates = claimable_jobs(names)
+    changes = {
+        "status": Job.STATUS_RUNNING,
+        "attempts": F("attempts") + 1,
+        "locked_by": worker_id,
+        "locked_at": timezone.now(),
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job_id = (
+                candidates.select_for_update(skip_locked=True)
+                .values_list("id", flat=True)
+                .first()
+            )
+            if job_id is None:
+                return None
+            Job.objects.filter(id=job_id).update(**changes)
+        return Job.objects.get(id=job_id)
+
+    for job_id in candidates.values_list("id", flat=True)[:10]:
+        if Job.objects.filter(id=job_id, status=Job.STATUS_QUEUED).update(**changes):
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def retry_delay(spec, attempts):
+    max_backoff = getattr(settings, "JOB_MAX_BACKOFF", 3600)
+    return min(spec.backoff * 2 ** (attempts - 1), max_backoff)
+
+
+def beat(job):
+    """
+    Refresh `locked_at` on a job this worker still holds; returns False if
+    the lock has been lost.
+    """
+    return bool(
+        Job.objects.filter(
+            id=job.id, status=Job.STATUS_RUNNING, locked_by=job.locked_by
+        ).update(locked_at=timezone.now())
+    )
+
+
+class Heartbeat:
+    """
+    Calls `beat` every `JOB_HEARTBEAT_INTERVAL` seconds from a background
+    thread while a job runs, so `release_stale_jobs` only takes jobs from
+    workers that have stopped.
+    """
+
+    def __init__(self, job, interval=None):
+        self.job = job
+        if interval is None:
+            interval = getattr(settings, "JOB_HEARTBEAT_INTERVAL", 60)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"heartbeat-{job.id}", daemon=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                if not beat(self.job):
+                    logger.warning("job %s lost its lock while running", self.job)
+                    return
+        except Exception:
+            logger.exception("heartbeat for job %s failed", self.job)
+        finally:
+            connection.close()
+
+
+def run_job(job):
+    """
+    Run a claimed job and record its outcome.
+
+    The outcome is only written while the job is still locked by the worker
+    that claimed it; if it was released and claimed again in the meantime,
+    the newer claimant's state wins.
+    """
+    spec = get_spec(job.name)
+    if spec is None:
+        job.status = Job.STATUS_FAILED
+        job.last_error = f"No job registered as {job.name!r}."
+        job.finished_at = timezone.now()
+    else:
+        try:
+            with Heartbeat(job):
+                job.result = spec.func(**job.payload)
+        except Exception:
+            logger.exception("job %s failed (attempt %s)", job, job.attempts)
+            job.last_error = traceback.format_exc()
+            if job.attempts < job.max_attempts:
+                job.status = Job.STATUS_QUEUED
+                job.run_at = timezone.now() + timedelta(
+                    seconds=retry_delay(spec, job.attempts)
+                )
+            else:
+                job.status = Job.STATUS_FAILED
+                job.finished_at = timezone.now()
+        else:
+            job.status = Job.STATUS_SUCCEEDED
+            job.last_error = ""
+            job.finished_at = timezone.now()
+
+    updated = Job.objects.filter(
+        id=job.id, status=Job.STATUS_RUNNING, locked_by=job.locked_by
+    ).update(
+        status=job.status,
+        result=job.result,
+        last_error=job.last_error,
+        run_at=job.run_at,
+        locked_by="",
+        locked_at=None,
+        finished_at=job.finished_at,
+    )
+    if not updated:
+        logger.warning("job %s was released while running; outcome dropped", job)
+    job.locked_by = ""
+    job.locked_at = None
+    return job
+
+
+def release_stale_jobs(timeout=None):
+    """
+    Requeue jobs whose worker has not sent a heartbeat for `JOB_LOCK_TIMEOUT`
+    seconds, presumably because it died, or fail them when they have no
+    attempts left. Returns the number of jobs released.
+    """
+    if timeout is None:
+        timeout = getattr(settings, "JOB_LOCK_TIMEOUT", 600)
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.STATUS_RUNNING, locked_at__lt=now - timedelta(seconds=timeout)
+    )
+    requeued = stale.filter(attempts__lt=F("max_attempts")).update(
+        status=Job.STATUS_QUEUED, locked_by="", locked_at=None
+    )
+    failed = stale.update(
+        status=Job.STATUS_FAILED,
+        locked_by="",
+        locked_at=None,
+        last_error="The worker running this job stopped responding.",
+        finished_at=now,
+    )
+    return requeued + failed
@@ -0,0 +1,143 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from django.conf import settings
+from .cache import (
+    CityKey,
+    find_city,
+    get_engine,
+    hours_cache,
+    hours_key,
+    store_hours,
+)
+from .modules.get_hours import local_today, try_planet_hours
+from .sun_tables import city_hours
+from .timezones import resolve_timezone
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_workers():
+    workers = getattr(settings, "PLANETARY_BATCH_WORKERS", None)
+    if workers is None:
+        return os.cpu_count() or 1
+    return workers
+
+
+def get_pool():
+    """
+    The process pool for large batches, started on first use.
+
+    Workers are spawned rather than forked: forking a threaded server
+    process can copy held locks into the child. They only import the
+    computation module, not Django.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=get_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def compute_hours(keys):
+    """
+    `try_planet_hours` for each of `keys`, in order.
+
+    Batches of at least `PLANETARY_BATCH_PARALLEL_THRESHOLD` keys are spread
+    over the process pool; smaller ones are cheaper to compute here than to
+    ship to other processes.
+    """
+    threshold = getattr(settings, "PLANETARY_BATCH_PARALLEL_THRESHOLD", 64)
+    workers = get_workers()
+    engine = get_engine()
+    if workers > 1 and len(keys) >= threshold:
+        columns = zip(*keys)
+        # A few chunks per worker keeps them evenly loaded.
+        chunksize = max(len(keys) // (workers * 4), 1)
+        try:
+            results = get_pool().map(
+                try_planet_hours, *columns, repeat(engine), chunksize=chunksize
+            )
+            return list(results)
+        except BrokenProcessPool:
+            logger.exception("planetary hours pool died; computing in process")
+            shutdown_pool()
+    return [try_planet_hours(*key, engine) for key in keys]
+
+
+def get_batch_hours(locations):
+    """
+    Hour tables for each validated location, in input order.
+
+    Locations sharing a cache key are computed once, cached tables are
+    reused and cities in the sun table are read from it. Each result is
+    `{"hours": data}` or, when the sun does not rise or set there that day,
+    `{"error": message}`.
+    """
+    keys = []
+    places = {}
+    today = {}
+    for location in locations:
+        timezone = location.get("tz") or resolve_timezone(
+            location["lat"], location["lon"]
+        )
+        if timezone not in today:
+            today[timezone] = local_today(timezone)
+        day = location.get("date") or today[timezone]
+        place = find_city(
+            location["city"], location["lat"], location["lon"], day, timezone
+        )
+        if place is None:
+            keys.append(hours_key(location["lat"], location["lon"], day, timezone))
+        else:
+            keys.append(CityKey(place.name, day, timezone))
+            places[keys[-1]] = place
+
+    results = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        entry = hours_cache.get(key)
+        if entry is not None:
+            results[key] = {"hours": entry[0]}
+        elif key in places:
+            # Reading the table is cheaper than shipping work to the pool.
+            hours = city_hours(places[key], key.day)
+            results[key] = {"hours": store_hours(key, hours)[0]}
+        else:
+            missing.append(key)
+
+    for key, (hours, error) in zip(missing, compute_hours(missing)):
+        if hours is None:
+            results[key] = {"error": error}
+        else:
+            results[key] = {"hours": store_hours(key, hours)[0]}
+
+    return [
+        {
+            "lat": location["lat"],
+            "lon": location["lon"],
+            "city": location["city"],
+            "date": key.day.isoformat(),
+            "tz": key.timezone,
+            **results[key],
+        }
+        for location, key in zip(locations, keys)
+    ]
@@ -0,0 +1,161 @@
+import hashlib
+import time
+from collections import namedtuple
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.utils.http import quote_etag
+from core.cache import TTLCache
+from .modules.get_hours import (
+    DEFAULT_ENGINE,
+    ENGINES,
+    get_planet_hours,
+    hour_boundaries,
+    upcoming_hours,
+)
+from .serializers import PlanetHoursSerizlier
+from .sun_tables import city_hours, find_place
+
+# Bump when the computation or the response shape changes so clients holding
+# an old ETag get the new table.
+HOURS_VERSION = 2
+
+# Per-process cache of serialized hour tables. A table for a given place, date
+# and zone never changes, so entries only leave the cache by LRU eviction.
+hours_cache = TTLCache(maxsize=getattr(settings, "PLANETARY_CACHE_SIZE", 4096))
+# The same tables' hour boundaries as Unix times, for finding the current hour.
+boundaries_cache = TTLCache(maxsize=getattr(settings, "PLANETARY_CACHE_SIZE", 4096))
+
+LocationKey = namedtuple("LocationKey", ["latitude", "longitude", "day", "timezone"])
+CityKey = namedtuple("CityKey", ["city", "day", "timezone"])
+
+
+def get_engine():
+    """The sunrise/sunset engine named by `PLANETARY_SOLAR_ENGINE`."""
+    return getattr(settings, "PLANETARY_SOLAR_ENGINE", DEFAULT_ENGINE)
+
+
+def hours_key(latitude, longitude, day, timezone):
+    """
+    Cache key for a table; coordinates are rounded to
+    `PLANETARY_COORD_PRECISION` decimals.
+
+    At the default of 2 decimals (about 1 km) sunrise and sunset move by a
+    second or two at most, so nearby requests share an entry.
+    """
+    precision = getattr(settings, "PLANETARY_COORD_PRECISION", 2)
+    return LocationKey(
+        round(latitude, precision), round(longitude, precision), day, timezone
+    )
+
+
+def find_city(city, latitude, longitude, day, timezone):
+    """
+    The sun table place for a request, or None to compute it. The table
+    holds NOAA times, so it is only used with that engine.
+    """
+    if get_engine() != "noaa":
+        return None
+    return find_place(city, latitude, longitude, day, timezone)
+
+
+def make_etag(key):
+    # Engines differ by microseconds, which still changes the response.
+    digest = hashlib.sha1(repr((HOURS_VERSION, get_engine(), *key)).encode())
+    return quote_etag(digest.hexdigest()[:24])
+
+
+def get_cached_hours(latitude, longitude, day, timezone, city=None):
+    """
+    Return `(data, etag)` for the hour table at the given place and date.
+
+    A `city` found in the sun table is read from it. Otherwise the table is
+    computed from the rounded coordinates, so every request mapping to a key
+    gets the same data and ETag whichever one filled the cache. `data` is
+    shared between requests and must not be modified.
+    """
+    place = find_city(city, latitude, longitude, day, timezone)
+    if place is not None:
+        key = CityKey(place.name, day, timezone)
+        entry = hours_cache.get(key)
+        if entry is None:
+            entry = store_hours(key, city_hours(place, day))
+        return entry
+
+    key = hours_key(latitude, longitude, day, timezone)
+    entry = hours_cache.get(key)
+    if entry is None:
+        latitude, longitude, day, timezone = key
+        hours = get_planet_hours(
+            latitude,
+            longitude,
+            city_name="",
+            date=day,
+            timezone=timezone,
+            engine=get_engine(),
+        )
+        entry = store_hours(key, hours)
+    return entry
+
+
+def store_hours(key, hours):
+    """Serialize `hours` computed for `key` and cache them; returns the entry."""
+    data = list(PlanetHoursSerizlier(hours, many=True).data)
+    entry = (data, make_etag(key))
+    hours_cache.set(key, entry)
+    return entry
+
+
+def get_boundaries(latitude, longitude, day, timezone, city=None):
+    """
+    The 25 hour boundaries of the table for `day` as Unix times, keyed like
+    `get_cached_hours`. Raises ValueError when the sun does not rise or set.
+    """
+    place = find_city(city, latitude, longitude, day, timezone)
+    if place is None:
+        key = hours_key(latitude, longitude, day, timezone)
+    else:
+        key = CityKey(place.name, day, timezone)
+    boundaries = boundaries_cache.get(key)
+    if boundaries is None:
+        if place is None:
+            engine = ENGINES[get_engine()]
+            times = engine(key.latitude, key.longitude, day, timezone)
+        else:
+            times = place.table.sun_times(place, day)
+        boundaries = [boundary.timestamp() for boundary in hour_boundaries(*times)]
+        boundaries_cache.set(key, boundaries)
+    return boundaries
+
+
+def get_upcoming_hours(latitude, longitude, timezone, count, now=None, city=None):
+    """
+    The planetary hour in progress at `now` (default: the current time) and
+    the `count` after it, as rows of `build_hours` plus their table's `date`.
+    """
+    now = now if now is not None else time.time()
+    day = datetime.fromtimestamp(now, ZoneInfo(timezone)).date()
+    hours = upcoming_hours(
+        lambda day: get_boundaries(latitude, longitude, day, timezone, city),
+        day,
+        now,
+        count,
+    )
+    return [
+        {
+            **row,
+            "date": day,
+            "start_time": datetime.fromtimestamp(row["start_time"], dt_timezone.utc),
+            "end_time": datetime.fromtimestamp(row["end_time"], dt_timezone.utc),
+        }
+        for day, row in hours
+    ]
+
+
+def seconds_until_midnight(timezone, now=None):
+    """Seconds from `now` until the next midnight at `timezone`."""
+    now = now if now is not None else time.time()
+    zone = ZoneInfo(timezone)
+    tomorrow = datetime.fromtimestamp(now, zone).date() + timedelta(days=1)
+    midnight = datetime.combine(tomorrow, dt_time(), zone)
+    return max(int(midnight.timestamp() - now), 1)
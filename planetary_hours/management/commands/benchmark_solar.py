@@ -0,0 +1,87 @@
+import random
+import time
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from planetary_hours.modules.get_hours import (
+    DEFAULT_TIMEZONE,
+    ENGINES,
+    get_planet_hours,
+    get_planet_hours_range,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the sunrise/sunset engines and the planetary-hour table "
+        "built from each, on random non-polar locations and dates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--range-days", type=int, default=365)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        first = date(2000, 1, 1)
+        samples = [
+            (
+                rng.uniform(-60, 60),
+                rng.uniform(-180, 180),
+                first + timedelta(days=rng.randrange(365 * 50)),
+            )
+            for _ in range(options["samples"])
+        ]
+        self.stdout.write(f"{len(samples)} samples, time zone {DEFAULT_TIMEZONE}")
+
+        for name, sun_times in ENGINES.items():
+            self.report(
+                f"{name} sun times",
+                lambda lat, lon, day: sun_times(lat, lon, day, DEFAULT_TIMEZONE),
+                samples,
+                options["repeat"],
+            )
+            self.report(
+                f"{name} hour table",
+                lambda lat, lon, day: get_planet_hours(lat, lon, "", day, engine=name),
+                samples,
+                options["repeat"],
+            )
+
+        days = options["range_days"]
+        self.report(
+            f"vectorized, per day of {days}",
+            lambda lat, lon, day: list(get_planet_hours_range(lat, lon, day, days)),
+            samples[:50],
+            options["repeat"],
+            per=days,
+        )
+        self.compare(samples)
+
+    def report(self, label, func, samples, repeat, per=1):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for sample in samples:
+                func(*sample)
+            elapsed = time.perf_counter() - start
+            timings.append(elapsed / (len(samples) * per) * 1e6)
+        timings.sort()
+        self.stdout.write(
+            f"{label:<28} best={timings[0]:8.2f} us  "
+            f"median={timings[len(timings) // 2]:8.2f} us"
+        )
+
+    def compare(self, samples):
+        worst = 0.0
+        reference = ENGINES["astral"]
+        for name, sun_times in ENGINES.items():
+            if name == "astral":
+                continue
+            for lat, lon, day in samples:
+                expected = reference(lat, lon, day, DEFAULT_TIMEZONE)
+                actual = sun_times(lat, lon, day, DEFAULT_TIMEZONE)
+                for a, b in zip(actual, expected):
+                    worst = max(worst, abs((a - b).total_seconds()))
+            self.stdout.write(f"{name}: largest difference from astral {worst:.6f} s")
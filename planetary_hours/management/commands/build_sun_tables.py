@@ -0,0 +1,65 @@
+import json
+import time
+from datetime import date
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from planetary_hours.modules.suntable import build_table, write_table
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute sunrise and sunset for every city in the gazetteer over a "
+        "span of years into the table read by the planetary-hours endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--gazetteer",
+            default=getattr(settings, "PLANETARY_GAZETTEER", None),
+            help="JSON list of {name, lat, lon, tz, aliases} (default: "
+            "PLANETARY_GAZETTEER).",
+        )
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First date, YYYY-MM-DD (default: January 1 of this year).",
+        )
+        parser.add_argument("--years", type=int, default=5)
+        parser.add_argument(
+            "--output",
+            default=getattr(settings, "PLANETARY_SUN_TABLE", None),
+            help="Table file to write (default: PLANETARY_SUN_TABLE).",
+        )
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            raise CommandError("Pass --output or set PLANETARY_SUN_TABLE.")
+        if not options["gazetteer"]:
+            raise CommandError("Pass --gazetteer or set PLANETARY_GAZETTEER.")
+        if not 1 <= options["years"] <= 50:
+            raise CommandError("--years must be between 1 and 50.")
+
+        start = time.perf_counter()
+        first_day = options["start"] or date(date.today().year, 1, 1)
+        end = first_day.replace(year=first_day.year + options["years"])
+        days = (end - first_day).days
+        with open(options["gazetteer"]) as f:
+            places = json.load(f)
+        try:
+            table = build_table(places, first_day, days)
+        except ValueError as e:
+            raise CommandError(f"Cannot tabulate the gazetteer: {e}")
+
+        output = Path(options["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        # Write aside and rename so running processes never map a partial file.
+        partial = output.with_name(output.name + ".tmp")
+        write_table(partial, places, first_day, table)
+        partial.replace(output)
+
+        self.stdout.write(
+            f"Wrote {len(places)} places from {first_day} to {end} "
+            f"({output.stat().st_size / 1e6:.1f} MB) to {output} "
+            f"in {time.perf_counter() - start:.1f}s."
+        )
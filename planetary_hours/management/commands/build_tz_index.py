@@ -0,0 +1,54 @@
+import json
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from planetary_hours.modules.tzindex import build_index, cell_size_km, write_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rasterize a time zone boundary GeoJSON (e.g. combined.json from "
+        "timezone-boundary-builder) into the index read by the planetary-hours "
+        "endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("geojson", help="FeatureCollection with `tzid` properties")
+        parser.add_argument(
+            "--output",
+            default=getattr(settings, "PLANETARY_TZ_INDEX", None),
+            help="Index file to write (default: PLANETARY_TZ_INDEX).",
+        )
+        parser.add_argument(
+            "--cells-per-degree",
+            type=int,
+            default=10,
+            help="Grid resolution; 10 gives cells of about 11 km.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            raise CommandError("Pass --output or set PLANETARY_TZ_INDEX.")
+        cells_per_degree = options["cells_per_degree"]
+        if not 1 <= cells_per_degree <= 60:
+            raise CommandError("--cells-per-degree must be between 1 and 60.")
+
+        start = time.perf_counter()
+        with open(options["geojson"]) as f:
+            features = json.load(f)["features"]
+        names, grid = build_index(features, cells_per_degree)
+
+        output = Path(options["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        # Write aside and rename so running processes never map a partial file.
+        partial = output.with_name(output.name + ".tmp")
+        write_index(partial, names, grid, cells_per_degree)
+        partial.replace(output)
+
+        self.stdout.write(
+            f"Wrote {len(names)} zones on a {grid.shape[1]}x{grid.shape[0]} grid "
+            f"(~{cell_size_km(cells_per_degree):.1f} km cells, "
+            f"{output.stat().st_size / 1e6:.1f} MB) to {output} "
+            f"in {time.perf_counter() - start:.1f}s."
+        )
@@ -0,0 +1,62 @@
+import logging
+import os
+import threading
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, TypeError):
+        return None
+    return (os.fspath(path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class MappedFile:
+    """
+    The file named by `setting`, opened with `open_file` on first use and
+    reopened whenever the file is replaced.
+
+    The build commands rename a new file over the old one, so every lookup
+    compares the path's inode, mtime and size with those of the open file;
+    a running server picks up a rebuilt (or newly built) file on its next
+    request. The old object is left to the garbage collector rather than
+    closed, as another thread may still be reading it. None while the file
+    does not exist, logging `missing` once at `level`.
+    """
+
+    def __init__(self, setting, open_file, missing, level=logging.INFO):
+        self.setting = setting
+        self.open_file = open_file
+        self.missing = missing
+        self.level = level
+        self._value = None
+        self._signature = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        path = getattr(settings, self.setting, None)
+        signature = _signature(path) if path else None
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._value = self._open(path, signature)
+                    self._signature = signature
+        return self._value
+
+    def _open(self, path, signature):
+        if signature is not None:
+            try:
+                return self.open_file(path)
+            except FileNotFoundError:
+                pass
+        if path:
+            logger.log(self.level, self.missing, path)
+        return None
+
+    def reset(self):
+        with self._lock:
+            self._value = None
+            self._signature = False
@@ -1,10 +1,17 @@
-from datetime import datetime, timedelta
-from astral import LocationInfo
-from astral.sun import sun
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+from astral import Observer
+from astral import sun as astral_sun
+import numpy as np
+from . import solar
 from .utils import get_time
 
 
+DEFAULT_TIMEZONE = "Asia/Tehran"
+
 PLANETS = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
+PLANET_NAMES = [planet.lower() for planet in PLANETS]
 
 DAY_PLANET = {
     5: "Saturn",    # saturday
@@ -16,65 +23,198 @@ DAY_PLANET = {
     4: "Venus",     # Friday
 }
 
-def get_planet_hours(latitude: float, longitude: float, city_name: str, date: str = None):
 
-    location = LocationInfo(
-        name=city_name,
-        region='Custom',
-        timezone="Asia/Tehran",
-        latitude=latitude,
-        longitude=longitude
-    )
+def local_today(timezone: str = DEFAULT_TIMEZONE):
+    """The current date at `timezone`, which is what "today" means for a location."""
+    return datetime.now(ZoneInfo(timezone)).date()
 
-    today = datetime.today().date() if not date else get_time(date).date()
 
-    sun_times = sun(
-        observer=location.observer,
-        date=today,
-        tzinfo=location.timezone
+def astral_sun_times(latitude, longitude, day, timezone):
+    """Sunrise and sunset on `day` and the next sunrise, from astral."""
+    observer = Observer(latitude=latitude, longitude=longitude)
+    return (
+        astral_sun.sunrise(observer, day, tzinfo=timezone),
+        astral_sun.sunset(observer, day, tzinfo=timezone),
+        astral_sun.sunrise(observer, day + timedelta(days=1), tzinfo=timezone),
     )
-    sunrise, sunset = sun_times["sunrise"], sun_times["sunset"]
 
-    tomorrow = today + timedelta(days=1)
-    sun_times_tommorow = sun(
-        observer=location.observer,
-        date=tomorrow,
-        tzinfo=location.timezone
+
+# Interchangeable sunrise/sunset implementations. "noaa" is ours (see
+# `solar`); "astral" is the reference it is tested against.
+ENGINES = {
+    "astral": astral_sun_times,
+    "noaa": solar.sun_times,
+}
+DEFAULT_ENGINE = "noaa"
+
+
+def get_planet_hours(
+    latitude: float,
+    longitude: float,
+    city_name: str,
+    date=None,
+    timezone: str = DEFAULT_TIMEZONE,
+    engine: str = DEFAULT_ENGINE,
+):
+    """
+    The 24 planetary hours from sunrise on `date` to sunrise the next day.
+
+    `date` is a `datetime.date` or a YYYY-MM-DD string and defaults to today
+    at `timezone`. `engine` names one of `ENGINES`. Raises ValueError when
+    the sun does not rise or set that day.
+    """
+    if not date:
+        today = local_today(timezone)
+    elif isinstance(date, str):
+        today = get_time(date).date()
+    else:
+        today = date
+
+    sunrise, sunset, next_sunrise = ENGINES[engine](
+        latitude, longitude, today, timezone
     )
-    next_sunrise = sun_times_tommorow["sunrise"]
+    return build_hours(hour_boundaries(sunrise, sunset, next_sunrise), today.weekday())
+
+
+def try_planet_hours(
+    latitude, longitude, date, timezone=DEFAULT_TIMEZONE, engine=DEFAULT_ENGINE
+):
+    """
+    `(hours, None)`, or `(None, message)` when the sun does not rise or set
+    on `date`.
+
+    Batch workers call this in other processes, where one polar location
+    should not fail the whole batch.
+    """
+    try:
+        hours = get_planet_hours(latitude, longitude, "", date, timezone, engine)
+        return hours, None
+    except ValueError as e:
+        return None, str(e)
+
 
+def hour_boundaries(sunrise, sunset, next_sunrise):
+    """
+    The 25 boundaries of the planetary hours: twelve equal day hours from
+    `sunrise` to `sunset`, then twelve night hours until `next_sunrise`.
+    """
+    # Aware datetimes sharing a zone subtract in wall-clock time, which is off
+    # by the shift on the night clocks change, so divide in UTC.
+    zone = sunrise.tzinfo
+    sunrise, sunset, next_sunrise = (
+        moment.astimezone(dt_timezone.utc) for moment in (sunrise, sunset, next_sunrise)
+    )
     day_length = (sunset - sunrise) / 12
     night_length = (next_sunrise - sunset) / 12
 
-    weekday = today.weekday()
-    first_planet = DAY_PLANET[weekday]
-    start_index = PLANETS.index(first_planet)
+    boundaries = [sunrise]
+    for i in range(24):
+        boundaries.append(boundaries[-1] + (day_length if i < 12 else night_length))
+    return [boundary.astimezone(zone) for boundary in boundaries]
+
+
+def build_hours(boundaries, weekday):
+    """The 24 hour rows between `boundaries`, ruled from the day's planet on."""
+    start_index = PLANETS.index(DAY_PLANET[weekday])
+    return [
+        {
+            "hour": i + 1,
+            "planet": PLANET_NAMES[(start_index + i) % 7],
+            "start_time": boundaries[i],
+            "end_time": boundaries[i + 1],
+        }
+        for i in range(24)
+    ]
+
+
+def upcoming_hours(day_boundaries, day, now, count):
+    """
+    The planetary hour containing the Unix time `now` and the `count` hours
+    after it, as `(date, row)` pairs with rows shaped like `build_hours`.
+
+    `day_boundaries(date)` returns that date's 25 hour boundaries as Unix
+    times, and `day` is the local date at `now`. Before sunrise the current
+    hour is one of the previous day's night hours; the following hours run
+    on into later days as needed.
+    """
+    boundaries = day_boundaries(day)
+    if now < boundaries[0]:
+        day -= timedelta(days=1)
+        boundaries = day_boundaries(day)
+    index = bisect_right(boundaries, now) - 1
 
     hours = []
-    current_time = sunrise
-
-    for i in range(12):
-        planet = PLANETS[(start_index + i) % 7]
-        end_time = current_time + day_length
-        hours.append({
-            "hour": i + 1, 
-            "planet": planet.lower(),
-            "start_time": current_time,
-            "end_time": end_time
-        })
-        current_time = end_time
-
-    for i in range(12):
-        planet = PLANETS[(start_index + 12 + i) % 7]
-        end_time = current_time + night_length
-        hours.append({
-            "hour": i + 13, 
-            "planet": planet.lower(),
-            "start_time": current_time,
-            "end_time": end_time
-        })
-        current_time = end_time
-
-    
-    return hours
+    while True:
+        rows = build_hours(boundaries, day.weekday())[index:]
+        hours.extend((day, row) for row in rows)
+        if len(hours) > count:
+            return hours[: count + 1]
+        day += timedelta(days=1)
+        boundaries = day_boundaries(day)
+        index = 0
+
+
+def get_planet_hours_range(
+    latitude: float,
+    longitude: float,
+    first_day,
+    days: int,
+    timezone: str = DEFAULT_TIMEZONE,
+    engine: str = DEFAULT_ENGINE,
+):
+    """
+    Return an iterator of `(date, hours, error)` for `days` consecutive dates
+    from `first_day`; `error` says why a date where the sun does not rise or
+    set has no `hours`.
+
+    With the "noaa" engine, sunrise and sunset for the whole range come from
+    one vectorized pass (see `solar.sun_events`), each sunrise closing the
+    previous night; other engines are called day by day. Times are ISO 8601
+    strings in UTC, as the serializers render them.
+    """
+    if engine == "noaa":
+        sunrise, sunset = solar.sun_events(
+            latitude, longitude, first_day, days, timezone, strict=False
+        )
+        steps = np.arange(12) / 12
+        boundaries = np.concatenate(
+            [
+                sunrise[:-1, None] + (sunset - sunrise[:-1])[:, None] * steps,
+                sunset[:, None] + (sunrise[1:] - sunset)[:, None] * steps,
+                sunrise[1:, None],
+            ],
+            axis=1,
+        )
+    else:
+        boundaries = np.full((days, 25), np.nan)
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            try:
+                times = ENGINES[engine](latitude, longitude, day, timezone)
+            except ValueError:
+                continue
+            boundaries[offset] = [b.timestamp() for b in hour_boundaries(*times)]
+    missing = np.isnan(boundaries).any(axis=1).tolist()
+    micros = np.rint(np.nan_to_num(boundaries) * 1e6).astype("int64")
+    formatted = np.char.add(
+        np.datetime_as_string(micros.astype("datetime64[us]"), unit="us"), "Z"
+    ).tolist()
+
+    dates = (first_day + timedelta(days=offset) for offset in range(days))
+    return (
+        (
+            (day, None, day_error(latitude, longitude, day, timezone, engine))
+            if failed
+            else (day, build_hours(row, day.weekday()), None)
+        )
+        for day, row, failed in zip(dates, formatted, missing)
+    )
+
 
+def day_error(latitude, longitude, day, timezone, engine=DEFAULT_ENGINE):
+    """Why the sun times for `day` cannot be computed, as `engine` says."""
+    try:
+        ENGINES[engine](latitude, longitude, day, timezone)
+    except ValueError as e:
+        return str(e)
+    return f"There is no sunrise or sunset on {day} local time."
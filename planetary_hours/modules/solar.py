@@ -0,0 +1,275 @@
+"""
+Sunrise and sunset from NOAA's solar calculator equations.
+
+The equations are those of `astral.sun`, including its two-pass refinement
+and refraction correction. `sun_times` evaluates them with `math` for a
+single date; `sun_events` evaluates them with NumPy over whole arrays of
+days at once.
+"""
+
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from math import radians, tan
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+import numpy as np
+
+# Sun's apparent radius in degrees (32 arc minutes across).
+SUN_APPARENT_RADIUS = 32.0 / (60.0 * 2.0)
+
+RISING = 1
+SETTING = -1
+EVENT_NAMES = {RISING: "sunrise", SETTING: "sunset"}
+
+# Julian day of 0001-01-01T00:00 UTC minus its proleptic ordinal (1), and of
+# the Unix epoch.
+ORDINAL_JD = 1721424.5
+UNIX_EPOCH_JD = 2440587.5
+J2000 = 2451545.0
+UNIX_EPOCH_ORDINAL = 719163
+
+# The part of NumPy's API the equations use, for plain floats.
+SCALAR = SimpleNamespace(
+    sin=math.sin,
+    cos=math.cos,
+    tan=math.tan,
+    radians=math.radians,
+    degrees=math.degrees,
+    arcsin=math.asin,
+)
+
+
+class PolarError(ValueError):
+    """The sun does not cross the horizon: `kind` is "day" or "night"."""
+
+    def __init__(self, day, kind):
+        self.day = day
+        self.kind = kind
+        event = "set" if kind == "day" else "rise"
+        super().__init__(f"The sun does not {event} on {day} here (polar {kind}).")
+
+
+def refraction_at_zenith(zenith):
+    """Degrees of atmospheric refraction for the sun at `zenith`."""
+    elevation = 90 - zenith
+    if elevation >= 85.0:
+        return 0.0
+    te = tan(radians(elevation))
+    if elevation > 5.0:
+        correction = 58.1 / te - 0.07 / te**3 + 0.000086 / te**5
+    elif elevation > -0.575:
+        correction = 1735.0 + elevation * (
+            -518.2 + elevation * (103.4 + elevation * (-12.79 + elevation * 0.711))
+        )
+    else:
+        correction = -20.774 / te
+    return correction / 3600.0
+
+
+HORIZON_ZENITH = (
+    90.0 + SUN_APPARENT_RADIUS + refraction_at_zenith(90.0 + SUN_APPARENT_RADIUS)
+)
+
+
+def julian_days(first_day, count):
+    """Julian days at 0h UTC of `count` consecutive dates from `first_day`."""
+    return first_day.toordinal() + ORDINAL_JD + np.arange(count, dtype=float)
+
+
+def declination_and_eq_of_time(jc, np=np):
+    """
+    Solar declination (degrees) and equation of time (minutes) at Julian
+    century `jc`, an array or, with `np=SCALAR`, a float.
+    """
+    l0 = np.radians((280.46646 + jc * (36000.76983 + 0.0003032 * jc)) % 360.0)
+    m = np.radians(357.52911 + jc * (35999.05029 - 0.0001537 * jc))
+    e = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)
+    c = (
+        np.sin(m) * (1.914602 - jc * (0.004817 + 0.000014 * jc))
+        + np.sin(2 * m) * (0.019993 - 0.000101 * jc)
+        + np.sin(3 * m) * 0.000289
+    )
+    omega = np.radians(125.04 - 1934.136 * jc)
+    apparent_long = np.radians(np.degrees(l0) + c - 0.00569 - 0.00478 * np.sin(omega))
+    seconds = 21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))
+    obliquity = np.radians(
+        23.0 + (26.0 + seconds / 60.0) / 60.0 + 0.00256 * np.cos(omega)
+    )
+
+    declination = np.degrees(np.arcsin(np.sin(obliquity) * np.sin(apparent_long)))
+
+    y = np.tan(obliquity / 2.0) ** 2
+    eq_of_time = 4.0 * np.degrees(
+        y * np.sin(2 * l0)
+        - 2.0 * e * np.sin(m)
+        + 4.0 * e * y * np.sin(m) * np.cos(2 * l0)
+        - 0.5 * y * y * np.sin(4 * l0)
+        - 1.25 * e * e * np.sin(2 * m)
+    )
+    return declination, eq_of_time
+
+
+def transit_minutes(latitude, longitude, jd, direction):
+    """
+    Minutes after 0h UTC of each day in `jd` at which the sun crosses the
+    horizon in `direction`; NaN on days it doesn't.
+    """
+    latitude = np.radians(min(max(latitude, -89.8), 89.8))
+    cos_zenith = np.cos(np.radians(HORIZON_ZENITH))
+    adjustment = 0.0
+    for _ in range(2):
+        jc = (jd + adjustment - J2000) / 36525.0
+        declination, eq_of_time = declination_and_eq_of_time(jc)
+        declination = np.radians(declination)
+        h = (cos_zenith - np.sin(latitude) * np.sin(declination)) / (
+            np.cos(latitude) * np.cos(declination)
+        )
+        with np.errstate(invalid="ignore"):
+            hour_angle = direction * np.degrees(np.arccos(h))
+        offset = (-longitude - hour_angle) * 4.0 - eq_of_time
+        offset = np.where(offset < -720.0, offset + 1440.0, offset)
+        minutes = 720.0 + offset
+        adjustment = minutes / 1440.0
+    return minutes
+
+
+def transit_timestamp(latitude, longitude, day, direction):
+    """
+    Unix timestamp at which the sun crosses the horizon in `direction` on
+    the UTC date `day`.
+
+    Raises PolarError if it does not.
+    """
+    latitude = radians(min(max(latitude, -89.8), 89.8))
+    sin_lat, cos_lat = math.sin(latitude), math.cos(latitude)
+    cos_zenith = math.cos(radians(HORIZON_ZENITH))
+    jd = day.toordinal() + ORDINAL_JD
+    adjustment = 0.0
+    for _ in range(2):
+        jc = (jd + adjustment - J2000) / 36525.0
+        declination, eq_of_time = declination_and_eq_of_time(jc, SCALAR)
+        declination = radians(declination)
+        h = (cos_zenith - sin_lat * math.sin(declination)) / (
+            cos_lat * math.cos(declination)
+        )
+        if not -1.0 <= h <= 1.0:
+            raise PolarError(day, "night" if h > 1.0 else "day")
+        hour_angle = direction * math.degrees(math.acos(h))
+        offset = (-longitude - hour_angle) * 4.0 - eq_of_time
+        if offset < -720.0:
+            offset += 1440.0
+        minutes = 720.0 + offset
+        adjustment = minutes / 1440.0
+    return (jd - UNIX_EPOCH_JD) * 86400.0 + minutes * 60.0
+
+
+def local_event(latitude, longitude, day, zone, direction):
+    """
+    The horizon crossing in `direction` on the local date `day`, as an aware
+    datetime at `zone`.
+
+    Like astral, this computes the event for the UTC date `day` and, if that
+    falls on another local date, takes the neighbouring day's instead. Where
+    neither is on `day` (the event drifts past local midnight) it raises
+    ValueError.
+    """
+    event = datetime.fromtimestamp(
+        transit_timestamp(latitude, longitude, day, direction), zone
+    )
+    if event.date() != day:
+        neighbour = day + timedelta(days=1 if event.date() < day else -1)
+        event = datetime.fromtimestamp(
+            transit_timestamp(latitude, longitude, neighbour, direction), zone
+        )
+        if event.date() != day:
+            raise missing_event(direction, day)
+    return event
+
+
+def missing_event(direction, day):
+    return ValueError(f"There is no {EVENT_NAMES[direction]} on {day} local time.")
+
+
+def sun_times(latitude, longitude, day, timezone):
+    """
+    Sunrise and sunset on the local date `day` and the next sunrise, as
+    aware datetimes at `timezone`.
+
+    Raises PolarError during polar day or night.
+    """
+    zone = ZoneInfo(timezone)
+    return (
+        local_event(latitude, longitude, day, zone, RISING),
+        local_event(latitude, longitude, day, zone, SETTING),
+        local_event(latitude, longitude, day + timedelta(days=1), zone, RISING),
+    )
+
+
+def polar_kind(latitude, day):
+    """Whether a date without sunrise or sunset is polar "day" or "night"."""
+    jc = (day.toordinal() + ORDINAL_JD + 0.5 - J2000) / 36525.0
+    declination, _ = declination_and_eq_of_time(jc, SCALAR)
+    return "day" if (latitude > 0) == (declination > 0) else "night"
+
+
+def _on_local_dates(events, first_day, count, zone, direction, strict=True):
+    """
+    For each of `count` local dates from `first_day`, the event in `events`
+    that falls on it.
+
+    `events[i]` is the event computed for the UTC date `first_day + i - 1`.
+    As in `local_event`, when that lands on another local date the
+    neighbouring day's event is used instead. A date with no event is NaN,
+    or raises ValueError if `strict`.
+    """
+    finite = np.nan_to_num(events)
+    offsets = np.array(
+        [
+            datetime.fromtimestamp(ts, dt_timezone.utc)
+            .astimezone(zone)
+            .utcoffset()
+            .total_seconds()
+            for ts in finite.tolist()
+        ]
+    )
+    local_days = np.floor((finite + offsets) / 86400)
+    target = first_day.toordinal() - UNIX_EPOCH_ORDINAL + np.arange(count)
+    index = np.arange(1, count + 1)
+    index += np.sign(target - local_days[index]).astype(int)
+    result = events[index]
+    stray = ~np.isnan(result) & (local_days[index] != target)
+    if stray.any():
+        if strict:
+            day = first_day + timedelta(days=int(stray.argmax()))
+            raise missing_event(direction, day)
+        result[stray] = np.nan
+    return result
+
+
+def sun_events(latitude, longitude, first_day, count, timezone, strict=True):
+    """
+    Unix timestamps of sunrise on `count + 1` and sunset on `count`
+    consecutive local dates from `first_day`.
+
+    The extra sunrise ends the last night. If the sun does not rise or set
+    on one of the dates this raises ValueError (PolarError during polar day
+    or night), or with `strict=False` leaves that date's event NaN.
+    """
+    zone = ZoneInfo(timezone)
+    jd = julian_days(first_day, count + 3) - 1
+    base = (jd - UNIX_EPOCH_JD) * 86400.0
+    rising = base + 60.0 * transit_minutes(latitude, longitude, jd, RISING)
+    setting = base + 60.0 * transit_minutes(latitude, longitude, jd, SETTING)
+
+    sunrise = _on_local_dates(rising, first_day, count + 1, zone, RISING, strict)
+    sunset = _on_local_dates(setting, first_day, count, zone, SETTING, strict)
+    if not strict:
+        return sunrise, sunset
+    missing = np.flatnonzero(np.isnan(sunrise[:-1]) | np.isnan(sunset))
+    if missing.size:
+        day = first_day + timedelta(days=int(missing[0]))
+        raise PolarError(day, polar_kind(latitude, day))
+    if np.isnan(sunrise[-1]):
+        day = first_day + timedelta(days=count)
+        raise PolarError(day, polar_kind(latitude, day))
+    return sunrise, sunset
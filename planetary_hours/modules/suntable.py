@@ -0,0 +1,152 @@
+"""
+Precomputed sunrise and sunset for a fixed list of places.
+
+A table file holds, for every place and every day of its horizon plus one,
+a fixed-width record of that local date's sunrise and sunset as float64
+Unix timestamps. The record for (place, day) sits at a computed offset, so
+answering a known city is two reads from a memory-mapped file whose pages
+the OS shares between worker processes.
+
+File layout (little-endian):
+
+    b"SUN1", first date as a proleptic ordinal (u32), days (u32),
+    place count (u16); then per place its latitude and longitude (f64),
+    and its name, aliases (newline-separated) and time zone, each a u16
+    length and UTF-8 bytes; zero padding to a multiple of 8; then
+    place count * (days + 1) records of (sunrise, sunset) as f64 pairs,
+    place by place.
+"""
+
+import mmap
+import struct
+from datetime import date, datetime
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+import numpy as np
+from . import solar
+
+MAGIC = b"SUN1"
+HEADER = struct.Struct("<4sIIH")
+COORDINATES = struct.Struct("<dd")
+LENGTH = struct.Struct("<H")
+RECORD = struct.Struct("<dd")
+
+
+class Place(NamedTuple):
+    name: str
+    latitude: float
+    longitude: float
+    timezone: str
+    number: int
+    # The table the place was read from, whose records `number` indexes.
+    table: "SunTable"
+
+
+def build_table(places, first_day, days):
+    """
+    Sun times for `places` (gazetteer dicts with name, lat, lon and tz) on
+    `days + 1` local dates from `first_day`, as an array of shape
+    `(len(places), days + 1, 2)`.
+
+    Raises PolarError for a place where the sun does not rise or set.
+    """
+    table = np.empty((len(places), days + 1, 2))
+    for number, place in enumerate(places):
+        sunrise, sunset = solar.sun_events(
+            place["lat"], place["lon"], first_day, days + 1, place["tz"]
+        )
+        table[number, :, 0] = sunrise[:-1]
+        table[number, :, 1] = sunset
+    return table
+
+
+def _pack_text(value):
+    encoded = value.encode()
+    return LENGTH.pack(len(encoded)) + encoded
+
+
+def write_table(path, places, first_day, table):
+    days = table.shape[1] - 1
+    with open(path, "wb") as f:
+        header = HEADER.pack(MAGIC, first_day.toordinal(), days, len(places))
+        for place in places:
+            header += COORDINATES.pack(place["lat"], place["lon"])
+            header += _pack_text(place["name"])
+            header += _pack_text("\n".join(place.get("aliases", ())))
+            header += _pack_text(place["tz"])
+        f.write(header + b"\0" * (-len(header) % 8))
+        f.write(np.ascontiguousarray(table, dtype="<f8").tobytes())
+
+
+class SunTable:
+    """A memory-mapped table written by `write_table`."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, first, self.days, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a sun table")
+        self.first_day = date.fromordinal(first)
+        self._first = first
+
+        offset = HEADER.size
+        self.places = []
+        self._by_name = {}
+        for number in range(count):
+            latitude, longitude = COORDINATES.unpack_from(self._map, offset)
+            offset += COORDINATES.size
+            texts = []
+            for _ in range(3):
+                (length,) = LENGTH.unpack_from(self._map, offset)
+                offset += LENGTH.size
+                texts.append(self._map[offset : offset + length].decode())
+                offset += length
+            name, aliases, timezone = texts
+            place = Place(name, latitude, longitude, timezone, number, self)
+            self.places.append(place)
+            for alias in [name, *aliases.split("\n")]:
+                if alias:
+                    self._by_name[alias.casefold()] = place
+        self._records = offset + (-offset % 8)
+        self._zones = {}
+
+    def close(self):
+        self._map.close()
+
+    def covers(self, day):
+        return 0 <= day.toordinal() - self._first < self.days
+
+    def find(self, name, latitude, longitude, timezone, tolerance):
+        """
+        The place called `name` if it lies within `tolerance` degrees of the
+        given coordinates and uses `timezone`, else None.
+        """
+        place = self._by_name.get(name.strip().casefold())
+        if (
+            place is None
+            or place.timezone != timezone
+            or abs(place.latitude - latitude) > tolerance
+            or abs(place.longitude - longitude) > tolerance
+        ):
+            return None
+        return place
+
+    def sun_times(self, place, day):
+        """
+        Sunrise and sunset on `day` and the next sunrise at `place`, as
+        aware datetimes in its time zone, like `solar.sun_times`.
+        """
+        offset = self._records + RECORD.size * (
+            place.number * (self.days + 1) + day.toordinal() - self._first
+        )
+        sunrise, sunset = RECORD.unpack_from(self._map, offset)
+        next_sunrise = RECORD.unpack_from(self._map, offset + RECORD.size)[0]
+        zone = self._zones.get(place.timezone)
+        if zone is None:
+            zone = self._zones[place.timezone] = ZoneInfo(place.timezone)
+        return (
+            datetime.fromtimestamp(sunrise, zone),
+            datetime.fromtimestamp(sunset, zone),
+            datetime.fromtimestamp(next_sunrise, zone),
+        )
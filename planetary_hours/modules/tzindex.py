@@ -0,0 +1,175 @@
+"""
+Offline coordinates-to-time-zone lookup.
+
+The index is a grid of equal-angle cells, each holding the number of the
+IANA zone covering its centre, built once from a time zone boundary GeoJSON
+(e.g. timezone-boundary-builder's release) and memory-mapped at runtime. A
+lookup reads two bytes, so it costs about a microsecond and the file's pages
+are shared between worker processes.
+
+File layout (little-endian):
+
+    b"TZI1", cells per degree (u16), rows (u32), columns (u32),
+    zone count (u16), then per zone its UTF-8 name's length (u16) and bytes,
+    zero padding to an even offset, then rows * columns u16 cells from the
+    north-west corner, row by row. Cell value 0 means no zone; n means the
+    n-th name.
+"""
+
+import math
+import mmap
+import struct
+import numpy as np
+
+MAGIC = b"TZI1"
+HEADER = struct.Struct("<4sHIIH")
+CELL = struct.Struct("<H")
+
+
+def fallback_timezone(longitude):
+    """The nautical `Etc/GMT` zone for `longitude`, for places outside any zone."""
+    hours = round(longitude / 15)
+    if hours == 0:
+        return "Etc/GMT"
+    # Etc/GMT zones have POSIX signs: Etc/GMT-3 is three hours ahead of UTC.
+    return f"Etc/GMT{-hours:+d}"
+
+
+class TimezoneIndex:
+    """A memory-mapped index written by `write_index`."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.cells_per_degree, self.rows, self.cols, count = HEADER.unpack_from(
+            self._map, 0
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a time zone index")
+        offset = HEADER.size
+        self.names = []
+        for _ in range(count):
+            (length,) = CELL.unpack_from(self._map, offset)
+            offset += CELL.size
+            self.names.append(self._map[offset : offset + length].decode())
+            offset += length
+        self._cells = offset + offset % 2
+
+    def close(self):
+        self._map.close()
+
+    def _cell(self, row, col):
+        return CELL.unpack_from(self._map, self._cells + 2 * (row * self.cols + col))[0]
+
+    def lookup(self, latitude, longitude):
+        """
+        The zone name at the given point, or None outside every zone.
+
+        A point in an empty cell takes the zone of an adjacent cell, so
+        places on a coast or a border drawn finer than the grid still
+        resolve.
+        """
+        row = min(max(int((90.0 - latitude) * self.cells_per_degree), 0), self.rows - 1)
+        col = int((longitude + 180.0) * self.cells_per_degree) % self.cols
+        value = self._cell(row, col)
+        if not value:
+            for r, c in (
+                (row - 1, col),
+                (row + 1, col),
+                (row, col - 1),
+                (row, col + 1),
+                (row - 1, col - 1),
+                (row - 1, col + 1),
+                (row + 1, col - 1),
+                (row + 1, col + 1),
+            ):
+                if 0 <= r < self.rows and (value := self._cell(r, c % self.cols)):
+                    break
+        return self.names[value - 1] if value else None
+
+
+def _polygons(geometry):
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def fill_polygon(grid, rings, value, cells_per_degree):
+    """
+    Set the cells of `grid` whose centres lie inside the polygon `rings`
+    (GeoJSON order: outer ring, then holes) to `value`.
+
+    Scanline fill with the even-odd rule, vectorized over the polygon's
+    edges: every edge yields its crossings with the row centres it spans,
+    and the sorted crossings of each row pair up into filled runs.
+    """
+    rows, cols = grid.shape
+    edges = []
+    for ring in rings:
+        points = np.asarray(ring, dtype=float)[:, :2]
+        if not np.array_equal(points[0], points[-1]):
+            points = np.vstack([points, points[:1]])
+        edges.append(np.hstack([points[:-1], points[1:]]))
+    if not edges:
+        return
+    x0, y0, x1, y1 = np.vstack(edges).T
+
+    # Row and column coordinates in which cell centres are integers.
+    v0 = (90.0 - y0) * cells_per_degree - 0.5
+    v1 = (90.0 - y1) * cells_per_degree - 0.5
+    first = np.maximum(np.floor(np.minimum(v0, v1)) + 1, 0).astype(np.int64)
+    last = np.minimum(np.floor(np.maximum(v0, v1)), rows - 1).astype(np.int64)
+    counts = np.maximum(last - first + 1, 0)
+    total = int(counts.sum())
+    if not total:
+        return
+
+    edge = np.repeat(np.arange(len(counts)), counts)
+    row = first[edge] + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    t = (row - v0[edge]) / (v1[edge] - v0[edge])
+    x = x0[edge] + t * (x1[edge] - x0[edge])
+    col = np.ceil((x + 180.0) * cells_per_degree - 0.5).astype(np.int64)
+
+    order = np.lexsort((col, row))
+    row, col = row[order], col[order]
+    for r, start, end in zip(row[0::2], col[0::2], col[1::2]):
+        grid[r, max(start, 0) : min(end, cols)] = value
+
+
+def build_index(features, cells_per_degree=10):
+    """
+    Rasterize GeoJSON features with a `tzid` property into `(names, grid)`.
+
+    Where zones overlap (disputed areas) the later feature wins.
+    """
+    grid = np.zeros((180 * cells_per_degree, 360 * cells_per_degree), dtype="<u2")
+    names = []
+    numbers = {}
+    for feature in features:
+        name = feature["properties"]["tzid"]
+        if name not in numbers:
+            names.append(name)
+            numbers[name] = len(names)
+        for rings in _polygons(feature["geometry"]):
+            fill_polygon(grid, rings, numbers[name], cells_per_degree)
+    return names, grid
+
+
+def write_index(path, names, grid, cells_per_degree):
+    rows, cols = grid.shape
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, cells_per_degree, rows, cols, len(names)))
+        offset = HEADER.size
+        for name in names:
+            encoded = name.encode()
+            f.write(CELL.pack(len(encoded)) + encoded)
+            offset += CELL.size + len(encoded)
+        f.write(b"\0" * (offset % 2))
+        f.write(np.ascontiguousarray(grid, dtype="<u2").tobytes())
+
+
+def cell_size_km(cells_per_degree):
+    """Height of a grid cell in kilometres, for reporting."""
+    return math.pi * 6371.0 / 180.0 / cells_per_degree
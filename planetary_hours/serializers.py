@@ -1,4 +1,15 @@
+from datetime import date
+from zoneinfo import ZoneInfo
+from django.conf import settings
 from rest_framework import serializers
+from .modules.utils import get_time
+
+
+def validate_timezone(value):
+    try:
+        ZoneInfo(value)
+    except (KeyError, ValueError):
+        raise serializers.ValidationError(f"Unknown time zone '{value}'.")
 
 
 class PlanetRequestQuerySerizlier(serializers.Serializer):
@@ -6,10 +17,65 @@ class PlanetRequestQuerySerizlier(serializers.Serializer):
     lon = serializers.FloatField(required=True)
     city = serializers.CharField(required=True)
     date = serializers.CharField(required=False)
+    tz = serializers.CharField(required=False, validators=[validate_timezone])
+
+    def validate_date(self, value):
+        try:
+            return get_time(value).date()
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+
+class PlanetBatchSerializer(serializers.Serializer):
+    locations = PlanetRequestQuerySerizlier(
+        many=True,
+        allow_empty=False,
+        max_length=getattr(settings, "PLANETARY_BATCH_MAX_SIZE", 1000),
+    )
+
+
+class PlanetRangeQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(required=True)
+    lon = serializers.FloatField(required=True)
+    start = serializers.DateField(required=False, input_formats=["%Y-%m-%d"])
+    tz = serializers.CharField(required=False, validators=[validate_timezone])
+    days = serializers.IntegerField(
+        min_value=1, max_value=getattr(settings, "PLANETARY_RANGE_MAX_DAYS", 366)
+    )
+
+    def validate(self, attrs):
+        # The tables also read the day before `start` and the day after the
+        # last one; keep a further day of margin for time zone offsets.
+        start = attrs.get("start")
+        if start is not None and not (
+            date.min.toordinal() + 2
+            <= start.toordinal()
+            <= date.max.toordinal() - attrs["days"] - 2
+        ):
+            raise serializers.ValidationError(
+                {"start": "The range must lie between years 1 and 9999."}
+            )
+        return attrs
+
+
+class PlanetUpcomingQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(required=True)
+    lon = serializers.FloatField(required=True)
+    city = serializers.CharField(required=False)
+    tz = serializers.CharField(required=False, validators=[validate_timezone])
+    count = serializers.IntegerField(
+        default=1,
+        min_value=0,
+        max_value=getattr(settings, "PLANETARY_UPCOMING_MAX_HOURS", 168),
+    )
 
 
 class PlanetHoursSerizlier(serializers.Serializer):
     hour = serializers.IntegerField()
     planet = serializers.CharField(max_length=50)
     start_time = serializers.DateTimeField()
-    end_time = serializers.DateTimeField()
\ No newline at end of file
+    end_time = serializers.DateTimeField()
+
+
+class PlanetUpcomingHourSerializer(PlanetHoursSerizlier):
+    date = serializers.DateField()
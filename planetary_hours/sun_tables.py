@@ -0,0 +1,45 @@
+from django.conf import settings
+from .mapped import MappedFile
+from .modules.get_hours import build_hours, hour_boundaries
+from .modules.suntable import SunTable
+
+_table = MappedFile(
+    "PLANETARY_SUN_TABLE",
+    SunTable,
+    "no sun table at %s; computing every location",
+)
+
+
+def get_sun_table():
+    """
+    The table at `PLANETARY_SUN_TABLE`, mapped on first use and remapped
+    when the file is rebuilt; None if it has not been built (see the
+    build_sun_tables command).
+    """
+    return _table.get()
+
+
+def reset_sun_table():
+    _table.reset()
+
+
+def find_place(city, latitude, longitude, day, timezone):
+    """
+    The gazetteer place answering a request for `city` at the given point,
+    date and zone, or None when it must be computed.
+
+    The name must match and the coordinates lie within
+    `PLANETARY_CITY_TOLERANCE` degrees, so a request naming a known city
+    somewhere else still gets its own sun times.
+    """
+    table = get_sun_table()
+    if table is None or not city or not table.covers(day):
+        return None
+    tolerance = getattr(settings, "PLANETARY_CITY_TOLERANCE", 0.1)
+    return table.find(city, latitude, longitude, timezone, tolerance)
+
+
+def city_hours(place, day):
+    """The hour table for `day` at a place returned by `find_place`."""
+    boundaries = hour_boundaries(*place.table.sun_times(place, day))
+    return build_hours(boundaries, day.weekday())
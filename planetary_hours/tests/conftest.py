@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+import pytest
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_rate_limits():
+    # Token buckets live in the cache and would carry over between tests.
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authentication(api_client):
+    def inner_function(is_staff=False):
+        user = User.objects.create_user(
+            username="user_test",
+            email="user@example.com",
+            password="password123",
+            is_staff=is_staff,
+        )
+        api_client.force_authenticate(user=user)
+        return user
+
+    return inner_function
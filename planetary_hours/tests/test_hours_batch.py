@@ -0,0 +1,95 @@
+from rest_framework import status
+from planetary_hours import batch
+from planetary_hours.cache import hours_cache
+import pytest
+
+URL = "/api/planetary/hours/batch/"
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    hours_cache.clear()
+    yield
+    hours_cache.clear()
+
+
+def location(lat, lon, city, date="2030-03-21"):
+    return {"lat": lat, "lon": lon, "city": city, "date": date}
+
+
+class TestHoursBatch:
+    def test_results_follow_input_order(self, api_client, monkeypatch):
+        computed = []
+        compute_hours = batch.compute_hours
+        monkeypatch.setattr(
+            batch,
+            "compute_hours",
+            lambda keys: computed.extend(keys) or compute_hours(keys),
+        )
+        locations = [
+            location(35.69, 51.39, "Tehran"),
+            location(32.65, 51.67, "Isfahan"),
+            location(35.6901, 51.3899, "Tehran again"),
+            location(35.69, 51.39, "Tehran", "2030-03-22"),
+        ]
+
+        response = api_client.post(URL, {"locations": locations}, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["city"] for row in response.data] == [
+            "Tehran",
+            "Isfahan",
+            "Tehran again",
+            "Tehran",
+        ]
+        assert response.data[0]["hours"] == response.data[2]["hours"]
+        assert response.data[0]["hours"][0]["planet"] == "jupiter"
+        assert response.data[3]["hours"][0]["planet"] == "venus"
+        assert len(computed) == 3
+
+    def test_single_day_endpoint_reuses_batch_results(self, api_client):
+        api_client.post(
+            URL, {"locations": [location(35.69, 51.39, "Tehran")]}, format="json"
+        )
+
+        response = api_client.get(
+            "/api/planetary/hours/",
+            {"lat": 35.69, "lon": 51.39, "city": "Tehran", "date": "2030-03-21"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert hours_cache.stats()["size"] == 1
+
+    def test_polar_locations_get_an_error(self, api_client):
+        locations = [
+            location(78.2, 15.6, "Longyearbyen", "2030-06-21"),
+            location(35.69, 51.39, "Tehran"),
+        ]
+
+        response = api_client.post(URL, {"locations": locations}, format="json")
+
+        assert "error" in response.data[0]
+        assert len(response.data[1]["hours"]) == 24
+
+    def test_invalid_batches(self, api_client):
+        assert api_client.post(URL, {"locations": []}, format="json").status_code == (
+            status.HTTP_400_BAD_REQUEST
+        )
+        bad_date = {"locations": [location(35.69, 51.39, "Tehran", "21/03/2030")]}
+        assert api_client.post(URL, bad_date, format="json").status_code == (
+            status.HTTP_400_BAD_REQUEST
+        )
+
+
+def test_process_pool_matches_serial(settings):
+    settings.PLANETARY_BATCH_WORKERS = 2
+    settings.PLANETARY_BATCH_PARALLEL_THRESHOLD = 2
+    keys = [(35.0 + i / 10, 51.39, batch.local_today("UTC"), "UTC") for i in range(6)]
+
+    try:
+        parallel = batch.compute_hours(keys)
+    finally:
+        batch.shutdown_pool()
+
+    settings.PLANETARY_BATCH_WORKERS = 1
+    assert parallel == batch.compute_hours(keys)
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+from rest_framework import status
+from planetary_hours.cache import hours_cache, seconds_until_midnight
+from planetary_hours.modules.get_hours import get_planet_hours
+import pytest
+
+URL = "/api/planetary/hours/"
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    hours_cache.clear()
+    hours_cache.hits = hours_cache.misses = 0
+    yield
+    hours_cache.clear()
+
+
+def query(**kwargs):
+    return {"lat": 35.6892, "lon": 51.389, "city": "Tehran", **kwargs}
+
+
+class TestHoursCache:
+    def test_nearby_requests_share_an_entry(self, api_client):
+        first = api_client.get(URL, query(date="2030-03-21"))
+        second = api_client.get(URL, query(date="2030-03-21", lat=35.6904))
+
+        assert first.status_code == status.HTTP_200_OK
+        assert second.data == first.data
+        assert second["ETag"] == first["ETag"]
+        assert hours_cache.stats()["misses"] == 1
+        assert hours_cache.stats()["hits"] == 1
+
+    def test_matches_the_uncached_table(self, api_client):
+        response = api_client.get(URL, query(date="2030-03-21"))
+
+        hours = get_planet_hours(35.69, 51.39, "Tehran", date(2030, 3, 21))
+        assert len(response.data) == 24
+        assert [row["planet"] for row in response.data] == [
+            row["planet"] for row in hours
+        ]
+        assert response.data[0]["planet"] == "jupiter"
+
+    def test_other_dates_have_other_etags(self, api_client):
+        first = api_client.get(URL, query(date="2030-03-21"))
+        second = api_client.get(URL, query(date="2030-03-22"))
+
+        assert second["ETag"] != first["ETag"]
+        assert second.data[0]["planet"] != first.data[0]["planet"]
+
+    def test_matching_etag_is_not_modified(self, api_client):
+        first = api_client.get(URL, query())
+
+        again = api_client.get(URL, query(), HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert again["ETag"] == first["ETag"]
+        assert "public" in again["Cache-Control"]
+
+    def test_cached_until_local_midnight(self, api_client):
+        response = api_client.get(URL, query())
+
+        max_age = int(response["Cache-Control"].split("max-age=")[1].split(",")[0])
+        assert 0 < max_age <= seconds_until_midnight("Asia/Tehran")
+
+    def test_invalid_date(self, api_client):
+        response = api_client.get(URL, query(date="21/03/2030"))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "date" in response.data
+
+
+def test_seconds_until_midnight():
+    now = datetime(2030, 3, 21, 23, 0, tzinfo=ZoneInfo("Asia/Tehran")).timestamp()
+
+    assert seconds_until_midnight("Asia/Tehran", now) == 3600
+    assert seconds_until_midnight("UTC", now) == 3600 * 4.5
+
+
+@pytest.mark.django_db
+def test_stats_are_staff_only(authentication, api_client):
+    authentication()
+    assert api_client.get("/api/planetary/cache-stats/").status_code == 403
@@ -0,0 +1,136 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+from rest_framework import status
+from planetary_hours import cache
+from planetary_hours.cache import boundaries_cache, get_cached_hours, hours_cache
+from planetary_hours.cache import get_upcoming_hours
+import pytest
+
+URL = "/api/planetary/hours/now/"
+TEHRAN = ZoneInfo("Asia/Tehran")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    hours_cache.clear()
+    boundaries_cache.clear()
+    yield
+    hours_cache.clear()
+    boundaries_cache.clear()
+
+
+def at(*args):
+    return datetime(*args, tzinfo=TEHRAN).timestamp()
+
+
+def table(day):
+    return get_cached_hours(35.69, 51.39, day, "Asia/Tehran")[0]
+
+
+def rendered(hours):
+    return [
+        {
+            "hour": row["hour"],
+            "planet": row["planet"],
+            "start_time": row["start_time"].isoformat().replace("+00:00", "Z"),
+            "end_time": row["end_time"].isoformat().replace("+00:00", "Z"),
+        }
+        for row in hours
+    ]
+
+
+class TestUpcomingHours:
+    def test_daytime(self):
+        hours = get_upcoming_hours(
+            35.69, 51.39, "Asia/Tehran", 2, now=at(2030, 3, 21, 12)
+        )
+
+        assert {row["date"] for row in hours} == {date(2030, 3, 21)}
+        assert rendered(hours) == table(date(2030, 3, 21))[5:8]
+        assert hours[0]["start_time"].timestamp() <= at(2030, 3, 21, 12)
+        assert at(2030, 3, 21, 12) < hours[0]["end_time"].timestamp()
+
+    def test_before_sunrise_is_the_previous_night(self):
+        hours = get_upcoming_hours(
+            35.69, 51.39, "Asia/Tehran", 1, now=at(2030, 3, 21, 5)
+        )
+
+        assert [row["date"] for row in hours] == [date(2030, 3, 20)] * 2
+        assert rendered(hours) == table(date(2030, 3, 20))[22:24]
+
+    def test_runs_into_following_days(self):
+        hours = get_upcoming_hours(
+            35.69, 51.39, "Asia/Tehran", 30, now=at(2030, 3, 21, 12)
+        )
+
+        assert len(hours) == 31
+        assert rendered(hours) == (
+            table(date(2030, 3, 21))[5:] + table(date(2030, 3, 22))[:12]
+        )
+        # Each table's last boundary is accumulated from its sunset, so it can
+        # miss the next table's sunrise by a few microseconds.
+        gaps = [b["start_time"] - a["end_time"] for a, b in zip(hours, hours[1:])]
+        assert max(abs(gap.total_seconds()) for gap in gaps) < 1e-3
+
+    def test_boundaries_are_cached(self, monkeypatch):
+        calls = []
+        engine = cache.ENGINES["noaa"]
+        monkeypatch.setitem(
+            cache.ENGINES, "noaa", lambda *args: calls.append(args) or engine(*args)
+        )
+
+        for hour in (12, 13, 14):
+            get_upcoming_hours(
+                35.69, 51.39, "Asia/Tehran", 1, now=at(2030, 3, 21, hour)
+            )
+
+        assert len(calls) == 1
+
+
+class TestHoursNow:
+    def test_current_and_next(self, api_client):
+        response = api_client.get(URL, {"lat": 35.69, "lon": 51.39, "count": 3})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["tz"] == "Asia/Tehran"
+        assert len(response.data["next"]) == 3
+        assert response.data["current"]["end_time"] == (
+            response.data["next"][0]["start_time"]
+        )
+        assert set(response.data["current"]) == {
+            "hour",
+            "planet",
+            "start_time",
+            "end_time",
+            "date",
+        }
+
+    def test_cacheable_until_the_hour_ends(self, api_client):
+        response = api_client.get(URL, {"lat": 35.69, "lon": 51.39, "tz": "UTC"})
+
+        end = datetime.fromisoformat(response.data["current"]["end_time"])
+        max_age = int(response["Cache-Control"].split("max-age=")[1].split(",")[0])
+        assert "public" in response["Cache-Control"]
+        assert 1 <= max_age <= end.timestamp() - datetime.now().timestamp() + 1
+        assert len(response.data["next"]) == 1
+
+    def test_invalid_queries(self, api_client):
+        query = {"lat": 35.69, "lon": 51.39}
+
+        assert api_client.get(URL, {"lat": 35.69}).status_code == (
+            status.HTTP_400_BAD_REQUEST
+        )
+        assert api_client.get(URL, {**query, "count": -1}).status_code == (
+            status.HTTP_400_BAD_REQUEST
+        )
+        assert api_client.get(URL, {**query, "count": 1000}).status_code == (
+            status.HTTP_400_BAD_REQUEST
+        )
+        assert api_client.get(URL, {**query, "tz": "Mars/Olympus"}).status_code == (
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_polar_location(self, api_client):
+        response = api_client.get(URL, {"lat": 89.0, "lon": 0.0, "tz": "UTC"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,186 @@
+from datetime import date, datetime, timedelta
+import json
+import re
+from astral import Observer
+from astral.sun import sunrise, sunset
+from rest_framework import status
+from planetary_hours.cache import hours_cache
+from planetary_hours.modules.get_hours import get_planet_hours, get_planet_hours_range
+from planetary_hours.modules.solar import sun_events
+import pytest
+
+URL = "/api/planetary/hours/range/"
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    hours_cache.clear()
+    yield
+    hours_cache.clear()
+
+
+def query(**kwargs):
+    return {"lat": 35.69, "lon": 51.39, "start": "2030-03-21", **kwargs}
+
+
+def body(response):
+    return json.loads(b"".join(response.streaming_content))
+
+
+def parse(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class TestHoursRange:
+    def test_days_match_the_single_day_table(self, api_client):
+        response = api_client.get(URL, query(days=3))
+
+        assert response.status_code == status.HTTP_200_OK
+        days = body(response)
+        assert [day["date"] for day in days] == [
+            "2030-03-21",
+            "2030-03-22",
+            "2030-03-23",
+        ]
+        for offset, day in enumerate(days):
+            expected = get_planet_hours(
+                35.69, 51.39, "", date(2030, 3, 21) + timedelta(days=offset)
+            )
+            assert [row["planet"] for row in day["hours"]] == [
+                row["planet"] for row in expected
+            ]
+            for row, other in zip(day["hours"], expected):
+                assert abs(parse(row["start_time"]) - other["start_time"]) < timedelta(
+                    milliseconds=1
+                )
+        assert days[0]["hours"][-1]["end_time"] == days[1]["hours"][0]["start_time"]
+
+    def test_other_engines_match_the_single_day_table(self, api_client, settings):
+        settings.PLANETARY_SOLAR_ENGINE = "astral"
+
+        response = api_client.get(URL, query(days=2))
+        single = api_client.get(
+            "/api/planetary/hours/",
+            {"lat": 35.69, "lon": 51.39, "city": "Tehran", "date": "2030-03-22"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert body(response)[1]["hours"] == json.loads(json.dumps(single.data))
+
+    def test_a_year(self, api_client):
+        response = api_client.get(URL, query(days=365))
+
+        days = body(response)
+        assert len(days) == 365
+        assert days[-1]["date"] == "2031-03-20"
+
+    def test_matching_etag_is_not_modified(self, api_client):
+        first = api_client.get(URL, query(days=7))
+
+        again = api_client.get(URL, query(days=7), HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert api_client.get(URL, query(days=8))["ETag"] != first["ETag"]
+
+    def test_too_many_days(self, api_client):
+        response = api_client.get(URL, query(days=1000))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize(
+        "start, days", [("0001-01-01", 1), ("9999-12-30", 5), ("9999-12-28", 2)]
+    )
+    def test_range_outside_the_calendar(self, api_client, start, days):
+        response = api_client.get(URL, query(start=start, days=days))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "start" in response.data
+
+    @pytest.mark.parametrize("engine", ["noaa", "astral"])
+    @pytest.mark.parametrize("tz", ["Pacific/Kiritimati", "Pacific/Pago_Pago"])
+    @pytest.mark.parametrize("start", ["0001-01-03", "9999-12-28"])
+    def test_range_at_the_ends_of_the_calendar(
+        self, api_client, settings, engine, tz, start
+    ):
+        settings.PLANETARY_SOLAR_ENGINE = engine
+
+        response = api_client.get(URL, query(start=start, days=1, tz=tz))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(body(response)) == 1
+
+    def test_polar_day(self, api_client):
+        response = api_client.get(
+            URL, query(lat=78.2, lon=15.6, start="2030-06-01", days=2)
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert ["polar day" in day["error"] for day in body(response)] == [True] * 2
+
+    def test_days_without_sunrise_or_sunset_do_not_fail_the_range(self, api_client):
+        response = api_client.get(
+            URL,
+            query(
+                lat=64.15,
+                lon=-21.94,
+                tz="Atlantic/Reykjavik",
+                start="2030-01-01",
+                days=365,
+            ),
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        days = body(response)
+        failed = [day for day in days if "error" in day]
+        assert len(days) == 365
+        assert 0 < len(failed) < 30
+        assert all(len(day["hours"]) == 24 for day in days if "hours" in day)
+        for day in failed:
+            with pytest.raises(ValueError, match=re.escape(day["error"])):
+                get_planet_hours(64.15, -21.94, "", day["date"], "Atlantic/Reykjavik")
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone",
+    [
+        (35.69, 51.39, "Asia/Tehran"),
+        (60.17, 24.94, "Europe/Helsinki"),
+        (-33.87, 151.21, "Australia/Sydney"),
+        (21.31, -157.86, "Pacific/Honolulu"),
+    ],
+)
+def test_sun_events_match_astral(latitude, longitude, timezone):
+    first_day = date(2030, 1, 1)
+    rising, setting = sun_events(latitude, longitude, first_day, 365, timezone)
+
+    observer = Observer(latitude, longitude)
+    for offset in range(0, 365, 7):
+        day = first_day + timedelta(days=offset)
+        expected_rise = sunrise(observer, day, tzinfo=timezone).timestamp()
+        expected_set = sunset(observer, day, tzinfo=timezone).timestamp()
+        assert rising[offset] == pytest.approx(expected_rise, abs=1e-3)
+        assert setting[offset] == pytest.approx(expected_set, abs=1e-3)
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, timezone, day",
+    [
+        (40.71, -74.01, "America/New_York", date(2025, 3, 8)),
+        (40.71, -74.01, "America/New_York", date(2025, 11, 1)),
+        (61.22, -149.9, "America/Anchorage", date(2025, 3, 8)),
+        (61.22, -149.9, "America/Anchorage", date(2025, 11, 1)),
+    ],
+)
+def test_night_hours_across_a_clock_change(latitude, longitude, timezone, day):
+    single = get_planet_hours(latitude, longitude, "", day, timezone)
+    ((_, ranged, _),) = get_planet_hours_range(latitude, longitude, day, 1, timezone)
+
+    night = [
+        row["end_time"].timestamp() - row["start_time"].timestamp()
+        for row in single[12:]
+    ]
+    assert max(night) - min(night) < 1e-3
+    for row, other in zip(ranged, single):
+        assert abs(parse(row["start_time"]) - other["start_time"]) < timedelta(
+            milliseconds=1
+        )
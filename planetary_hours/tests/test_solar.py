@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+from rest_framework import status
+from planetary_hours.cache import hours_cache
+from planetary_hours.modules import solar
+from planetary_hours.modules.get_hours import astral_sun_times, get_planet_hours
+import pytest
+
+LATITUDES = range(-85, 90, 10)
+LONGITUDES = range(-180, 180, 45)
+DATES = [date(2030, month, 1) + timedelta(days=20) for month in range(1, 13)]
+TIMEZONES = ["UTC", "Asia/Tehran", "America/Los_Angeles", "Pacific/Kiritimati"]
+
+
+@pytest.mark.parametrize("timezone", TIMEZONES)
+@pytest.mark.parametrize("latitude", LATITUDES)
+def test_noaa_engine_matches_astral(latitude, timezone):
+    for longitude in LONGITUDES:
+        for day in DATES:
+            try:
+                expected = astral_sun_times(latitude, longitude, day, timezone)
+            except ValueError as e:
+                with pytest.raises(ValueError) as error:
+                    solar.sun_times(latitude, longitude, day, timezone)
+                if "always" in str(e):
+                    kind = "night" if "below" in str(e) else "day"
+                    assert getattr(error.value, "kind", None) == kind
+                continue
+
+            actual = solar.sun_times(latitude, longitude, day, timezone)
+            for a, b in zip(actual, expected):
+                assert abs((a - b).total_seconds()) < 1
+                assert a.utcoffset() == b.utcoffset()
+
+
+@pytest.mark.parametrize(
+    "latitude, day, kind",
+    [
+        (78.2, date(2030, 6, 21), "day"),
+        (78.2, date(2030, 12, 21), "night"),
+        (-77.8, date(2030, 6, 21), "night"),
+        (-77.8, date(2030, 12, 21), "day"),
+    ],
+)
+def test_polar_day_and_night(latitude, day, kind):
+    with pytest.raises(solar.PolarError) as scalar:
+        solar.sun_times(latitude, 15.6, day, "UTC")
+    with pytest.raises(solar.PolarError) as vectorized:
+        solar.sun_events(latitude, 15.6, day - timedelta(days=1), 3, "UTC")
+
+    assert scalar.value.kind == vectorized.value.kind == kind
+    assert f"polar {kind}" in str(scalar.value)
+
+
+def test_sunrise_without_civil_twilight():
+    # Helsinki around midsummer: the sun sets but it never gets dark enough
+    # for dusk, which made astral's sun() raise.
+    hours = get_planet_hours(60.17, 24.94, "", date(2030, 6, 21), "Europe/Helsinki")
+
+    assert len(hours) == 24
+
+
+@pytest.mark.django_db
+class TestEngineSetting:
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        hours_cache.clear()
+        yield
+        hours_cache.clear()
+
+    def get(self, api_client, **kwargs):
+        query = {"lat": 35.69, "lon": 51.39, "city": "Tehran", "date": "2030-03-21"}
+        return api_client.get("/api/planetary/hours/", {**query, **kwargs})
+
+    def test_switching_engines(self, api_client, settings):
+        settings.PLANETARY_SOLAR_ENGINE = "noaa"
+        noaa = self.get(api_client)
+        hours_cache.clear()
+        settings.PLANETARY_SOLAR_ENGINE = "astral"
+        astral = self.get(api_client)
+
+        assert noaa.status_code == astral.status_code == status.HTTP_200_OK
+        assert noaa["ETag"] != astral["ETag"]
+        assert [row["planet"] for row in noaa.data] == [
+            row["planet"] for row in astral.data
+        ]
+
+    def test_polar_day_is_a_bad_request(self, api_client):
+        response = self.get(api_client, lat=78.2, date="2030-06-21")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "polar day" in response.data["detail"]
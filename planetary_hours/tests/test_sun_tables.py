@@ -0,0 +1,188 @@
+import json
+from datetime import date
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework import status
+from planetary_hours import batch, cache
+from planetary_hours.cache import hours_cache
+from planetary_hours.modules import solar
+from planetary_hours.modules.suntable import SunTable
+from planetary_hours.sun_tables import city_hours, get_sun_table, reset_sun_table
+import pytest
+
+PLACES = [
+    {"name": "Tehran", "lat": 35.6892, "lon": 51.389, "tz": "Asia/Tehran"},
+    {
+        "name": "Isfahan",
+        "lat": 32.6546,
+        "lon": 51.668,
+        "tz": "Asia/Tehran",
+        "aliases": ["اصفهان"],
+    },
+    {"name": "Berlin", "lat": 52.52, "lon": 13.405, "tz": "Europe/Berlin"},
+]
+
+
+@pytest.fixture
+def table_path(tmp_path, settings):
+    gazetteer = tmp_path / "cities.json"
+    gazetteer.write_text(json.dumps(PLACES))
+    settings.PLANETARY_GAZETTEER = gazetteer
+    settings.PLANETARY_SUN_TABLE = tmp_path / "sun_tables.bin"
+    settings.PLANETARY_SOLAR_ENGINE = "noaa"
+    hours_cache.clear()
+    reset_sun_table()
+
+    call_command(
+        "build_sun_tables",
+        "--start=2030-01-01",
+        "--years=1",
+        stdout=open("/dev/null", "w"),
+    )
+
+    yield settings.PLANETARY_SUN_TABLE
+    reset_sun_table()
+    hours_cache.clear()
+
+
+@pytest.fixture
+def live(monkeypatch):
+    """Dates computed live rather than read from the table."""
+    days = []
+    get_planet_hours = cache.get_planet_hours
+
+    def counting(*args, **kwargs):
+        days.append(kwargs["date"])
+        return get_planet_hours(*args, **kwargs)
+
+    monkeypatch.setattr(cache, "get_planet_hours", counting)
+    return days
+
+
+def test_table_matches_live_computation(table_path):
+    table = SunTable(table_path)
+
+    assert table.first_day == date(2030, 1, 1)
+    assert table.covers(date(2030, 12, 31))
+    assert not table.covers(date(2031, 1, 1))
+    for place in table.places:
+        for day in (date(2030, 1, 1), date(2030, 3, 30), date(2030, 12, 31)):
+            assert table.sun_times(place, day) == solar.sun_times(
+                place.latitude, place.longitude, day, place.timezone
+            )
+
+
+def test_find(table_path):
+    table = SunTable(table_path)
+
+    assert table.find("isfahan ", 32.65, 51.67, "Asia/Tehran", 0.1).name == "Isfahan"
+    assert table.find("اصفهان", 32.65, 51.67, "Asia/Tehran", 0.1).name == "Isfahan"
+    assert table.find("Isfahan", 32.65, 51.67, "UTC", 0.1) is None
+    assert table.find("Isfahan", 35.69, 51.39, "Asia/Tehran", 0.1) is None
+    assert table.find("Shiraz", 29.59, 52.58, "Asia/Tehran", 0.1) is None
+
+
+def test_known_city_is_read_from_table(table_path, live, api_client):
+    query = {"lat": 35.69, "lon": 51.39, "city": "Tehran", "date": "2030-03-21"}
+
+    response = api_client.get("/api/planetary/hours/", query)
+    unknown = api_client.get("/api/planetary/hours/", {**query, "city": "Home"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data[0]["planet"] == unknown.data[0]["planet"] == "jupiter"
+    assert response["ETag"] != unknown["ETag"]
+    assert live == [date(2030, 3, 21)]
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"city": "Shiraz"},
+        {"tz": "UTC"},
+        {"lat": 36.5},
+        {"date": "2031-03-21"},
+    ],
+)
+def test_other_requests_are_computed(table_path, live, api_client, change):
+    query = {"lat": 35.69, "lon": 51.39, "city": "Tehran", "date": "2030-03-21"}
+
+    response = api_client.get("/api/planetary/hours/", {**query, **change})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(live) == 1
+
+
+def test_batch_reads_known_cities(table_path, api_client, monkeypatch):
+    computed = []
+    compute_hours = batch.compute_hours
+    monkeypatch.setattr(
+        batch,
+        "compute_hours",
+        lambda keys: computed.extend(keys) or compute_hours(keys),
+    )
+    locations = [
+        {"lat": 32.65, "lon": 51.67, "city": "Isfahan", "date": "2030-06-01"},
+        {"lat": 32.65, "lon": 51.67, "city": "Somewhere", "date": "2030-06-01"},
+        {
+            "lat": 52.52,
+            "lon": 13.4,
+            "city": "Berlin",
+            "date": "2030-06-01",
+            "tz": "Europe/Berlin",
+        },
+    ]
+
+    response = api_client.post(
+        "/api/planetary/hours/batch/", {"locations": locations}, format="json"
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert all("hours" in row for row in response.data)
+    assert [row["tz"] for row in response.data] == [
+        "Asia/Tehran",
+        "Asia/Tehran",
+        "Europe/Berlin",
+    ]
+    assert [key.latitude for key in computed] == [32.65]
+
+
+def test_missing_table(settings, tmp_path):
+    settings.PLANETARY_SUN_TABLE = tmp_path / "missing.bin"
+    reset_sun_table()
+
+    assert get_sun_table() is None
+    reset_sun_table()
+
+
+def test_rebuilt_table_is_remapped(table_path, settings):
+    table = get_sun_table()
+    settings.PLANETARY_GAZETTEER.write_text(json.dumps(PLACES[2:]))
+
+    call_command(
+        "build_sun_tables",
+        "--start=2031-01-01",
+        "--years=1",
+        stdout=open("/dev/null", "w"),
+    )
+
+    assert get_sun_table() is not table
+    assert get_sun_table().first_day == date(2031, 1, 1)
+    assert [place.name for place in get_sun_table().places] == ["Berlin"]
+    # Places found before the rebuild still read the table they came from.
+    tehran = table.find("Tehran", 35.69, 51.39, "Asia/Tehran", 0.1)
+    assert city_hours(tehran, date(2030, 3, 21))[0]["planet"] == "jupiter"
+
+
+def test_polar_gazetteer_is_rejected(tmp_path, settings):
+    gazetteer = tmp_path / "cities.json"
+    gazetteer.write_text(
+        json.dumps([{"name": "Longyearbyen", "lat": 78.22, "lon": 15.65, "tz": "UTC"}])
+    )
+
+    with pytest.raises(CommandError):
+        call_command(
+            "build_sun_tables",
+            f"--gazetteer={gazetteer}",
+            f"--output={tmp_path / 'polar.bin'}",
+            stdout=open("/dev/null", "w"),
+        )
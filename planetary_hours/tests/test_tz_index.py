@@ -0,0 +1,146 @@
+import json
+from django.core.management import call_command
+from rest_framework import status
+from planetary_hours.cache import hours_cache
+from planetary_hours.modules.tzindex import TimezoneIndex, fallback_timezone
+from planetary_hours.timezones import reset_tz_index, resolve_timezone
+import pytest
+
+
+def square(west, south, east, north):
+    return [[west, south], [east, south], [east, north], [west, north], [west, south]]
+
+
+FEATURES = [
+    {
+        "type": "Feature",
+        "properties": {"tzid": "Asia/Tehran"},
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [square(44, 25, 63, 40), square(54, 24, 56.5, 26.5)],
+        },
+    },
+    {
+        "type": "Feature",
+        "properties": {"tzid": "Asia/Dubai"},
+        "geometry": {"type": "Polygon", "coordinates": [square(54, 24, 56.5, 26.5)]},
+    },
+    {
+        "type": "Feature",
+        "properties": {"tzid": "Europe/Berlin"},
+        "geometry": {
+            "type": "MultiPolygon",
+            "coordinates": [[square(6, 47, 15, 55)], [square(13.5, 54.3, 13.7, 54.7)]],
+        },
+    },
+]
+
+
+@pytest.fixture
+def index_path(tmp_path, settings):
+    geojson = tmp_path / "zones.json"
+    geojson.write_text(json.dumps({"type": "FeatureCollection", "features": FEATURES}))
+    settings.PLANETARY_TZ_INDEX = tmp_path / "timezones.idx"
+    hours_cache.clear()
+    reset_tz_index()
+
+    call_command("build_tz_index", str(geojson), stdout=open("/dev/null", "w"))
+
+    yield settings.PLANETARY_TZ_INDEX
+    reset_tz_index()
+    hours_cache.clear()
+
+
+def test_lookup(index_path):
+    index = TimezoneIndex(index_path)
+
+    assert index.lookup(35.69, 51.39) == "Asia/Tehran"
+    assert index.lookup(25.2, 55.3) == "Asia/Dubai"
+    assert index.lookup(52.52, 13.40) == "Europe/Berlin"
+    assert index.lookup(54.5, 13.6) == "Europe/Berlin"
+    # Just outside the border, within a cell of it.
+    assert index.lookup(40.05, 50.0) == "Asia/Tehran"
+    assert index.lookup(0.0, -30.0) is None
+    index.close()
+
+
+def test_resolve_falls_back_to_nautical_zones(index_path):
+    assert resolve_timezone(35.69, 51.39) == "Asia/Tehran"
+    assert resolve_timezone(0.0, -30.0) == "Etc/GMT+2"
+
+
+@pytest.mark.parametrize(
+    "longitude, zone",
+    [
+        (0.0, "Etc/GMT"),
+        (51.39, "Etc/GMT-3"),
+        (-75.0, "Etc/GMT+5"),
+        (179.9, "Etc/GMT-12"),
+    ],
+)
+def test_fallback_timezone(longitude, zone):
+    assert fallback_timezone(longitude) == zone
+
+
+def test_without_an_index_the_default_zone_is_used(settings, tmp_path):
+    settings.PLANETARY_TZ_INDEX = tmp_path / "missing.idx"
+    reset_tz_index()
+
+    assert resolve_timezone(52.52, 13.40) == "Asia/Tehran"
+    reset_tz_index()
+
+
+def test_index_built_later_is_picked_up(settings, tmp_path):
+    settings.PLANETARY_TZ_INDEX = tmp_path / "timezones.idx"
+    geojson = tmp_path / "zones.json"
+    geojson.write_text(json.dumps({"type": "FeatureCollection", "features": FEATURES}))
+    reset_tz_index()
+    assert resolve_timezone(52.52, 13.40) == "Asia/Tehran"
+
+    call_command("build_tz_index", str(geojson), stdout=open("/dev/null", "w"))
+
+    assert resolve_timezone(52.52, 13.40) == "Europe/Berlin"
+    reset_tz_index()
+
+
+class TestEndpoints:
+    def test_batch_resolves_each_location(self, index_path, api_client):
+        locations = [
+            {"lat": 35.69, "lon": 51.39, "city": "Tehran", "date": "2030-03-21"},
+            {"lat": 52.52, "lon": 13.40, "city": "Berlin", "date": "2030-03-21"},
+            {
+                "lat": 52.52,
+                "lon": 13.40,
+                "city": "Berlin",
+                "date": "2030-03-21",
+                "tz": "UTC",
+            },
+        ]
+
+        response = api_client.post(
+            "/api/planetary/hours/batch/", {"locations": locations}, format="json"
+        )
+
+        assert [row["tz"] for row in response.data] == [
+            "Asia/Tehran",
+            "Europe/Berlin",
+            "UTC",
+        ]
+
+    def test_explicit_zone_changes_the_table(self, index_path, api_client):
+        query = {"lat": 52.52, "lon": 13.40, "city": "Berlin", "date": "2030-03-21"}
+
+        resolved = api_client.get("/api/planetary/hours/", query)
+        explicit = api_client.get("/api/planetary/hours/", {**query, "tz": "UTC"})
+
+        assert resolved.status_code == explicit.status_code == status.HTTP_200_OK
+        assert resolved["ETag"] != explicit["ETag"]
+
+    def test_unknown_zone(self, api_client):
+        response = api_client.get(
+            "/api/planetary/hours/",
+            {"lat": 52.52, "lon": 13.40, "city": "Berlin", "tz": "Mars/Olympus"},
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "tz" in response.data
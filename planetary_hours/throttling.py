@@ -0,0 +1,9 @@
+from core.throttling import TokenBucketThrottle
+
+
+class PlanetaryHoursThrottle(TokenBucketThrottle):
+    scope = "planetary"
+
+
+class PlanetaryBatchThrottle(TokenBucketThrottle):
+    scope = "planetary_batch"
@@ -0,0 +1,38 @@
+import logging
+from .mapped import MappedFile
+from .modules.get_hours import DEFAULT_TIMEZONE
+from .modules.tzindex import TimezoneIndex, fallback_timezone
+
+_index = MappedFile(
+    "PLANETARY_TZ_INDEX",
+    TimezoneIndex,
+    f"no time zone index at %s; using {DEFAULT_TIMEZONE} for every location",
+    level=logging.WARNING,
+)
+
+
+def get_tz_index():
+    """
+    The index at `PLANETARY_TZ_INDEX`, mapped on first use and remapped
+    when the file is rebuilt; None if it has not been built (see the
+    build_tz_index command).
+    """
+    return _index.get()
+
+
+def reset_tz_index():
+    _index.reset()
+
+
+def resolve_timezone(latitude, longitude):
+    """
+    IANA zone name for the given point.
+
+    Points outside every zone (open sea) get the nautical `Etc/GMT` zone for
+    their longitude. Without an index every point keeps the historical
+    default, `DEFAULT_TIMEZONE`.
+    """
+    index = get_tz_index()
+    if index is None:
+        return DEFAULT_TIMEZONE
+    return index.lookup(latitude, longitude) or fallback_timezone(longitude)
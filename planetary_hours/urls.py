@@ -2,5 +2,9 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path("hours/", views.get_hours)
-]
\ No newline at end of file
+    path("hours/", views.get_hours),
+    path("hours/range/", views.get_hours_range),
+    path("hours/now/", views.get_hours_now),
+    path("hours/batch/", views.get_hours_batch),
+    path("cache-stats/", views.HoursCacheStatsView.as_view()),
+]
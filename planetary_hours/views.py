@@ -1,22 +1,215 @@
-from rest_framework.decorators import api_view
+import json
+import math
+import time
+from itertools import islice
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    throttle_classes,
+)
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework import status
-from .serializers import PlanetHoursSerizlier, PlanetRequestQuerySerizlier
-from .modules.get_hours import get_planet_hours
+from core.authentication import StatelessJWTAuthentication
+from .batch import get_batch_hours
+from .cache import (
+    boundaries_cache,
+    get_engine,
+    get_cached_hours,
+    get_upcoming_hours,
+    hours_cache,
+    hours_key,
+    make_etag,
+    seconds_until_midnight,
+)
+from .throttling import PlanetaryBatchThrottle, PlanetaryHoursThrottle
+from .serializers import (
+    PlanetBatchSerializer,
+    PlanetRangeQuerySerializer,
+    PlanetRequestQuerySerizlier,
+    PlanetUpcomingHourSerializer,
+    PlanetUpcomingQuerySerializer,
+)
+from .modules.get_hours import get_planet_hours_range, local_today
+from .timezones import resolve_timezone
+
+# Days per streamed chunk of a range response.
+RANGE_CHUNK_DAYS = 31
 
 
 @api_view(["GET"])
+@authentication_classes([StatelessJWTAuthentication])
+@throttle_classes([PlanetaryHoursThrottle])
 def get_hours(request):
+    """
+    Planetary hours for a location, served from `hours_cache`.
+
+    Times are local to `tz`, or to the zone found for the coordinates. The
+    table does not depend on the user, so responses are publicly cacheable
+    until local midnight, when "today" moves on.
+    """
     request_query_serilizer = PlanetRequestQuerySerizlier(data=request.query_params)
     request_query_serilizer.is_valid(raise_exception=True)
     query_data = request_query_serilizer.validated_data
 
-    planet_hours = get_planet_hours(
-        latitude=query_data["lat"],
-        longitude=query_data["lon"],
-        city_name=query_data["city"],
-        date=query_data.get("date")
+    timezone = query_data.get("tz") or resolve_timezone(
+        query_data["lat"], query_data["lon"]
     )
+    day = query_data.get("date") or local_today(timezone)
+    try:
+        data, etag = get_cached_hours(
+            latitude=query_data["lat"],
+            longitude=query_data["lon"],
+            day=day,
+            timezone=timezone,
+            city=query_data["city"],
+        )
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = Response(data, status=status.HTTP_200_OK)
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=seconds_until_midnight(timezone))
+    return response
+
+
+def render_range(days):
+    """
+    Yield a JSON array of `{"date", "hours"}` objects, or `{"date", "error"}`
+    for dates without sunrise or sunset, a few days at a time.
+    """
+    separator = "["
+    while chunk := list(islice(days, RANGE_CHUNK_DAYS)):
+        yield separator + ",".join(
+            json.dumps(
+                {"date": day.isoformat(), "hours": hours}
+                if error is None
+                else {"date": day.isoformat(), "error": error}
+            )
+            for day, hours, error in chunk
+        )
+        separator = ","
+    yield "]" if separator == "," else "[]"
+
+
+async def aiterate(iterator):
+    # Rendering is CPU-only and quick per chunk, so it can run on the event
+    # loop; Django would otherwise buffer a sync iterator under ASGI.
+    for chunk in iterator:
+        yield chunk
+
+
+@api_view(["GET"])
+@authentication_classes([StatelessJWTAuthentication])
+@throttle_classes([PlanetaryHoursThrottle])
+def get_hours_range(request):
+    """
+    Planetary hours for `days` consecutive dates from `start`, streamed as a
+    JSON array.
+
+    Sunrise and sunset for the whole range are computed in one vectorized
+    pass instead of twice per day. A date where the sun does not rise or set
+    gets an `error` instead of `hours`, as in the batch endpoint.
+    """
+    query_serializer = PlanetRangeQuerySerializer(data=request.query_params)
+    query_serializer.is_valid(raise_exception=True)
+    query_data = query_serializer.validated_data
+
+    timezone = query_data.get("tz") or resolve_timezone(
+        query_data["lat"], query_data["lon"]
+    )
+    start = query_data.get("start") or local_today(timezone)
+    key = hours_key(query_data["lat"], query_data["lon"], start, timezone)
+    etag = make_etag((*key, query_data["days"]))
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        latitude, longitude, start, _ = key
+        days = get_planet_hours_range(
+            latitude, longitude, start, query_data["days"], timezone, get_engine()
+        )
+        chunks = render_range(days)
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiterate(chunks)
+        response = StreamingHttpResponse(chunks, content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=seconds_until_midnight(timezone))
+    return response
+
+
+@api_view(["GET"])
+@authentication_classes([StatelessJWTAuthentication])
+@throttle_classes([PlanetaryHoursThrottle])
+def get_hours_now(request):
+    """
+    The planetary hour in progress and the `count` hours after it, which may
+    belong to the previous or following days' tables.
+
+    The response changes when the current hour ends, so it is publicly
+    cacheable until then.
+    """
+    query_serializer = PlanetUpcomingQuerySerializer(data=request.query_params)
+    query_serializer.is_valid(raise_exception=True)
+    query_data = query_serializer.validated_data
+
+    timezone = query_data.get("tz") or resolve_timezone(
+        query_data["lat"], query_data["lon"]
+    )
+    now = time.time()
+    try:
+        hours = get_upcoming_hours(
+            query_data["lat"],
+            query_data["lon"],
+            timezone,
+            query_data["count"],
+            now=now,
+            city=query_data.get("city"),
+        )
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    current, *upcoming = PlanetUpcomingHourSerializer(hours, many=True).data
+    response = Response(
+        {"tz": timezone, "current": current, "next": upcoming},
+        status=status.HTTP_200_OK,
+    )
+    max_age = math.ceil(hours[0]["end_time"].timestamp() - now)
+    patch_cache_control(response, public=True, max_age=max(max_age, 1))
+    return response
+
+
+@api_view(["POST"])
+@authentication_classes([StatelessJWTAuthentication])
+@throttle_classes([PlanetaryBatchThrottle])
+def get_hours_batch(request):
+    """
+    Planetary hours for a list of locations, in input order.
+
+    Body: `{"locations": [{"lat", "lon", "city", "date"?, "tz"?}, ...]}`. A location
+    where the sun does not rise or set that day gets an `error` instead of
+    `hours`.
+    """
+    serializer = PlanetBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    results = get_batch_hours(serializer.validated_data["locations"])
+    return Response(results, status=status.HTTP_200_OK)
+
+
+class HoursCacheStatsView(APIView):
+    """Hit/miss counters of this process's planetary-hours cache."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(hours_cache.stats(), status=status.HTTP_200_OK)
 
-    serializer = PlanetHoursSerizlier(planet_hours, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+    def delete(self, request):
+        hours_cache.clear()
+        boundaries_cache.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+from asgiref.sync import sync_to_async
+from corsheaders.conf import conf as cors_conf
+from corsheaders.middleware import CorsMiddleware
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.settings import api_settings
+from core.authentication import JWTAuthentication
+from .broker import RESYNC, get_broker
+
+STREAM_PATH = "/api/realtime/events/"
+
+# Only used for its origin allow-list check.
+_cors = CorsMiddleware(lambda request: None)
+
+
+def header(scope, name):
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def cors_headers(scope, preflight=False):
+    """
+    The CORS headers `CorsMiddleware` would add to a response to this
+    request; the stream is served before Django's middleware runs.
+    """
+    headers = [(b"vary", b"origin")]
+    origin = header(scope, b"origin")
+    if not origin:
+        return headers
+    try:
+        url = urlsplit(origin)
+    except ValueError:
+        return headers
+    if not (
+        cors_conf.CORS_ALLOW_ALL_ORIGINS
+        or _cors.origin_found_in_white_lists(origin, url)
+    ):
+        return headers
+
+    if cors_conf.CORS_ALLOW_ALL_ORIGINS and not cors_conf.CORS_ALLOW_CREDENTIALS:
+        headers.append((b"access-control-allow-origin", b"*"))
+    else:
+        headers.append((b"access-control-allow-origin", origin.encode("latin-1")))
+    if cors_conf.CORS_ALLOW_CREDENTIALS:
+        headers.append((b"access-control-allow-credentials", b"true"))
+    if preflight:
+        allowed = ", ".join(cors_conf.CORS_ALLOW_HEADERS)
+        headers.append((b"access-control-allow-headers", allowed.encode()))
+        headers.append((b"access-control-allow-methods", b"GET, OPTIONS"))
+        if cors_conf.CORS_PREFLIGHT_MAX_AGE:
+            max_age = str(cors_conf.CORS_PREFLIGHT_MAX_AGE)
+            headers.append((b"access-control-max-age", max_age.encode()))
+    return headers
+
+
+def raw_token(scope):
+    """
+    The JWT from the Authorization header, or from `?token=` for clients such
+    as the browser's EventSource that cannot set headers.
+    """
+    authorization = header(scope, b"authorization")
+    if authorization:
+        parts = authorization.split()
+        if len(parts) == 2 and parts[0] in api_settings.AUTH_HEADER_TYPES:
+            return parts[1]
+    token = parse_qs(scope.get("query_string", b"").decode()).get("token")
+    return token[0] if token else None
+
+
+@sync_to_async
+def authenticate(token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(token))
+    except APIException:
+        return None
+    finally:
+        close_old_connections()
+
+
+async def send_json(send, status, data, headers=()):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), *headers],
+        }
+    )
+    await send({"type": "http.response.body", "body": json.dumps(data).encode()})
+
+
+class EventStreamApp:
+    """
+    Serves each user's change events as server-sent events at `STREAM_PATH`
+    and hands every other request to `application`.
+
+    Events are compact (see realtime.events): clients refetch what changed,
+    and refetch everything after (re)connecting or on a "resync" event, which
+    replaces the backlog of a client that could not keep up. Comment lines
+    are sent every `REALTIME_HEARTBEAT` seconds to keep proxies from closing
+    the stream and to notice dead clients; streams without events for
+    `REALTIME_IDLE_TIMEOUT` seconds are closed, and the browser reconnects
+    after the advertised retry delay.
+    """
+
+    def __init__(self, application, path=STREAM_PATH):
+        self.application = application
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            return await self.application(scope, receive, send)
+
+        if scope["method"] == "OPTIONS" and header(
+            scope, b"access-control-request-method"
+        ):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-length", b"0"),
+                        *cors_headers(scope, preflight=True),
+                    ],
+                }
+            )
+            return await send({"type": "http.response.body", "body": b""})
+
+        cors = cors_headers(scope)
+        if scope["method"] != "GET":
+            return await send_json(send, 405, {"detail": "Method not allowed."}, cors)
+
+        token = raw_token(scope)
+        user = await authenticate(token) if token else None
+        if user is None:
+            return await send_json(
+                send,
+                401,
+                {"detail": "Authentication credentials were not provided."},
+                cors,
+            )
+
+        broker = get_broker()
+        max_streams = getattr(settings, "REALTIME_MAX_STREAMS_PER_USER", 5)
+        if broker.subscriber_count(user.pk) >= max_streams:
+            return await send_json(
+                send, 429, {"detail": "Too many open streams."}, cors
+            )
+
+        subscription = broker.subscribe(user.pk)
+        try:
+            await self.stream(subscription, receive, send, cors)
+        finally:
+            broker.unsubscribe(subscription)
+
+    async def stream(self, subscription, receive, send, headers=()):
+        heartbeat = getattr(settings, "REALTIME_HEARTBEAT", 15)
+        idle_timeout = getattr(settings, "REALTIME_IDLE_TIMEOUT", 600)
+        retry_ms = getattr(settings, "REALTIME_RETRY_MS", 3000)
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                    *headers,
+                ],
+            }
+        )
+        await self.write(send, f"retry: {retry_ms}\n\n")
+
+        disconnected = asyncio.ensure_future(self.wait_for_disconnect(receive))
+        last_event = time.monotonic()
+        event_id = 0
+        try:
+            while True:
+                getter = asyncio.ensure_future(subscription.queue.get())
+                await asyncio.wait(
+                    {getter, disconnected},
+                    timeout=heartbeat,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected.done():
+                    getter.cancel()
+                    return
+
+                if getter.done():
+                    event = getter.result()
+                    last_event = time.monotonic()
+                    if event is RESYNC:
+                        chunk = "event: resync\ndata: {}\n\n"
+                    else:
+                        event_id += 1
+                        chunk = (
+                            f"id: {event_id}\nevent: change\n"
+                            f"data: {json.dumps(event)}\n\n"
+                        )
+                else:
+                    getter.cancel()
+                    if time.monotonic() - last_event >= idle_timeout:
+                        break
+                    chunk = ": ping\n\n"
+                await self.write(send, chunk)
+
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            disconnected.cancel()
+
+    async def write(self, send, chunk):
+        await send(
+            {"type": "http.response.body", "body": chunk.encode(), "more_body": True}
+        )
+
+    async def wait_for_disconnect(self, receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Put in a subscriber's queue in place of the events it could not keep up with.
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """
+    One stream's bounded event queue, owned by the event loop it was created on.
+
+    Events may be put from any thread. When the queue is full the pending
+    events are discarded and replaced by a single `RESYNC` marker, so a slow
+    client costs a bounded amount of memory and is told to refetch instead of
+    silently missing changes.
+    """
+
+    def __init__(self, user_id, maxsize, loop=None):
+        self.user_id = user_id
+        self.loop = loop or asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflows = 0
+
+    def put(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The stream's loop has already shut down.
+            pass
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflows += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class Broker:
+    """
+    Per-user pub/sub for change events.
+
+    `publish()` is called from request or worker code; `subscribe()` from
+    the event streams. Subclasses decide how published events reach the
+    subscribers of other processes.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, maxsize=None, loop=None):
+        if maxsize is None:
+            maxsize = getattr(settings, "REALTIME_QUEUE_SIZE", 100)
+        subscription = Subscription(user_id, maxsize, loop)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscriber_count(self, user_id):
+        with self._lock:
+            return len(self._subscriptions.get(user_id, ()))
+
+    def deliver(self, user_id, event):
+        """Hand `event` to this process's subscribers for `user_id`."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def publish(self, user_id, event):
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+    """Delivers events to streams served by the publishing process only."""
+
+    def publish(self, user_id, event):
+        self.deliver(user_id, event)
+
+
+class PostgresNotifyBroker(Broker):
+    """
+    Fans events out to every process through PostgreSQL LISTEN/NOTIFY.
+
+    Publishing is a `pg_notify()` on the caller's connection, so events from
+    web requests and job workers alike reach streams served by any ASGI
+    process. Each process that serves streams keeps one extra connection
+    listening on `REALTIME_PG_CHANNEL`, opened with the first subscription.
+    NOTIFY payloads are limited to 8000 bytes, which compact events stay
+    well under.
+    """
+
+    def __init__(self, using="default"):
+        super().__init__()
+        self.using = using
+        self.channel = getattr(settings, "REALTIME_PG_CHANNEL", "realtime")
+        self._listener = None
+
+    def publish(self, user_id, event):
+        payload = json.dumps({"user": user_id, "event": event})
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def subscribe(self, user_id, maxsize=None, loop=None):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+        return super().subscribe(user_id, maxsize, loop)
+
+    def _listen(self):
+        while True:
+            try:
+                self._listen_once()
+            except Exception:
+                logger.exception("realtime listener failed; reconnecting")
+                time.sleep(1)
+
+    def _listen_once(self):
+        # A dedicated connection outside Django's per-thread handling, since it
+        # lives as long as the process.
+        connection = connections.create_connection(self.using)
+        try:
+            connection.ensure_connection()
+            raw = connection.connection
+            raw.autocommit = True
+            with raw.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+
+            while True:
+                if select.select([raw], [], [], 5) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    self._dispatch(raw.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _dispatch(self, payload):
+        try:
+            message = json.loads(payload)
+            self.deliver(message["user"], message["event"])
+        except (ValueError, KeyError):
+            logger.warning("ignoring malformed notification %r", payload)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        broker_class = getattr(
+            settings, "REALTIME_BROKER", "realtime.broker.InProcessBroker"
+        )
+        _broker = import_string(broker_class)()
+    return _broker
@@ -0,0 +1,36 @@
+import logging
+from django.db import transaction
+from .broker import get_broker
+
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+def change_event(model, action, ids, task_id=None):
+    """
+    A compact change notification: what changed, not the new state.
+
+    Clients refetch the affected rows, so events stay small and the API stays
+    the single source of truth.
+    """
+    event = {"model": model, "action": action, "ids": sorted(ids)}
+    if task_id is not None:
+        event["task"] = task_id
+    return event
+
+
+def publish_change(user_id, model, action, ids, task_id=None):
+    """Publish a change event to `user_id`'s streams once the transaction commits."""
+    event = change_event(model, action, ids, task_id)
+
+    def publish():
+        try:
+            get_broker().publish(user_id, event)
+        except Exception:
+            # Streams are best-effort; never fail the write that triggered them.
+            logger.exception("could not publish %s", event)
+
+    transaction.on_commit(publish)
@@ -0,0 +1,89 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from scheduler.models import SubTask, Tag, TaggedItem, Task, TaskCategory
+from .events import CREATED, DELETED, UPDATED, publish_change
+
+# Bulk writes (bulk_create/bulk_update/queryset updates) send no signals,
+# and TaggedItem queryset deletes are ignored; the code doing them publishes
+# explicitly. SubTask deletes are published by
+# SubTaskViewSet so that deleting a task can still cascade to its subtasks
+# without loading them.
+
+
+def _action(created):
+    return CREATED if created else UPDATED
+
+
+def _is_cascade(instance, origin):
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin is not None and origin_model is not type(instance)
+
+
+def _owner_id(instance, field_name, model):
+    """The `user_id` of the row `instance.<field_name>` points at."""
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        return getattr(instance, field_name).user_id
+    return (
+        model.objects.filter(pk=getattr(instance, field.attname))
+        .values_list("user_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    publish_change(instance.user_id, "task", _action(created), [instance.id])
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        publish_change(instance.user_id, "task", DELETED, [instance.id])
+
+
+@receiver(post_save, sender=SubTask)
+def subtask_saved(sender, instance, created, **kwargs):
+    user_id = _owner_id(instance, "parent_task", Task)
+    if user_id is not None:
+        publish_change(
+            user_id,
+            "subtask",
+            _action(created),
+            [instance.id],
+            task_id=instance.parent_task_id,
+        )
+
+
+@receiver(post_save, sender=TaggedItem)
+def tagged_item_saved(sender, instance, created, **kwargs):
+    user_id = _owner_id(instance, "tag", Tag)
+    if user_id is not None:
+        publish_change(user_id, "task", UPDATED, [instance.task_id])
+
+
+@receiver(post_delete, sender=TaggedItem)
+def tagged_item_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting the task or the tag publishes its own event; queryset deletes
+    # (delete_tagged_items) are bulk writes and publish explicitly.
+    if isinstance(origin, QuerySet) or _is_cascade(instance, origin):
+        return
+    user_id = _owner_id(instance, "tag", Tag)
+    if user_id is not None:
+        publish_change(user_id, "task", UPDATED, [instance.task_id])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=TaskCategory)
+def owned_saved(sender, instance, created, **kwargs):
+    model = "tag" if sender is Tag else "category"
+    publish_change(instance.user_id, model, _action(created), [instance.id])
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=TaskCategory)
+def owned_deleted(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        model = "tag" if sender is Tag else "category"
+        publish_change(instance.user_id, model, DELETED, [instance.id])
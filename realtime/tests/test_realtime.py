@@ -0,0 +1,233 @@
+import asyncio
+import json
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken
+from realtime.asgi import STREAM_PATH, EventStreamApp
+from realtime.broker import RESYNC, InProcessBroker, get_broker
+from realtime.events import change_event
+from scheduler.models import SubTask, Tag, TaggedItem, Task
+from model_bakery import baker
+import pytest
+
+User = get_user_model()
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def subscribe(loop):
+    broker = get_broker()
+    subscriptions = []
+
+    def inner(user_id, maxsize=100):
+        subscription = broker.subscribe(user_id, maxsize, loop=loop)
+        subscriptions.append(subscription)
+        return subscription
+
+    yield inner
+    for subscription in subscriptions:
+        broker.unsubscribe(subscription)
+
+
+def received(loop, subscription):
+    # Run the callbacks scheduled by Subscription.put, then drain the queue.
+    loop.run_until_complete(asyncio.sleep(0))
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+class TestBroker:
+    def test_events_reach_only_the_users_streams(self, loop):
+        broker = InProcessBroker()
+        mine = broker.subscribe(1, loop=loop)
+        other = broker.subscribe(2, loop=loop)
+
+        broker.publish(1, change_event("task", "updated", [5]))
+
+        assert received(loop, mine) == [
+            {"model": "task", "action": "updated", "ids": [5]}
+        ]
+        assert received(loop, other) == []
+
+    def test_overflow_is_replaced_by_resync(self, loop):
+        broker = InProcessBroker()
+        subscription = broker.subscribe(1, maxsize=2, loop=loop)
+
+        for task_id in range(5):
+            broker.publish(1, change_event("task", "updated", [task_id]))
+
+        assert received(loop, subscription)[0] is RESYNC
+        assert subscription.overflows > 0
+
+
+@pytest.mark.django_db
+class TestChangeSignals:
+    def test_writes_publish_after_commit(
+        self, loop, subscribe, django_capture_on_commit_callbacks
+    ):
+        user = baker.make(User)
+        subscription = subscribe(user.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            task = baker.make(Task, user=user)
+            subtask = baker.make(SubTask, parent_task=task)
+            tag = baker.make(Tag, user=user)
+            TaggedItem.objects.create(task=task, tag=tag)
+            task_id = task.id
+            task.delete()
+
+        events = received(loop, subscription)
+        assert [(event["model"], event["action"]) for event in events] == [
+            ("task", "created"),
+            ("subtask", "created"),
+            ("tag", "created"),
+            ("task", "updated"),
+            ("task", "deleted"),
+        ]
+        assert events[1] == {
+            "model": "subtask",
+            "action": "created",
+            "ids": [subtask.id],
+            "task": task_id,
+        }
+
+    def test_nothing_is_published_on_rollback(self, loop, subscribe):
+        user = baker.make(User)
+        subscription = subscribe(user.id)
+
+        baker.make(Task, user=user)
+
+        assert received(loop, subscription) == []
+
+
+def run_stream(app, scope, on_start=None):
+    """Run one request against `app`, disconnecting after the first event."""
+    messages = []
+    got_event = asyncio.Event()
+
+    async def receive():
+        await got_event.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.start" and on_start:
+            on_start()
+        if b"event: change" in message.get("body", b""):
+            got_event.set()
+        if not message.get("more_body", False) and message["type"].endswith("body"):
+            got_event.set()
+
+    async def run():
+        await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+    async_to_sync(run)()
+    return messages
+
+
+def http_scope(path=STREAM_PATH, query=b"", headers=(), method="GET"):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": list(headers),
+    }
+
+
+@pytest.mark.django_db
+class TestEventStream:
+    def test_streams_events_for_the_token_user(self):
+        user = baker.make(User)
+        token = str(AccessToken.for_user(user))
+        app = EventStreamApp(application=None)
+
+        def publish():
+            get_broker().publish(user.pk, change_event("task", "created", [7]))
+
+        messages = run_stream(
+            app, http_scope(query=f"token={token}".encode()), on_start=publish
+        )
+
+        start = messages[0]
+        assert start["status"] == 200
+        assert (b"content-type", b"text/event-stream") in start["headers"]
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        data = body.split(b"event: change\ndata: ")[1].split(b"\n\n")[0]
+        assert json.loads(data) == {"model": "task", "action": "created", "ids": [7]}
+        assert get_broker().subscriber_count(user.pk) == 0
+
+    def test_requires_a_valid_token(self):
+        app = EventStreamApp(application=None)
+
+        messages = run_stream(
+            app, http_scope(headers=[(b"authorization", b"Bearer nonsense")])
+        )
+
+        assert messages[0]["status"] == 401
+
+    def test_allowed_origins_get_cors_headers(self):
+        user = baker.make(User)
+        token = str(AccessToken.for_user(user))
+        app = EventStreamApp(application=None)
+
+        def publish():
+            get_broker().publish(user.pk, change_event("task", "created", [7]))
+
+        allowed = run_stream(
+            app,
+            http_scope(
+                query=f"token={token}".encode(),
+                headers=[(b"origin", b"http://localhost:5173")],
+            ),
+            on_start=publish,
+        )
+        other = run_stream(
+            app, http_scope(headers=[(b"origin", b"https://example.com")])
+        )
+
+        headers = dict(allowed[0]["headers"])
+        assert headers[b"access-control-allow-origin"] == b"http://localhost:5173"
+        assert b"access-control-allow-origin" not in dict(other[0]["headers"])
+
+    def test_preflight(self):
+        app = EventStreamApp(application=None)
+
+        messages = run_stream(
+            app,
+            http_scope(
+                method="OPTIONS",
+                headers=[
+                    (b"origin", b"https://scheduler-site.liara.run"),
+                    (b"access-control-request-method", b"GET"),
+                    (b"access-control-request-headers", b"authorization"),
+                ],
+            ),
+        )
+
+        headers = dict(messages[0]["headers"])
+        assert messages[0]["status"] == 200
+        assert headers[b"access-control-allow-origin"] == (
+            b"https://scheduler-site.liara.run"
+        )
+        assert b"authorization" in headers[b"access-control-allow-headers"]
+
+    def test_other_paths_go_to_django(self):
+        calls = []
+
+        async def django_app(scope, receive, send):
+            calls.append(scope["path"])
+
+        app = EventStreamApp(django_app)
+
+        async_to_sync(app)(http_scope(path="/api/schedule/tasks/"), None, None)
+
+        assert calls == ["/api/schedule/tasks/"]
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Reminder
+
+
+@admin.register(Reminder)
+class ReminderAdmin(admin.ModelAdmin):
+    list_display = ["id", "task", "anchor", "offset_minutes", "fire_at", "sent_at"]
+    list_select_related = ["task"]
@@ -0,0 +1,45 @@
+import logging
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderSink:
+    """Where fired reminders go. `deliver()` raises if the reminder was not sent."""
+
+    def deliver(self, reminder):
+        raise NotImplementedError
+
+
+class LogSink(ReminderSink):
+    def deliver(self, reminder):
+        logger.info(
+            "reminder for task %s",
+            reminder.task_id,
+            extra={
+                "data": {
+                    "reminder": reminder.id,
+                    "task": reminder.task_id,
+                    "user": reminder.task.user_id,
+                    "title": reminder.task.title,
+                    "fire_at": reminder.fire_at.isoformat(),
+                }
+            },
+        )
+
+
+class InMemorySink(ReminderSink):
+    """Keeps delivered reminders in `delivered`, for tests."""
+
+    def __init__(self):
+        self.delivered = []
+
+    def deliver(self, reminder):
+        self.delivered.append(reminder)
+
+
+def get_sink():
+    return import_string(
+        getattr(settings, "REMINDER_SINK", "reminders.delivery.LogSink")
+    )()
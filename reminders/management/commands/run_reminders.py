@@ -0,0 +1,42 @@
+import signal
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from reminders.delivery import get_sink
+from reminders.scheduling import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = "Fire task reminders as they come due."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Fire what is due now and exit."
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        previous = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            self.work(options)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def work(self, options):
+        scheduler = ReminderScheduler(get_sink())
+        while not self.stopping:
+            close_old_connections()
+            sent = scheduler.run_pending()
+            if sent:
+                self.stdout.write(f"Sent {sent} reminders.")
+            if options["once"]:
+                break
+            # Short naps keep the worker responsive to SIGTERM.
+            time.sleep(min(scheduler.seconds_until_next(), 1.0))
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,62 @@
+from datetime import datetime, time, timedelta
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+from django.utils import timezone
+from scheduler.models import Task
+
+
+class Reminder(models.Model):
+    ANCHOR_START = "start"
+    ANCHOR_DEADLINE = "deadline"
+
+    ANCHOR_CHOICES = [
+        (ANCHOR_START, "Start"),
+        (ANCHOR_DEADLINE, "Deadline"),
+    ]
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="reminders")
+    anchor = models.CharField(
+        max_length=8, choices=ANCHOR_CHOICES, default=ANCHOR_START
+    )
+    # Minutes before the anchor, up to four weeks.
+    offset_minutes = models.PositiveIntegerField(
+        default=0, validators=[MinValueValidator(0), MaxValueValidator(40320)]
+    )
+    # Denormalized from the task, see `compute_fire_at`. Null when the task is
+    # completed or has no date for the anchor.
+    fire_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Only pending reminders are ever looked up by time, so the index
+            # stays as small as the backlog rather than the history.
+            models.Index(
+                fields=["fire_at"],
+                condition=models.Q(sent_at__isnull=True),
+                name="reminder_pending_fire_at",
+            )
+        ]
+
+    def compute_fire_at(self, task=None):
+        """
+        When this reminder should fire for `task` (default `self.task`).
+
+        "start" is the scheduled date at its start time (midnight without
+        one) and "deadline" is the end of the deadline day, both in the
+        current time zone.
+        """
+        task = task or self.task
+        if task.is_completed:
+            return None
+        if self.anchor == self.ANCHOR_START:
+            anchor = datetime.combine(task.scheduled_date, task.start_time or time.min)
+        elif task.dead_line is not None:
+            anchor = datetime.combine(task.dead_line + timedelta(days=1), time.min)
+        else:
+            return None
+        return timezone.make_aware(anchor) - timedelta(minutes=self.offset_minutes)
+
+    def __str__(self):
+        return f"{self.offset_minutes} min before {self.anchor} of task {self.task_id}"
@@ -0,0 +1,117 @@
+import heapq
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Reminder
+
+logger = logging.getLogger(__name__)
+
+
+def reschedule_task_reminders(task):
+    """
+    Recompute `fire_at` for `task`'s reminders after the task changed.
+
+    A reminder that already fired is re-armed when its new time is still
+    ahead, e.g. after the task was moved to a later day.
+    """
+    now = timezone.now()
+    changed = []
+    for reminder in Reminder.objects.filter(task_id=task.id):
+        fire_at = reminder.compute_fire_at(task)
+        if fire_at == reminder.fire_at:
+            continue
+        reminder.fire_at = fire_at
+        if fire_at is not None and fire_at > now:
+            reminder.sent_at = None
+        changed.append(reminder)
+    if changed:
+        Reminder.objects.bulk_update(changed, ["fire_at", "sent_at"])
+
+
+class ReminderScheduler:
+    """
+    Fires pending reminders at their `fire_at`.
+
+    Every `refresh` seconds the reminders due within the next `window`
+    seconds are read from the partial `fire_at` index into a min-heap; in
+    between, the worker only looks at the top of the heap. Each step costs
+    in proportion to the reminders coming due, however many tasks exist.
+    Reminders created for less than `refresh` seconds ahead fire at the next
+    refresh at the latest.
+    """
+
+    def __init__(self, sink, window=None, refresh=None, batch_size=None):
+        self.sink = sink
+        self.window = timedelta(
+            seconds=window or getattr(settings, "REMINDER_WINDOW", 300)
+        )
+        self.refresh = timedelta(
+            seconds=refresh or getattr(settings, "REMINDER_REFRESH_INTERVAL", 30)
+        )
+        self.batch_size = batch_size or getattr(settings, "REMINDER_BATCH_SIZE", 1000)
+        self.heap = []
+        self.next_refresh = None
+
+    def load(self, now):
+        rows = (
+            Reminder.objects.filter(
+                sent_at__isnull=True, fire_at__lte=now + self.window
+            )
+            .order_by("fire_at")
+            .values_list("fire_at", "id")[: self.batch_size]
+        )
+        self.heap = list(rows)
+        heapq.heapify(self.heap)
+        self.next_refresh = now + self.refresh
+        if len(self.heap) == self.batch_size:
+            # More are due than fit in a batch; come back as soon as the
+            # loaded ones are handled.
+            self.next_refresh = min(self.next_refresh, self.heap[-1][0])
+
+    def pop_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap)[1])
+        return due
+
+    def fire(self, reminder_ids, now):
+        """
+        Deliver the given reminders that are still pending and due.
+
+        Rows are locked with SKIP LOCKED where supported, so several workers
+        never deliver the same reminder. A reminder whose delivery fails stays
+        pending and is retried after the next refresh.
+        """
+        sent = []
+        with transaction.atomic():
+            reminders = (
+                Reminder.objects.select_for_update(skip_locked=True, of=("self",))
+                .filter(id__in=reminder_ids, sent_at__isnull=True, fire_at__lte=now)
+                .select_related("task")
+            )
+            for reminder in reminders:
+                try:
+                    self.sink.deliver(reminder)
+                except Exception:
+                    logger.exception("could not deliver reminder %s", reminder.id)
+                else:
+                    sent.append(reminder.id)
+            Reminder.objects.filter(id__in=sent).update(sent_at=now)
+        return len(sent)
+
+    def run_pending(self, now=None):
+        """Fire everything due at `now` and return the number delivered."""
+        now = now or timezone.now()
+        if self.next_refresh is None or now >= self.next_refresh:
+            self.load(now)
+        due = self.pop_due(now)
+        return self.fire(due, now) if due else 0
+
+    def seconds_until_next(self, now=None):
+        now = now or timezone.now()
+        wake_at = self.next_refresh
+        if self.heap:
+            wake_at = min(wake_at, self.heap[0][0])
+        return max((wake_at - now).total_seconds(), 0)
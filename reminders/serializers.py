@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from .models import Reminder
+
+
+class ReminderSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Reminder
+        fields = ["id", "anchor", "offset_minutes", "fire_at", "sent_at"]
+        read_only_fields = ["fire_at", "sent_at"]
+
+    def create(self, validated_data):
+        task = self.context["task"]
+        reminder = Reminder(task=task, **validated_data)
+        reminder.fire_at = reminder.compute_fire_at(task)
+        reminder.save()
+        return reminder
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # A changed reminder is pending again.
+        instance.fire_at = instance.compute_fire_at(self.context["task"])
+        instance.sent_at = None
+        instance.save()
+        return instance
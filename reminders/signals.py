@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from scheduler.models import Task
+from .scheduling import reschedule_task_reminders
+
+
+@receiver(post_save, sender=Task)
+def reschedule_reminders(sender, instance, created, **kwargs):
+    if not created:
+        reschedule_task_reminders(instance)
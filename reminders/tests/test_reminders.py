@@ -0,0 +1,127 @@
+from datetime import datetime, time, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from reminders.delivery import InMemorySink
+from reminders.models import Reminder
+from reminders.scheduling import ReminderScheduler
+from scheduler.models import Task
+from model_bakery import baker
+import pytest
+
+
+def aware(day, at):
+    return timezone.make_aware(datetime.combine(day, at))
+
+
+@pytest.fixture
+def task(authentication):
+    user = authentication()
+    tomorrow = timezone.localdate() + timedelta(days=1)
+    return baker.make(
+        Task,
+        user=user,
+        scheduled_date=tomorrow,
+        start_time=time(9, 0),
+        dead_line=tomorrow + timedelta(days=2),
+    )
+
+
+def make_reminder(task, **kwargs):
+    reminder = Reminder(task=task, **kwargs)
+    reminder.fire_at = reminder.compute_fire_at()
+    reminder.save()
+    return reminder
+
+
+@pytest.mark.django_db
+class TestReminderApi:
+    def test_create_computes_fire_at(self, task, api_client):
+        response = api_client.post(
+            f"/api/schedule/tasks/{task.id}/reminders/",
+            {"anchor": "start", "offset_minutes": 15},
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        reminder = Reminder.objects.get()
+        assert reminder.fire_at == aware(task.scheduled_date, time(8, 45))
+
+    def test_other_users_task(self, task, api_client):
+        other = baker.make(Task)
+
+        response = api_client.get(f"/api/schedule/tasks/{other.id}/reminders/")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestRescheduling:
+    def test_moving_the_task_moves_its_reminders(self, task):
+        start = make_reminder(task, anchor="start", offset_minutes=60)
+        deadline = make_reminder(task, anchor="deadline")
+        start.sent_at = timezone.now()
+        start.save()
+
+        task.scheduled_date += timedelta(days=1)
+        task.dead_line = None
+        task.save()
+
+        start.refresh_from_db()
+        deadline.refresh_from_db()
+        assert start.fire_at == aware(task.scheduled_date, time(8, 0))
+        assert start.sent_at is None
+        assert deadline.fire_at is None
+
+    def test_completed_tasks_do_not_remind(self, task):
+        reminder = make_reminder(task)
+
+        task.is_completed = True
+        task.save()
+
+        reminder.refresh_from_db()
+        assert reminder.fire_at is None
+
+
+@pytest.mark.django_db
+class TestScheduler:
+    def test_fires_due_reminders_once(self, task):
+        reminder = make_reminder(task)
+        later = make_reminder(task, anchor="deadline")
+        sink = InMemorySink()
+        scheduler = ReminderScheduler(sink, window=60, refresh=30)
+
+        assert scheduler.run_pending(reminder.fire_at - timedelta(seconds=10)) == 0
+        assert scheduler.run_pending(reminder.fire_at) == 1
+        assert scheduler.run_pending(reminder.fire_at + timedelta(seconds=1)) == 0
+
+        assert [r.id for r in sink.delivered] == [reminder.id]
+        reminder.refresh_from_db()
+        later.refresh_from_db()
+        assert reminder.sent_at is not None
+        assert later.sent_at is None
+
+    def test_heap_steps_do_not_query(self, task):
+        reminder = make_reminder(task)
+        scheduler = ReminderScheduler(InMemorySink(), window=600, refresh=300)
+        now = reminder.fire_at - timedelta(minutes=5)
+        scheduler.run_pending(now)
+
+        with CaptureQueriesContext(connection) as ctx:
+            scheduler.run_pending(now + timedelta(seconds=30))
+
+        assert len(ctx.captured_queries) == 0
+        assert scheduler.seconds_until_next(now) == 300
+
+    def test_failed_delivery_stays_pending(self, task):
+        reminder = make_reminder(task)
+
+        class BrokenSink(InMemorySink):
+            def deliver(self, reminder):
+                raise ConnectionError
+
+        scheduler = ReminderScheduler(BrokenSink(), window=60, refresh=30)
+
+        assert scheduler.run_pending(reminder.fire_at) == 0
+        reminder.refresh_from_db()
+        assert reminder.sent_at is None
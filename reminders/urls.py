@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+from . import views
+
+router = SimpleRouter()
+router.register(
+    r"tasks/(?P<task_pk>\d+)/reminders", views.ReminderViewSet, basename="task-reminder"
+)
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
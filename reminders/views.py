@@ -0,0 +1,26 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.viewsets import ModelViewSet
+from scheduler.models import Task
+from .models import Reminder
+from .serializers import ReminderSerializer
+
+
+class ReminderViewSet(ModelViewSet):
+    permission_classes = [IsAuthenticated]
+    serializer_class = ReminderSerializer
+
+    def get_task(self):
+        if not hasattr(self, "_task"):
+            self._task = get_object_or_404(
+                Task, pk=self.kwargs["task_pk"], user=self.request.user
+            )
+        return self._task
+
+    def get_queryset(self):
+        return Reminder.objects.filter(task=self.get_task()).order_by("fire_at", "id")
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["task"] = self.get_task()
+        return context
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import (
+    ArchivedSubTask,
+    ArchivedTaggedItem,
+    ArchivedTask,
+    SubTask,
+    TaggedItem,
+    Task,
+)
+from .tag_snapshot import delete_tagged_items
+
+
+def archive_cutoff(horizon_days=None):
+    """Tasks scheduled before this date are old enough to archive."""
+    if horizon_days is None:
+        horizon_days = getattr(settings, "TASK_ARCHIVE_HORIZON_DAYS", 90)
+    return timezone.localdate() - timedelta(days=horizon_days)
+
+
+def archivable_tasks(cutoff):
+    return Task.objects.filter(is_completed=True, scheduled_date__lt=cutoff).order_by(
+        "scheduled_date", "id"
+    )
+
+
+def _copy(instance, model):
+    # Archive models mirror the live ones field for field (by attname).
+    return model(
+        **{
+            field.attname: getattr(instance, field.attname)
+            for field in instance._meta.concrete_fields
+        }
+    )
+
+
+def archive_batch(cutoff, batch_size=500):
+    """
+    Move up to `batch_size` archivable tasks, with their subtasks and tagged
+    items, into the archive tables in one transaction. Returns the number of
+    tasks moved.
+
+    Rows locked by a concurrent writer are skipped and picked up by a later
+    batch.
+    """
+    with transaction.atomic():
+        tasks = list(
+            archivable_tasks(cutoff).select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not tasks:
+            return 0
+        task_ids = [task.id for task in tasks]
+
+        ArchivedTask.objects.bulk_create([_copy(task, ArchivedTask) for task in tasks])
+        ArchivedSubTask.objects.bulk_create(
+            [
+                _copy(subtask, ArchivedSubTask)
+                for subtask in SubTask.objects.filter(parent_task_id__in=task_ids)
+            ]
+        )
+        tagged_items = TaggedItem.objects.filter(task_id__in=task_ids)
+        ArchivedTaggedItem.objects.bulk_create(
+            [_copy(item, ArchivedTaggedItem) for item in tagged_items]
+        )
+
+        # The snapshots go with the tasks, so skip the per-row TaggedItem
+        # signals; the subtasks go with the cascade.
+        delete_tagged_items(tagged_items)
+        Task.objects.filter(id__in=task_ids).delete()
+    return len(task_ids)
@@ -1,8 +1,72 @@
-from django_filters import FilterSet
-from .models import Task
+from django.db.models import Count
+from django_filters import BaseInFilter, ChoiceFilter, FilterSet, NumberFilter
+from .models import ArchivedTaggedItem, ArchivedTask, Task, TaggedItem
+
+
+class NumberInFilter(BaseInFilter, NumberFilter):
+    pass
+
+
+def tasks_with_tags(tag_ids, match_all=False, tagged_item_model=TaggedItem):
+    """
+    Subquery of task ids tagged with any (or all) of `tag_ids`.
+
+    "All" is a single grouped `HAVING COUNT(*) = len(tag_ids)`, which relies
+    on `TaggedItem`'s (tag, task) uniqueness instead of one join per tag.
+    """
+    tagged = tagged_item_model.objects.filter(tag_id__in=tag_ids)
+    if not match_all:
+        return tagged.values("task_id")
+    return (
+        tagged.values("task_id")
+        .annotate(matched=Count("tag_id"))
+        .filter(matched=len(tag_ids))
+        .values("task_id")
+    )
 
 
 class TaskFilter(FilterSet):
+    TAGS_MODE_ANY = "any"
+    TAGS_MODE_ALL = "all"
+
+    tags = NumberInFilter(method="filter_tags")
+    tags_mode = ChoiceFilter(
+        choices=[(TAGS_MODE_ANY, "Any"), (TAGS_MODE_ALL, "All")],
+        method="filter_tags_mode",
+    )
+    exclude_tags = NumberInFilter(method="filter_exclude_tags")
+
+    tagged_item_model = TaggedItem
+
     class Meta:
         model = Task
         fields = {"category": ["exact"], "scheduled_date": ["exact"]}
+
+    def filter_tags(self, queryset, name, value):
+        tag_ids = {int(tag_id) for tag_id in value}
+        if not tag_ids:
+            return queryset
+
+        match_all = self.form.cleaned_data.get("tags_mode") == self.TAGS_MODE_ALL
+        return queryset.filter(
+            id__in=tasks_with_tags(tag_ids, match_all, self.tagged_item_model)
+        )
+
+    def filter_tags_mode(self, queryset, name, value):
+        # Read by filter_tags.
+        return queryset
+
+    def filter_exclude_tags(self, queryset, name, value):
+        tag_ids = {int(tag_id) for tag_id in value}
+        if not tag_ids:
+            return queryset
+        return queryset.exclude(
+            id__in=tasks_with_tags(tag_ids, tagged_item_model=self.tagged_item_model)
+        )
+
+
+class ArchivedTaskFilter(TaskFilter):
+    tagged_item_model = ArchivedTaggedItem
+
+    class Meta(TaskFilter.Meta):
+        model = ArchivedTask
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from asgiref.sync import sync_to_async
+
+# Tasks are rendered in groups so a streamed feed sends a few large chunks
+# rather than one per task.
+CHUNK_SIZE = 200
+
+PRIORITIES = {"H": 1, "M": 5, "L": 9}
+
+
+def escape(value):
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Fold a content line at 75 octets as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte UTF-8 sequence.
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_date(value):
+    return value.strftime("%Y%m%d")
+
+
+def format_local(day, at):
+    # Floating time: tasks carry wall-clock times without a zone.
+    return datetime.combine(day, at).strftime("%Y%m%dT%H%M%S")
+
+
+def format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def task_events(task, host):
+    stamp = format_utc(task.updated_at)
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:task-{task.id}@{host}",
+        f"DTSTAMP:{stamp}",
+        f"LAST-MODIFIED:{stamp}",
+        f"SUMMARY:{escape(task.title)}",
+    ]
+    if task.description:
+        lines.append(f"DESCRIPTION:{escape(task.description)}")
+    if task.start_time is not None:
+        lines.append(f"DTSTART:{format_local(task.scheduled_date, task.start_time)}")
+        if task.end_time is not None and task.end_time > task.start_time:
+            lines.append(f"DTEND:{format_local(task.scheduled_date, task.end_time)}")
+    else:
+        lines.append(f"DTSTART;VALUE=DATE:{format_date(task.scheduled_date)}")
+        lines.append(
+            f"DTEND;VALUE=DATE:{format_date(task.scheduled_date + timedelta(days=1))}"
+        )
+    lines.append(f"PRIORITY:{PRIORITIES.get(task.priority_level, 0)}")
+    if task.is_completed:
+        lines.append("X-TASK-COMPLETED:TRUE")
+    lines.append("END:VEVENT")
+
+    if task.dead_line is not None:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:task-{task.id}-deadline@{host}",
+            f"DTSTAMP:{stamp}",
+            f"SUMMARY:{escape(f'Deadline: {task.title}')}",
+            f"DTSTART;VALUE=DATE:{format_date(task.dead_line)}",
+            f"DTEND;VALUE=DATE:{format_date(task.dead_line + timedelta(days=1))}",
+            "TRANSP:TRANSPARENT",
+            "END:VEVENT",
+        ]
+    return "".join(fold(line) for line in lines)
+
+
+def render_calendar(tasks, host, name="Tasks"):
+    """
+    Yield an iCalendar document for `tasks` in chunks of `CHUNK_SIZE` events.
+
+    `tasks` is consumed lazily, so with a `QuerySet.iterator()` memory stays
+    bounded however long the history is.
+    """
+    yield "".join(
+        fold(line)
+        for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:-//{host}//Scheduler//EN",
+            "CALSCALE:GREGORIAN",
+            f"X-WR-CALNAME:{escape(name)}",
+        )
+    )
+    tasks = iter(tasks)
+    while chunk := list(islice(tasks, CHUNK_SIZE)):
+        yield "".join(task_events(task, host) for task in chunk)
+    yield "END:VCALENDAR\r\n"
+
+
+async def aiterate(iterator):
+    """
+    Async wrapper for a blocking iterator, for streaming under ASGI.
+
+    Django would otherwise read a sync iterator into memory before sending
+    it. Each step runs in the thread that owns the request's database
+    connection.
+    """
+    step = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await step(iterator, None)) is not None:
+        yield chunk
@@ -0,0 +1,26 @@
+from jobs.registry import register
+from .archive import archive_batch, archive_cutoff
+from .models import Task
+from .tag_snapshot import find_stale_snapshots, refresh_tag_snapshots
+
+
+@register("scheduler.archive_tasks", concurrency=1)
+def archive_tasks(horizon_days=None, batch_size=500):
+    cutoff = archive_cutoff(horizon_days)
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            break
+    return {"archived": total, "cutoff": cutoff.isoformat()}
+
+
+@register("scheduler.repair_tag_snapshots", concurrency=1)
+def repair_tag_snapshots(user_id=None, batch_size=500):
+    queryset = Task.objects.order_by("id")
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+    stale = [task_id for task_id, _, _ in find_stale_snapshots(queryset, batch_size)]
+    refresh_tag_snapshots(stale, batch_size)
+    return {"repaired": len(stale)}
@@ -0,0 +1,53 @@
+import time
+from django.core.management.base import BaseCommand
+from scheduler.archive import archivable_tasks, archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed tasks scheduled before the archive horizon, with their "
+        "subtasks and tags, into the archive tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            help="Archive tasks older than this (default TASK_ARCHIVE_HORIZON_DAYS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.5,
+            help="Seconds to pause between batches.",
+        )
+        parser.add_argument(
+            "--max-batches", type=int, help="Stop after this many batches."
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only report what would move."
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["horizon_days"])
+
+        if options["dry_run"]:
+            count = archivable_tasks(cutoff).count()
+            self.stdout.write(f"{count} tasks scheduled before {cutoff} to archive.")
+            return
+
+        total = batches = 0
+        while True:
+            moved = archive_batch(cutoff, options["batch_size"])
+            total += moved
+            batches += 1
+            if moved < options["batch_size"]:
+                break
+            if options["max_batches"] and batches >= options["max_batches"]:
+                break
+            time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived {total} tasks scheduled before {cutoff}.")
+        )
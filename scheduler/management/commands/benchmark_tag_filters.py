@@ -0,0 +1,93 @@
+import random
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from scheduler.filters import tasks_with_tags
+from scheduler.models import Tag, Task, TaggedItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark multi-tag task filtering against per-tag joins on synthetic "
+        "data. Everything is created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=20000)
+        parser.add_argument("--tags", type=int, default=200)
+        parser.add_argument("--fan-out", type=int, default=20, help="tags per task")
+        parser.add_argument("--query-tags", type=int, default=4)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        if not 1 <= options["query_tags"] <= options["tags"]:
+            raise CommandError("--query-tags must be between 1 and --tags.")
+        rng = random.Random(options["seed"])
+
+        with transaction.atomic():
+            tag_ids = self.populate(rng, options)
+            query = rng.sample(tag_ids, options["query_tags"])
+            base = Task.objects.filter(user=self.user)
+
+            joined_all = base
+            for tag_id in query:
+                joined_all = joined_all.filter(tagged_items__tag_id=tag_id)
+
+            cases = [
+                ("any (semi-join)", base.filter(id__in=tasks_with_tags(query))),
+                (
+                    "any (join + distinct)",
+                    base.filter(tagged_items__tag_id__in=query).distinct(),
+                ),
+                (
+                    "all (HAVING COUNT)",
+                    base.filter(id__in=tasks_with_tags(query, True)),
+                ),
+                (f"all ({len(query)} joins)", joined_all),
+                ("exclude (anti-join)", base.exclude(id__in=tasks_with_tags(query))),
+            ]
+            for label, queryset in cases:
+                self.report(label, queryset, options["repeat"])
+
+            transaction.set_rollback(True)
+
+    def populate(self, rng, options):
+        self.user = get_user_model().objects.create_user(
+            username="benchmark-tag-filters", email="benchmark@example.com"
+        )
+        tags = Tag.objects.bulk_create(
+            Tag(title=f"tag-{i}", user=self.user) for i in range(options["tags"])
+        )
+        tasks = Task.objects.bulk_create(
+            Task(title=f"task-{i}", user=self.user) for i in range(options["tasks"])
+        )
+        tag_ids = [tag.id for tag in tags]
+        fan_out = min(options["fan_out"], len(tag_ids))
+        TaggedItem.objects.bulk_create(
+            (
+                TaggedItem(task_id=task.id, tag_id=tag_id)
+                for task in tasks
+                for tag_id in rng.sample(tag_ids, fan_out)
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(
+            f"{len(tasks)} tasks, {len(tag_ids)} tags, {fan_out} tags per task"
+        )
+        return tag_ids
+
+    def report(self, label, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = len(queryset.values_list("id", flat=True))
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f"{label:<24} rows={count:<7} "
+            f"best={timings[0]:8.2f} ms  median={timings[len(timings) // 2]:8.2f} ms"
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from scheduler.models import Task
+from scheduler.tag_snapshot import find_stale_snapshots, refresh_tag_snapshots
+
+
+class Command(BaseCommand):
+    help = "Compare Task.tag_snapshot with TaggedItem and optionally repair it."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix", action="store_true", help="Rewrite stale snapshots."
+        )
+        parser.add_argument("--user", type=int, help="Only check this user's tasks.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        queryset = Task.objects.order_by("id")
+        if options["user"]:
+            queryset = queryset.filter(user_id=options["user"])
+
+        stale = []
+        for task_id, stored, expected in find_stale_snapshots(
+            queryset, options["batch_size"]
+        ):
+            stale.append(task_id)
+            self.stdout.write(f"task {task_id}: stored={stored} expected={expected}")
+
+        if not stale:
+            self.stdout.write(self.style.SUCCESS("All tag snapshots are consistent."))
+            return
+
+        if options["fix"]:
+            refresh_tag_snapshots(stale, options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Repaired {len(stale)} tasks."))
+        else:
+            self.stdout.write(
+                self.style.WARNING(f"{len(stale)} stale tasks; rerun with --fix.")
+            )
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "scheduler",
+            "0014_task_end_time_task_start_time_alter_task_description_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="task",
+            name="scheduled_date",
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+    ]
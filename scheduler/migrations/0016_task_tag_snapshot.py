@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:47
+
+from django.db import migrations, models
+
+
+def backfill_tag_snapshots(apps, schema_editor):
+    Task = apps.get_model("scheduler", "Task")
+    TaggedItem = apps.get_model("scheduler", "TaggedItem")
+
+    snapshots = {}
+    rows = TaggedItem.objects.values_list("task_id", "tag_id", "tag__title")
+    for task_id, tag_id, title in rows.iterator(chunk_size=2000):
+        snapshots.setdefault(task_id, []).append({"id": tag_id, "title": title})
+
+    tasks = [
+        Task(id=task_id, tag_snapshot=sorted(snapshot, key=lambda tag: tag["id"]))
+        for task_id, snapshot in snapshots.items()
+    ]
+    Task.objects.bulk_update(tasks, ["tag_snapshot"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scheduler", "0015_alter_task_scheduled_date"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="tag_snapshot",
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(backfill_tag_snapshots, migrations.RunPython.noop),
+    ]
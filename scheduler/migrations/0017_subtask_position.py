@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:50
+
+from django.db import migrations, models
+
+POSITION_GAP = 1024
+
+
+def backfill_positions(apps, schema_editor):
+    SubTask = apps.get_model("scheduler", "SubTask")
+
+    batch = []
+    current_task, rank = None, 0
+    rows = SubTask.objects.order_by("parent_task_id", "id").only("id", "parent_task_id")
+    for subtask in rows.iterator(chunk_size=2000):
+        if subtask.parent_task_id != current_task:
+            current_task, rank = subtask.parent_task_id, 0
+        rank += 1
+        subtask.position = rank * POSITION_GAP
+        batch.append(subtask)
+        if len(batch) >= 2000:
+            SubTask.objects.bulk_update(batch, ["position"])
+            batch = []
+    if batch:
+        SubTask.objects.bulk_update(batch, ["position"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scheduler", "0016_task_tag_snapshot"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="subtask",
+            options={"ordering": ["position", "id"]},
+        ),
+        migrations.AddField(
+            model_name="subtask",
+            name="position",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="subtask",
+            index=models.Index(
+                fields=["parent_task", "position"],
+                name="scheduler_s_parent__1ec462_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+    ]
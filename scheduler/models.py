@@ -1,3 +1,4 @@
+import secrets
 from django.db import models
 from django.conf import settings
 from scheduler.validators import validate_date_not_past
@@ -36,7 +37,7 @@ class Task(models.Model):
     priority_level = models.CharField(
         max_length=1, choices=PRIORITY_LEVEL_CHOICES, default=PRIORITY_LEVEL_MEDIUM
     )
-    scheduled_date = models.DateField(default=timezone.now)
+    scheduled_date = models.DateField(default=timezone.localdate)
     dead_line = models.DateField(null=True, validators=[validate_date_not_past])
     start_time = models.TimeField(null=True, blank=True)
     end_time = models.TimeField(null=True, blank=True)
@@ -44,6 +45,8 @@ class Task(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tasks"
     )
+    # Denormalized tags, see scheduler.tag_snapshot.
+    tag_snapshot = models.JSONField(default=list, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -54,13 +57,76 @@ class Task(models.Model):
         return self.title
 
 
+class SubTaskManager(models.Manager):
+    def next_position(self, task_id):
+        last = self.filter(parent_task_id=task_id).aggregate(
+            last=models.Max("position")
+        )
+        return (last["last"] or 0) + SubTask.POSITION_GAP
+
+    def move_after(self, subtask, after=None):
+        """
+        Place `subtask` right after `after` (or first when `after` is None).
+
+        Only `subtask`'s row is written, unless its new neighbours have no
+        gap left between them, in which case the task's subtasks are
+        re-spaced first.
+        """
+        siblings = self.filter(parent_task_id=subtask.parent_task_id).exclude(
+            pk=subtask.pk
+        )
+        lower = after.position if after is not None else None
+        following = siblings.order_by("position", "id")
+        if after is not None:
+            following = following.filter(
+                models.Q(position__gt=after.position)
+                | models.Q(position=after.position, id__gt=after.id)
+            )
+        upper = following.values_list("position", flat=True).first()
+
+        if lower is None and upper is None:
+            return subtask
+        if lower is None:
+            position = upper - SubTask.POSITION_GAP
+        elif upper is None:
+            position = lower + SubTask.POSITION_GAP
+        elif upper - lower >= 2:
+            position = (lower + upper) // 2
+        else:
+            self.respace(subtask.parent_task_id)
+            if after is not None:
+                after.refresh_from_db(fields=["position"])
+            return self.move_after(subtask, after)
+
+        self.filter(pk=subtask.pk).update(position=position)
+        subtask.position = position
+        return subtask
+
+    def respace(self, task_id):
+        subtasks = list(self.filter(parent_task_id=task_id).only("id", "position"))
+        for rank, subtask in enumerate(subtasks, start=1):
+            subtask.position = rank * SubTask.POSITION_GAP
+        self.bulk_update(subtasks, ["position"])
+
+
 class SubTask(models.Model):
+    # Positions are spaced by POSITION_GAP so a subtask can be moved between
+    # two neighbours by rewriting only its own row.
+    POSITION_GAP = 1024
+
     title = models.CharField(max_length=150)
     is_completed = models.BooleanField(default=False)
+    position = models.BigIntegerField(default=0)
     parent_task = models.ForeignKey(
         Task, on_delete=models.CASCADE, related_name="subTasks"
     )
 
+    objects = SubTaskManager()
+
+    class Meta:
+        ordering = ["position", "id"]
+        indexes = [models.Index(fields=["parent_task", "position"])]
+
 
 class Tag(models.Model):
     title = models.CharField(max_length=40)
@@ -84,3 +150,84 @@ class TaggedItem(models.Model):
 
     class Meta:
         unique_together = ["tag", "task"]
+
+
+# Archive of old completed tasks, filled by scheduler.archive. Rows keep the
+# ids they had in the live tables so references stay meaningful; the live
+# tables and their indexes only hold the working set.
+
+
+class ArchivedTask(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=150)
+    description = models.TextField(default="", blank=True)
+    category = models.ForeignKey(
+        TaskCategory,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="archived_tasks",
+    )
+    priority_level = models.CharField(max_length=1, choices=Task.PRIORITY_LEVEL_CHOICES)
+    scheduled_date = models.DateField()
+    dead_line = models.DateField(null=True)
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+    is_completed = models.BooleanField(default=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_tasks",
+    )
+    # Tags as they were when the task was archived.
+    tag_snapshot = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "scheduled_date"])]
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedSubTask(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=150)
+    is_completed = models.BooleanField(default=False)
+    position = models.BigIntegerField(default=0)
+    parent_task = models.ForeignKey(
+        ArchivedTask, on_delete=models.CASCADE, related_name="subTasks"
+    )
+
+    class Meta:
+        ordering = ["position", "id"]
+
+
+class ArchivedTaggedItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="+")
+    task = models.ForeignKey(
+        ArchivedTask, on_delete=models.CASCADE, related_name="tagged_items"
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ["tag", "task"]
+
+
+def new_feed_token():
+    return secrets.token_urlsafe(24)
+
+
+class CalendarFeed(models.Model):
+    """Secret token for a user's read-only iCalendar feed (see scheduler.ics)."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="calendar_feed"
+    )
+    token = models.CharField(max_length=64, unique=True, default=new_feed_token)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Calendar feed of {self.user}"
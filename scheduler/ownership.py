@@ -0,0 +1,117 @@
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import serializers
+from .models import Tag, TaskCategory
+
+
+def _version_key(user_id):
+    return f"ownership-version:{user_id}"
+
+
+def bump_data_version(user_id):
+    """Invalidate every cached ownership set of `user_id`."""
+    cache.set(_version_key(user_id), uuid.uuid4().hex, None)
+
+
+def get_data_version(user_id):
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # A random token (not a counter) so an evicted version can never
+        # collide with one that still has cached sets.
+        version = uuid.uuid4().hex
+        cache.set(_version_key(user_id), version, None)
+    return version
+
+
+class OwnershipResolver:
+    """
+    The categories and tags a user owns, loaded at most once per request.
+
+    With `OWNERSHIP_CACHE_TIMEOUT` set, the loaded sets are also cached across
+    requests under the user's data version, which changes whenever one of
+    their categories or tags is saved or deleted. Only enable it with a cache
+    shared by all processes.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._loaded = {}
+
+    @classmethod
+    def for_request(cls, request):
+        resolver = getattr(request, "_ownership_resolver", None)
+        if resolver is None:
+            resolver = cls(request.user)
+            request._ownership_resolver = resolver
+        return resolver
+
+    def _load(self, name, queryset):
+        if name in self._loaded:
+            return self._loaded[name]
+
+        timeout = getattr(settings, "OWNERSHIP_CACHE_TIMEOUT", 0)
+        key = None
+        objects = None
+        if timeout:
+            version = get_data_version(self.user.pk)
+            key = f"ownership:{self.user.pk}:{version}:{name}"
+            objects = cache.get(key)
+
+        if objects is None:
+            objects = {obj.pk: obj for obj in queryset.filter(user=self.user)}
+            if key is not None:
+                cache.set(key, objects, timeout)
+
+        self._loaded[name] = objects
+        return objects
+
+    @property
+    def categories(self):
+        return self._load("categories", TaskCategory.objects.all())
+
+    @property
+    def tags(self):
+        return self._load("tags", Tag.objects.all())
+
+
+class OwnedCategoryField(serializers.PrimaryKeyRelatedField):
+    """Category primary key, validated against the requesting user's categories."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", TaskCategory.objects.none())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        request = self.context["request"]
+        category = OwnershipResolver.for_request(request).categories.get(pk)
+        if category is None:
+            self.fail("does_not_exist", pk_value=data)
+        return category
+
+
+class OwnedTagListField(serializers.ListField):
+    """List of tag ids, all of which must belong to the requesting user."""
+
+    default_error_messages = {
+        "does_not_exist": "Tags not found: {pk_values}.",
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("child", serializers.IntegerField())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        tag_ids = list(dict.fromkeys(super().to_internal_value(data)))
+
+        request = self.context["request"]
+        owned = OwnershipResolver.for_request(request).tags
+        missing = [tag_id for tag_id in tag_ids if tag_id not in owned]
+        if missing:
+            self.fail("does_not_exist", pk_values=missing)
+        return tag_ids
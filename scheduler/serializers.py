@@ -1,7 +1,28 @@
-from django.db import transaction, IntegrityError
+from django.conf import settings
+from django.urls import reverse
+from django.db import connection, transaction, IntegrityError
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from scheduler.models import Tag, TaskCategory, Task, SubTask, TaggedItem
+from realtime.events import UPDATED, publish_change
+from scheduler.models import (
+    ArchivedTask,
+    CalendarFeed,
+    Tag,
+    TaskCategory,
+    Task,
+    SubTask,
+    TaggedItem,
+)
+from scheduler.tag_snapshot import (
+    delete_tagged_items,
+    refresh_tag_snapshots,
+    snapshot_of,
+)
+from scheduler.ownership import (
+    OwnedCategoryField,
+    OwnedTagListField,
+    OwnershipResolver,
+)
 
 
 class TaskCategorySerializer(serializers.ModelSerializer):
@@ -32,7 +53,81 @@ class SubTaskSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         parent_id = self.context["task_pk"]
-        return SubTask.objects.create(**validated_data, parent_task_id=parent_id)
+        return SubTask.objects.create(
+            **validated_data,
+            parent_task_id=parent_id,
+            position=SubTask.objects.next_position(parent_id),
+        )
+
+
+class SubTaskReorderSerializer(serializers.Serializer):
+    order = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_order(self, value):
+        if len(set(value)) != len(value) or set(value) != self.context["subtask_ids"]:
+            raise serializers.ValidationError(
+                "The order must list every subtask of the task exactly once."
+            )
+        return value
+
+    def save(self):
+        subtasks = [
+            SubTask(id=subtask_id, position=rank * SubTask.POSITION_GAP)
+            for rank, subtask_id in enumerate(self.validated_data["order"], start=1)
+        ]
+        SubTask.objects.bulk_update(subtasks, ["position"])
+        return subtasks
+
+
+class SubTaskToggleItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    is_completed = serializers.BooleanField()
+
+
+class SubTaskToggleSerializer(serializers.Serializer):
+    items = SubTaskToggleItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, value):
+        subtask_ids = self.context["subtask_ids"]
+        missing = [item["id"] for item in value if item["id"] not in subtask_ids]
+        if missing:
+            raise serializers.ValidationError(f"Subtasks not found: {missing}.")
+        return value
+
+    def save(self):
+        subtasks = [
+            SubTask(id=item["id"], is_completed=item["is_completed"])
+            for item in self.validated_data["items"]
+        ]
+        SubTask.objects.bulk_update(subtasks, ["is_completed"])
+        return subtasks
+
+
+class SubTaskMoveSerializer(serializers.Serializer):
+    after = serializers.IntegerField(allow_null=True)
+
+    def validate_after(self, value):
+        if value is None:
+            return None
+        subtask = self.context["subtask"]
+        if value == subtask.id:
+            raise serializers.ValidationError("A subtask cannot follow itself.")
+        after = SubTask.objects.filter(
+            id=value, parent_task_id=subtask.parent_task_id
+        ).first()
+        if after is None:
+            raise serializers.ValidationError("Subtask not found.")
+        return after
+
+    def save(self):
+        return SubTask.objects.move_after(
+            self.context["subtask"], self.validated_data["after"]
+        )
+
+
+class SubTaskUpdateSerializer(SubTaskSerializer):
+    # Writable so existing subtasks can be matched instead of recreated.
+    id = serializers.IntegerField(required=False)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -51,11 +146,45 @@ class TagSerializer(serializers.ModelSerializer):
             raise ValidationError({"detail": "The Tag is already exists."})
 
 
+def cache_written_relations(task, sub_tasks, tagged_items):
+    """
+    Seed the relation caches `TaskSerializer` reads from with objects that
+    were just written, so the response needs no further queries.
+    """
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # Without RETURNING, bulk-created rows have no primary key yet.
+        sub_tasks = list(SubTask.objects.filter(parent_task=task))
+        tagged_items = list(TaggedItem.objects.filter(task=task).select_related("tag"))
+
+    task._prefetched_objects_cache = {
+        "subTasks": sub_tasks,
+        "tagged_items": tagged_items,
+    }
+    task.prefetched_tagged_items = tagged_items
+
+
 class TaskSerializer(serializers.ModelSerializer):
     subTasks = SubTaskSerializer(many=True)
     tags = serializers.SerializerMethodField()
+    subtasks_total = serializers.SerializerMethodField()
+    subtasks_done = serializers.SerializerMethodField()
+
+    def get_subtasks_total(self, obj):
+        # Annotated by TaskViewSet in compact mode, otherwise counted from the
+        # prefetched subtasks.
+        if hasattr(obj, "subtasks_total"):
+            return obj.subtasks_total
+        return len(obj.subTasks.all())
+
+    def get_subtasks_done(self, obj):
+        if hasattr(obj, "subtasks_done"):
+            return obj.subtasks_done
+        return sum(1 for subtask in obj.subTasks.all() if subtask.is_completed)
 
     def get_tags(self, obj):
+        if settings.TASK_TAG_SNAPSHOT:
+            return obj.tag_snapshot
+
         if hasattr(obj, "prefetched_tagged_items"):
             tagged_items = obj.prefetched_tagged_items
         else:
@@ -78,12 +207,36 @@ class TaskSerializer(serializers.ModelSerializer):
             "end_time",
             "is_completed",
             "subTasks",
+            "subtasks_total",
+            "subtasks_done",
             "updated_at",
             "tags",
         ]
 
 
+class TaskListSerializer(TaskSerializer):
+    """`TaskSerializer` without the subtask bodies, only their counts."""
+
+    class Meta(TaskSerializer.Meta):
+        fields = [field for field in TaskSerializer.Meta.fields if field != "subTasks"]
+
+
+class ArchivedTaskSerializer(TaskSerializer):
+    class Meta(TaskSerializer.Meta):
+        model = ArchivedTask
+        fields = TaskSerializer.Meta.fields + ["archived_at"]
+
+
+class ArchivedTaskListSerializer(ArchivedTaskSerializer):
+    class Meta(ArchivedTaskSerializer.Meta):
+        fields = [
+            field for field in ArchivedTaskSerializer.Meta.fields if field != "subTasks"
+        ]
+
+
 class TaskCreateSerializer(serializers.ModelSerializer):
+    category = OwnedCategoryField(allow_null=True, required=False)
+
     class Meta:
         model = Task
         fields = [
@@ -97,28 +250,6 @@ class TaskCreateSerializer(serializers.ModelSerializer):
             "dead_line"
         ]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        request = self.context.get("request")
-
-        if request and hasattr(request, "user"):
-            self.fields["category"].queryset = TaskCategory.objects.filter(
-                user=request.user
-            )
-
-    def validate_category(self, value):
-        if value is None:
-            return value
-
-        request = self.context.get("request")
-        if (
-            request
-            and not TaskCategory.objects.filter(title=value, user=request.user).exists()
-        ):
-            raise serializers.ValidationError({"detail": "The task category not found"})
-        return value
-
     def validate(self, attrs):
         scheduled_date = attrs.get("scheduled_date")
         dead_line = attrs.get("dead_line")
@@ -141,6 +272,8 @@ class TaskCreateSerializer(serializers.ModelSerializer):
 
 
 class TaskUpdateSerializer(serializers.ModelSerializer):
+    category = OwnedCategoryField(allow_null=True, required=False)
+
     class Meta:
         model = Task
         fields = [
@@ -155,18 +288,6 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
             "is_completed",
         ]
 
-    def validate_category(self, value):
-        if value is None:
-            return value
-
-        request = self.context.get("request")
-        if (
-            request
-            and not TaskCategory.objects.filter(title=value, user=request.user).exists()
-        ):
-            raise serializers.ValidationError({"detail": "The task category not found"})
-        return value
-
     def validate(self, attrs):
         scheduled_date = attrs.get("scheduled_date")
         dead_line = attrs.get("dead_line")
@@ -218,7 +339,8 @@ class TaggedItemSerializer(serializers.ModelSerializer):
 
 
 class FullTaskCreateSerializer(serializers.ModelSerializer):
-    tags = serializers.ListField(child=serializers.IntegerField(), required=False)
+    category = OwnedCategoryField(allow_null=True, required=False)
+    tags = OwnedTagListField(required=False)
     subTasks = SubTaskSerializer(many=True, required=False)
 
     class Meta:
@@ -242,27 +364,40 @@ class FullTaskCreateSerializer(serializers.ModelSerializer):
 
         request = self.context.get("request")
         user = request.user
+        owned_tags = OwnershipResolver.for_request(request).tags
 
         with transaction.atomic():
-            task = Task.objects.create(user=user, **validated_data)
+            task = Task.objects.create(
+                user=user,
+                tag_snapshot=snapshot_of(owned_tags[tag_id] for tag_id in tags),
+                **validated_data,
+            )
 
-            tagged_items = [TaggedItem(tag_id=tag_id, task=task) for tag_id in tags]
+            tagged_items = [
+                TaggedItem(tag=owned_tags[tag_id], task=task) for tag_id in tags
+            ]
 
             sub_tasks = [
-                SubTask(parent_task=task, **sub_task) for sub_task in sub_tasks
+                SubTask(
+                    parent_task=task,
+                    position=rank * SubTask.POSITION_GAP,
+                    **sub_task,
+                )
+                for rank, sub_task in enumerate(sub_tasks, start=1)
             ]
 
             TaggedItem.objects.bulk_create(tagged_items)
             SubTask.objects.bulk_create(sub_tasks)
 
+        # The response is built from these objects; see cache_written_relations.
+        cache_written_relations(task, sub_tasks, tagged_items)
         return task
 
 
 class OptimizedTaskUpdateSerializer(serializers.ModelSerializer):
-    tags = serializers.ListField(
-        child=serializers.IntegerField(), required=False, allow_empty=True
-    )
-    subTasks = SubTaskSerializer(many=True, required=False, allow_empty=True)
+    category = OwnedCategoryField(allow_null=True, required=False)
+    tags = OwnedTagListField(required=False, allow_empty=True)
+    subTasks = SubTaskUpdateSerializer(many=True, required=False, allow_empty=True)
 
     class Meta:
         model = Task
@@ -285,48 +420,63 @@ class OptimizedTaskUpdateSerializer(serializers.ModelSerializer):
         sub_tasks = validated_data.pop("subTasks", None)
 
         with transaction.atomic():
+            if tags is not None:
+                tagged_items = self._update_tags_optimized(instance, tags)
+                instance.tag_snapshot = snapshot_of(item.tag for item in tagged_items)
+            else:
+                tagged_items = list(instance.tagged_items.all())
 
             for attr, value in validated_data.items():
                 setattr(instance, attr, value)
             instance.save()
 
-            if tags is not None:
-                self._update_tags_optimized(instance, tags)
-
-            if sub_tasks is not None:
+            sub_tasks = (
                 self._update_subtasks_optimized(instance, sub_tasks)
+                if sub_tasks is not None
+                else list(instance.subTasks.all())
+            )
 
-        instance.refresh_from_db()
+        cache_written_relations(instance, sub_tasks, tagged_items)
         return instance
 
     def _update_tags_optimized(self, task, new_tags):
-        current_tags = set(
-            TaggedItem.objects.filter(task=task).values_list("tag_id", flat=True)
-        )
+        # Served from the view's prefetch cache when available.
+        current_items = {item.tag_id: item for item in task.tagged_items.all()}
         new_tags_set = set(new_tags)
 
-        tags_to_remove = current_tags - new_tags_set
+        tags_to_remove = current_items.keys() - new_tags_set
         if tags_to_remove:
-            TaggedItem.objects.filter(task=task, tag_id__in=tags_to_remove).delete()
+            delete_tagged_items(
+                TaggedItem.objects.filter(task=task, tag_id__in=tags_to_remove)
+            )
 
-        tags_to_add = new_tags_set - current_tags
-        if tags_to_add:
-            tagged_items = [
-                TaggedItem(tag_id=tag_id, task=task) for tag_id in tags_to_add
-            ]
+        owned_tags = OwnershipResolver.for_request(self.context["request"]).tags
+        tagged_items = [
+            TaggedItem(tag=owned_tags[tag_id], task=task)
+            for tag_id in new_tags
+            if tag_id not in current_items
+        ]
+        if tagged_items:
             TaggedItem.objects.bulk_create(tagged_items)
 
+        kept_items = [
+            item for tag_id, item in current_items.items() if tag_id in new_tags_set
+        ]
+        return kept_items + tagged_items
+
     def _update_subtasks_optimized(self, task, new_subtasks):
-        current_subtasks = {
-            st.id: st for st in SubTask.objects.filter(parent_task=task)
-        }
+        # Served from the view's prefetch cache when available.
+        current_subtasks = {st.id: st for st in task.subTasks.all()}
 
         subtasks_to_update = []
         subtasks_to_create = []
         updated_ids = set()
+        result = []
 
-        for subtask_data in new_subtasks:
+        # The submitted list order becomes the subtask order.
+        for rank, subtask_data in enumerate(new_subtasks, start=1):
             subtask_id = subtask_data.get("id")
+            position = rank * SubTask.POSITION_GAP
 
             if subtask_id and subtask_id in current_subtasks:
                 subtask_instance = current_subtasks[subtask_id]
@@ -336,23 +486,89 @@ class OptimizedTaskUpdateSerializer(serializers.ModelSerializer):
                 subtask_instance.is_completed = subtask_data.get(
                     "is_completed", subtask_instance.is_completed
                 )
+                subtask_instance.position = position
                 subtasks_to_update.append(subtask_instance)
                 updated_ids.add(subtask_id)
+                result.append(subtask_instance)
             else:
-                subtasks_to_create.append(
-                    SubTask(
-                        parent_task=task,
-                        title=subtask_data.get("title", ""),
-                        is_completed=subtask_data.get("is_completed", False),
-                    )
+                subtask_instance = SubTask(
+                    parent_task=task,
+                    title=subtask_data.get("title", ""),
+                    is_completed=subtask_data.get("is_completed", False),
+                    position=position,
                 )
+                subtasks_to_create.append(subtask_instance)
+                result.append(subtask_instance)
 
         subtasks_to_delete = set(current_subtasks.keys()) - updated_ids
         if subtasks_to_delete:
             SubTask.objects.filter(id__in=subtasks_to_delete).delete()
 
         if subtasks_to_update:
-            SubTask.objects.bulk_update(subtasks_to_update, ["title", "is_completed"])
+            SubTask.objects.bulk_update(
+                subtasks_to_update, ["title", "is_completed", "position"]
+            )
 
         if subtasks_to_create:
             SubTask.objects.bulk_create(subtasks_to_create)
+
+        return result
+
+
+class BulkTaggingSerializer(serializers.Serializer):
+    ACTION_ADD = "add"
+    ACTION_REMOVE = "remove"
+
+    task_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=1000
+    )
+    tag_ids = OwnedTagListField(allow_empty=False, max_length=100)
+    action = serializers.ChoiceField(choices=[ACTION_ADD, ACTION_REMOVE])
+
+    def validate_task_ids(self, value):
+        task_ids = list(dict.fromkeys(value))
+        user = self.context["request"].user
+        owned = set(
+            Task.objects.filter(user=user, id__in=task_ids).values_list("id", flat=True)
+        )
+        missing = [task_id for task_id in task_ids if task_id not in owned]
+        if missing:
+            raise serializers.ValidationError(f"Tasks not found: {missing}.")
+        return task_ids
+
+    def save(self):
+        task_ids = self.validated_data["task_ids"]
+        tag_ids = self.validated_data["tag_ids"]
+
+        with transaction.atomic():
+            if self.validated_data["action"] == self.ACTION_ADD:
+                # (tag, task) is unique, so already-tagged pairs are skipped.
+                TaggedItem.objects.bulk_create(
+                    [
+                        TaggedItem(task_id=task_id, tag_id=tag_id)
+                        for task_id in task_ids
+                        for tag_id in tag_ids
+                    ],
+                    ignore_conflicts=True,
+                )
+            else:
+                delete_tagged_items(
+                    TaggedItem.objects.filter(task_id__in=task_ids, tag_id__in=tag_ids)
+                )
+
+            snapshots = refresh_tag_snapshots(task_ids)
+            publish_change(self.context["request"].user.id, "task", UPDATED, task_ids)
+
+        return [{"id": task_id, "tags": snapshots[task_id]} for task_id in task_ids]
+
+
+class CalendarFeedSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CalendarFeed
+        fields = ["url", "token", "created_at"]
+
+    def get_url(self, obj):
+        path = reverse("calendar-feed-ics", args=[obj.token])
+        return self.context["request"].build_absolute_uri(path)
@@ -0,0 +1,50 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import Tag, TaggedItem, TaskCategory
+from .ownership import bump_data_version
+from .tag_snapshot import refresh_tag_snapshots
+
+
+@receiver([post_save, post_delete], sender=TaskCategory)
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_ownership(sender, instance, **kwargs):
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=TaggedItem)
+def add_to_tag_snapshot(sender, instance, created, **kwargs):
+    if created:
+        refresh_tag_snapshots([instance.task_id])
+
+
+@receiver(post_delete, sender=TaggedItem)
+def remove_from_tag_snapshot(sender, instance, origin=None, **kwargs):
+    # Queryset deletes (delete_tagged_items) refresh the snapshots themselves;
+    # cascades from a deleted Tag are handled once in refresh_after_tag_delete;
+    # cascades from a deleted Task or User leave nothing to update.
+    if isinstance(origin, TaggedItem):
+        refresh_tag_snapshots([instance.task_id])
+
+
+@receiver(post_save, sender=Tag)
+def refresh_after_tag_rename(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and "title" not in update_fields):
+        return
+    task_ids = TaggedItem.objects.filter(tag=instance).values_list("task_id", flat=True)
+    refresh_tag_snapshots(task_ids)
+
+
+@receiver(pre_delete, sender=Tag)
+def collect_tasks_before_tag_delete(sender, instance, **kwargs):
+    instance._snapshot_task_ids = list(
+        TaggedItem.objects.filter(tag=instance).values_list("task_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+def refresh_after_tag_delete(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Tag) or (
+        isinstance(origin, QuerySet) and origin.model is Tag
+    ):
+        refresh_tag_snapshots(getattr(instance, "_snapshot_task_ids", []))
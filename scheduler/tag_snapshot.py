@@ -0,0 +1,82 @@
+from .models import Task, TaggedItem
+
+# `Task.tag_snapshot` holds `{"id", "title"}` dicts ordered by tag id.
+# Single-object writes keep it current through the handlers in
+# scheduler.signals; bulk paths (bulk_create and delete_tagged_items) skip
+# them, so they write the snapshot themselves.
+
+
+def delete_tagged_items(queryset):
+    """
+    Delete `TaggedItem` rows without refreshing each task's snapshot per row.
+
+    The post_delete handler ignores rows deleted through a queryset, so the
+    cost is one select and one delete. The caller must update the affected
+    snapshots.
+    """
+    return queryset.delete()
+
+
+def snapshot_of(tags):
+    return sorted(({"id": tag.id, "title": tag.title} for tag in tags), key=_by_id)
+
+
+def _by_id(entry):
+    return entry["id"]
+
+
+def compute_snapshots(task_ids):
+    """Snapshots computed from `TaggedItem` for `task_ids`, in one query."""
+    snapshots = {task_id: [] for task_id in task_ids}
+    rows = TaggedItem.objects.filter(task_id__in=snapshots.keys()).values_list(
+        "task_id", "tag_id", "tag__title"
+    )
+    for task_id, tag_id, title in rows:
+        snapshots[task_id].append({"id": tag_id, "title": title})
+    for snapshot in snapshots.values():
+        snapshot.sort(key=_by_id)
+    return snapshots
+
+
+def refresh_tag_snapshots(task_ids, batch_size=500):
+    """
+    Rewrite the snapshots of `task_ids` from `TaggedItem` and return them as a
+    `{task_id: snapshot}` dict.
+    """
+    task_ids = list(set(task_ids))
+    refreshed = {}
+    for start in range(0, len(task_ids), batch_size):
+        snapshots = compute_snapshots(task_ids[start : start + batch_size])
+        refreshed.update(snapshots)
+        Task.objects.bulk_update(
+            [
+                Task(id=task_id, tag_snapshot=snapshot)
+                for task_id, snapshot in snapshots.items()
+            ],
+            ["tag_snapshot"],
+        )
+    return refreshed
+
+
+def find_stale_snapshots(queryset, batch_size=500):
+    """
+    Yield `(task_id, stored, expected)` for tasks in `queryset` whose snapshot
+    disagrees with `TaggedItem`.
+    """
+    batch = []
+    for task_id, stored in queryset.values_list("id", "tag_snapshot").iterator(
+        chunk_size=batch_size
+    ):
+        batch.append((task_id, stored))
+        if len(batch) == batch_size:
+            yield from _compare(batch)
+            batch = []
+    if batch:
+        yield from _compare(batch)
+
+
+def _compare(batch):
+    expected = compute_snapshots([task_id for task_id, _ in batch])
+    for task_id, stored in batch:
+        if stored != expected[task_id]:
+            yield task_id, stored, expected[task_id]
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from scheduler.archive import archive_batch, archive_cutoff
+from scheduler.models import (
+    ArchivedSubTask,
+    ArchivedTaggedItem,
+    ArchivedTask,
+    SubTask,
+    Tag,
+    TaggedItem,
+    Task,
+)
+from model_bakery import baker
+import pytest
+
+
+@pytest.fixture
+def old_tasks(authentication):
+    user = authentication()
+    long_ago = timezone.localdate() - timedelta(days=400)
+    done = baker.make(Task, user=user, is_completed=True, scheduled_date=long_ago)
+    open_task = baker.make(Task, user=user, is_completed=False, scheduled_date=long_ago)
+    recent = baker.make(Task, user=user, is_completed=True)
+    baker.make(SubTask, parent_task=done, _quantity=2)
+    tag = baker.make(Tag, user=user, title="Work")
+    baker.make(TaggedItem, task=done, tag=tag)
+    done.refresh_from_db()
+    return {"done": done, "open": open_task, "recent": recent, "tag": tag}
+
+
+@pytest.mark.django_db
+class TestArchive:
+    def test_moves_old_completed_tasks_with_relations(self, old_tasks):
+        done = old_tasks["done"]
+
+        moved = archive_batch(archive_cutoff(90))
+
+        assert moved == 1
+        assert not Task.objects.filter(id=done.id).exists()
+        assert set(Task.objects.values_list("id", flat=True)) == {
+            old_tasks["open"].id,
+            old_tasks["recent"].id,
+        }
+        archived = ArchivedTask.objects.get(id=done.id)
+        assert archived.title == done.title
+        assert archived.created_at == done.created_at
+        assert archived.tag_snapshot == done.tag_snapshot
+        assert ArchivedSubTask.objects.filter(parent_task=archived).count() == 2
+        assert ArchivedTaggedItem.objects.filter(task=archived).count() == 1
+        assert not SubTask.objects.filter(parent_task_id=done.id).exists()
+        assert not TaggedItem.objects.filter(task_id=done.id).exists()
+
+    def test_batch_queries_do_not_grow_with_rows(
+        self, authentication, django_assert_num_queries
+    ):
+        user = authentication()
+        long_ago = timezone.localdate() - timedelta(days=400)
+        tag = baker.make(Tag, user=user)
+        tasks = baker.make(
+            Task, user=user, is_completed=True, scheduled_date=long_ago, _quantity=40
+        )
+        for task in tasks:
+            baker.make(SubTask, parent_task=task)
+        TaggedItem.objects.bulk_create(TaggedItem(task=task, tag=tag) for task in tasks)
+
+        with django_assert_num_queries(15):
+            moved = archive_batch(archive_cutoff(90))
+
+        assert moved == 40
+
+    def test_command_batches_and_dry_run(self, old_tasks):
+        out = StringIO()
+
+        call_command("archive_tasks", "--dry-run", stdout=out)
+        assert "1 tasks" in out.getvalue()
+        assert ArchivedTask.objects.count() == 0
+
+        call_command("archive_tasks", "--batch-size=1", "--sleep=0", stdout=out)
+        assert ArchivedTask.objects.count() == 1
+
+    def test_archive_is_listed(self, old_tasks, api_client):
+        done = old_tasks["done"]
+        archive_batch(archive_cutoff(90))
+        params = {"scheduled_date": done.scheduled_date.isoformat()}
+
+        live = api_client.get("/api/schedule/tasks/", params)
+        both = api_client.get(
+            "/api/schedule/tasks/", {**params, "include_archived": "true"}
+        )
+        archive = api_client.get(
+            "/api/schedule/archived-tasks/", {"tags": old_tasks["tag"].id}
+        )
+
+        assert [task["id"] for task in live.data] == [old_tasks["open"].id]
+        assert {task["id"] for task in both.data} == {old_tasks["open"].id, done.id}
+        assert archive.status_code == status.HTTP_200_OK
+        assert [task["id"] for task in archive.data] == [done.id]
+        assert archive.data[0]["tags"] == [{"id": old_tasks["tag"].id, "title": "Work"}]
+        assert len(archive.data[0]["subTasks"]) == 2
@@ -0,0 +1,96 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from scheduler.models import Tag, Task, TaggedItem
+from model_bakery import baker
+import pytest
+
+URL = "/api/schedule/tasks/bulk-tags/"
+
+
+@pytest.fixture
+def owned(authentication):
+    user = authentication()
+    tasks = baker.make(Task, user=user, _quantity=3)
+    tags = baker.make(Tag, user=user, _quantity=2)
+    return tasks, tags
+
+
+def payload(tasks, tags, action):
+    return {
+        "task_ids": [task.id for task in tasks],
+        "tag_ids": [tag.id for tag in tags],
+        "action": action,
+    }
+
+
+@pytest.mark.django_db
+class TestBulkTagging:
+    def test_add_tags_to_many_tasks(self, owned, api_client):
+        tasks, tags = owned
+        baker.make(TaggedItem, task=tasks[0], tag=tags[0])
+
+        response = api_client.post(URL, payload(tasks, tags, "add"), format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert TaggedItem.objects.count() == len(tasks) * len(tags)
+        assert all(len(task["tags"]) == len(tags) for task in response.data)
+
+    def test_remove_tags_in_one_statement(self, owned, api_client):
+        tasks, tags = owned
+        for task in tasks:
+            for tag in tags:
+                baker.make(TaggedItem, task=task, tag=tag)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.post(
+                URL, payload(tasks, tags[:1], "remove"), format="json"
+            )
+
+        deletes = [q for q in ctx.captured_queries if q["sql"].startswith("DELETE")]
+        assert response.status_code == status.HTTP_200_OK
+        assert len(deletes) == 1
+        assert set(TaggedItem.objects.values_list("tag_id", flat=True)) == {tags[1].id}
+        task = Task.objects.get(id=tasks[0].id)
+        assert task.tag_snapshot == [{"id": tags[1].id, "title": tags[1].title}]
+
+    def test_remove_queries_do_not_grow_with_rows(
+        self, authentication, api_client, django_assert_num_queries
+    ):
+        user = authentication()
+        tasks = baker.make(Task, user=user, _quantity=30)
+        tags = baker.make(Tag, user=user, _quantity=3)
+        TaggedItem.objects.bulk_create(
+            TaggedItem(task=task, tag=tag) for task in tasks for tag in tags
+        )
+
+        # Ownership checks, collecting and deleting the rows, the snapshot
+        # refresh and its savepoint; no per-row tag lookups.
+        with django_assert_num_queries(8):
+            response = api_client.post(
+                URL, payload(tasks, tags, "remove"), format="json"
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not TaggedItem.objects.exists()
+
+    def test_other_users_tasks_are_rejected(self, owned, api_client):
+        _, tags = owned
+        foreign_task = baker.make(Task)
+
+        response = api_client.post(
+            URL, payload([foreign_task], tags, "add"), format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not TaggedItem.objects.exists()
+
+    def test_other_users_tags_are_rejected(self, owned, api_client):
+        tasks, _ = owned
+        foreign_tag = baker.make(Tag)
+
+        response = api_client.post(
+            URL, payload(tasks, [foreign_tag], "add"), format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,119 @@
+from datetime import date, time
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from scheduler.archive import archive_batch, archive_cutoff
+from scheduler.ics import fold
+from scheduler.models import CalendarFeed, Task
+from model_bakery import baker
+import pytest
+
+
+@pytest.fixture
+def feed(authentication, api_client):
+    user = authentication()
+    baker.make(
+        Task,
+        user=user,
+        title="Standup, daily",
+        scheduled_date=date(2030, 1, 6),
+        start_time=time(9, 30),
+        end_time=time(9, 45),
+    )
+    baker.make(
+        Task,
+        user=user,
+        title="Report",
+        scheduled_date=date(2030, 1, 7),
+        dead_line=date(2030, 1, 9),
+    )
+    response = api_client.post("/api/schedule/calendar-feed/")
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.data
+
+
+def body(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestCalendarFeed:
+    def test_feed_contains_timed_all_day_and_deadline_events(self, feed, client):
+        response = client.get(feed["url"])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"].startswith("text/calendar")
+        content = body(response)
+        assert content.startswith("BEGIN:VCALENDAR\r\n")
+        assert "SUMMARY:Standup\\, daily\r\n" in content
+        assert "DTSTART:20300106T093000\r\nDTEND:20300106T094500\r\n" in content
+        assert "DTSTART;VALUE=DATE:20300107\r\n" in content
+        assert "SUMMARY:Deadline: Report\r\n" in content
+        assert content.count("BEGIN:VEVENT") == 3
+
+    def test_unchanged_feed_is_not_modified(self, feed, client):
+        first = client.get(feed["url"])
+        body(first)
+        # The query log is reset per request; start from empty so the
+        # captured slice lines up.
+        reset_queries()
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = client.get(feed["url"], HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert again["ETag"] == first["ETag"]
+        assert len(ctx.captured_queries) == 1
+
+        since = client.get(feed["url"], HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        assert since.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_changes_and_deletes_change_the_etag(self, feed, client):
+        etag = client.get(feed["url"])["ETag"]
+        task = Task.objects.get(title="Report")
+
+        task.title = "Final report"
+        task.save()
+        edited = client.get(feed["url"], HTTP_IF_NONE_MATCH=etag)
+        Task.objects.filter(title="Standup, daily").delete()
+        deleted = client.get(feed["url"], HTTP_IF_NONE_MATCH=edited["ETag"])
+
+        assert edited.status_code == status.HTTP_200_OK
+        assert "Final report" in body(edited)
+        assert deleted.status_code == status.HTTP_200_OK
+
+    def test_archived_tasks_stay_in_the_feed(self, feed, client):
+        etag = client.get(feed["url"])["ETag"]
+        Task.objects.update(is_completed=True)
+
+        archive_batch(archive_cutoff(horizon_days=-3650))
+        response = client.get(feed["url"], HTTP_IF_NONE_MATCH=etag)
+
+        content = body(response)
+        assert not Task.objects.exists()
+        assert response.status_code == status.HTTP_200_OK
+        assert content.index("Standup\\, daily") < content.index("SUMMARY:Report")
+        assert "Deadline: Report" in content
+
+    def test_rotating_the_token_disables_the_old_url(self, feed, api_client, client):
+        api_client.post("/api/schedule/calendar-feed/")
+
+        assert client.get(feed["url"]).status_code == status.HTTP_404_NOT_FOUND
+        new = api_client.get("/api/schedule/calendar-feed/").data
+        assert client.get(new["url"]).status_code == status.HTTP_200_OK
+
+    def test_delete_feed(self, feed, api_client):
+        response = api_client.delete("/api/schedule/calendar-feed/")
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not CalendarFeed.objects.exists()
+
+
+def test_fold_long_lines():
+    line = "DESCRIPTION:" + "é" * 80
+
+    folded = fold(line)
+
+    parts = folded.rstrip("\r\n").split("\r\n ")
+    assert all(len(part.encode()) <= 75 for part in parts)
+    assert "".join(parts) == line
@@ -0,0 +1,152 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from scheduler.models import SubTask, Task
+from model_bakery import baker
+import pytest
+
+
+def url(task, suffix=""):
+    return f"/api/schedule/tasks/{task.id}/sub-tasks/{suffix}"
+
+
+@pytest.fixture
+def task_with_subtasks(authentication):
+    user = authentication()
+    task = baker.make(Task, user=user)
+    subtasks = [
+        SubTask.objects.create(
+            parent_task=task,
+            title=f"step {i}",
+            position=SubTask.objects.next_position(task.id),
+        )
+        for i in range(4)
+    ]
+    return task, subtasks
+
+
+def titles(task):
+    return [subtask.title for subtask in SubTask.objects.filter(parent_task=task)]
+
+
+@pytest.mark.django_db
+class TestSubTaskOrder:
+    def test_new_subtasks_are_appended(self, task_with_subtasks, api_client):
+        task, _ = task_with_subtasks
+
+        response = api_client.post(url(task), {"title": "last"})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert titles(task)[-1] == "last"
+
+    def test_reorder_in_one_update(self, task_with_subtasks, api_client):
+        task, subtasks = task_with_subtasks
+        order = [subtask.id for subtask in reversed(subtasks)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.post(url(task, "reorder/"), {"order": order})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert titles(task) == ["step 3", "step 2", "step 1", "step 0"]
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        assert len(updates) == 1
+
+    def test_reorder_must_list_every_subtask(self, task_with_subtasks, api_client):
+        task, subtasks = task_with_subtasks
+
+        response = api_client.post(
+            url(task, "reorder/"), {"order": [subtasks[0].id]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_reorder_other_users_task(self, task_with_subtasks, api_client):
+        other_task = baker.make(Task)
+        subtask = baker.make(SubTask, parent_task=other_task)
+
+        response = api_client.post(
+            url(other_task, "reorder/"), {"order": [subtask.id]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_toggle_many(self, task_with_subtasks, api_client):
+        task, subtasks = task_with_subtasks
+        items = [{"id": subtask.id, "is_completed": True} for subtask in subtasks[:2]]
+
+        response = api_client.patch(
+            url(task, "toggle/"), {"items": items}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        completed = SubTask.objects.filter(parent_task=task, is_completed=True)
+        assert {subtask.id for subtask in completed} == {s.id for s in subtasks[:2]}
+
+    def test_toggle_rejects_foreign_subtasks(self, task_with_subtasks, api_client):
+        task, _ = task_with_subtasks
+        foreign = baker.make(SubTask)
+
+        response = api_client.patch(
+            url(task, "toggle/"),
+            {"items": [{"id": foreign.id, "is_completed": True}]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        foreign.refresh_from_db()
+        assert not foreign.is_completed
+
+    def test_move_writes_one_row(self, task_with_subtasks, api_client):
+        task, subtasks = task_with_subtasks
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.post(
+                url(task, f"{subtasks[3].id}/move/"),
+                {"after": subtasks[0].id},
+                format="json",
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert titles(task) == ["step 0", "step 3", "step 1", "step 2"]
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        assert len(updates) == 1
+
+    def test_move_to_front(self, task_with_subtasks, api_client):
+        task, subtasks = task_with_subtasks
+
+        response = api_client.post(
+            url(task, f"{subtasks[2].id}/move/"), {"after": None}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert titles(task) == ["step 2", "step 0", "step 1", "step 3"]
+
+    def test_move_respaces_when_out_of_gaps(self, task_with_subtasks, api_client):
+        task, subtasks = task_with_subtasks
+        SubTask.objects.filter(parent_task=task).update(position=0)
+
+        response = api_client.post(
+            url(task, f"{subtasks[3].id}/move/"),
+            {"after": subtasks[1].id},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert titles(task) == ["step 0", "step 1", "step 3", "step 2"]
+
+    def test_full_update_keeps_submitted_order(self, task_with_subtasks, api_client):
+        task, subtasks = task_with_subtasks
+        payload = {
+            "subTasks": [
+                {"id": subtasks[1].id, "title": "step 1"},
+                {"title": "new"},
+                {"id": subtasks[0].id, "title": "step 0"},
+            ]
+        }
+
+        response = api_client.patch(
+            f"/api/schedule/tasks/{task.id}/update/", payload, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert titles(task) == ["step 1", "new", "step 0"]
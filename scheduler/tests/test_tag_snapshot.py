@@ -0,0 +1,81 @@
+from io import StringIO
+from django.core.management import call_command
+from rest_framework import status
+from scheduler.models import Tag, Task, TaggedItem
+from model_bakery import baker
+import pytest
+
+
+@pytest.fixture
+def task_with_tag(authentication):
+    user = authentication()
+    task = baker.make(Task, user=user)
+    tag = baker.make(Tag, user=user, title="Work")
+    return task, tag
+
+
+def snapshot(task):
+    task.refresh_from_db()
+    return task.tag_snapshot
+
+
+@pytest.mark.django_db
+class TestTagSnapshot:
+    def test_tagging_and_untagging_update_snapshot(self, task_with_tag, api_client):
+        task, tag = task_with_tag
+
+        response = api_client.post(
+            f"/api/schedule/tags/{tag.id}/tagged-items/", {"task_id": task.id}
+        )
+        after_tagging = snapshot(task)
+        api_client.delete(
+            f"/api/schedule/tags/{tag.id}/tagged-items/{response.data['id']}/"
+        )
+
+        assert after_tagging == [{"id": tag.id, "title": "Work"}]
+        assert snapshot(task) == []
+
+    def test_tag_rename_and_delete_update_snapshot(self, task_with_tag, api_client):
+        task, tag = task_with_tag
+        baker.make(TaggedItem, task=task, tag=tag)
+
+        api_client.put(f"/api/schedule/tags/{tag.id}/", {"title": "home"})
+        after_rename = snapshot(task)
+        api_client.delete(f"/api/schedule/tags/{tag.id}/")
+
+        assert after_rename == [{"id": tag.id, "title": "Home"}]
+        assert snapshot(task) == []
+
+    def test_bulk_update_path_writes_snapshot(self, task_with_tag, api_client):
+        task, tag = task_with_tag
+        other = baker.make(Tag, user=task.user, title="Other")
+        baker.make(TaggedItem, task=task, tag=other)
+
+        api_client.patch(
+            f"/api/schedule/tasks/{task.id}/update/", {"tags": [tag.id]}, format="json"
+        )
+
+        assert snapshot(task) == [{"id": tag.id, "title": "Work"}]
+
+    def test_task_list_reads_tags_without_tagged_item_query(
+        self, task_with_tag, api_client, django_assert_num_queries
+    ):
+        task, tag = task_with_tag
+        baker.make(TaggedItem, task=task, tag=tag)
+
+        # Tasks and their subtasks.
+        with django_assert_num_queries(2):
+            response = api_client.get("/api/schedule/tasks/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["tags"] == [{"id": tag.id, "title": "Work"}]
+
+    def test_checker_repairs_stale_snapshots(self, task_with_tag):
+        task, tag = task_with_tag
+        TaggedItem.objects.bulk_create([TaggedItem(task=task, tag=tag)])
+
+        out = StringIO()
+        call_command("check_tag_snapshots", "--fix", stdout=out)
+
+        assert "Repaired 1 tasks." in out.getvalue()
+        assert snapshot(task) == [{"id": tag.id, "title": "Work"}]
@@ -0,0 +1,67 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework import status
+from scheduler.models import Tag, Task, TaggedItem
+from model_bakery import baker
+import pytest
+
+
+@pytest.fixture
+def tagged_tasks(authentication):
+    user = authentication()
+    red, green, blue = baker.make(Tag, user=user, _quantity=3)
+    both = baker.make(Task, user=user)
+    only_red = baker.make(Task, user=user)
+    untagged = baker.make(Task, user=user)
+    for tag in (red, green):
+        baker.make(TaggedItem, task=both, tag=tag)
+    baker.make(TaggedItem, task=only_red, tag=red)
+    return {
+        "tags": (red, green, blue),
+        "tasks": {"both": both, "only_red": only_red, "untagged": untagged},
+    }
+
+
+def fetched_ids(response):
+    return sorted(task["id"] for task in response.data)
+
+
+@pytest.mark.django_db
+class TestTaskTagFilters:
+    def test_any_mode_returns_each_task_once(self, tagged_tasks, api_client):
+        red, green, _ = tagged_tasks["tags"]
+        tasks = tagged_tasks["tasks"]
+
+        response = api_client.get(f"/api/schedule/tasks/?tags={red.id},{green.id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert fetched_ids(response) == sorted([tasks["both"].id, tasks["only_red"].id])
+
+    def test_all_mode_requires_every_tag(self, tagged_tasks, api_client):
+        red, green, _ = tagged_tasks["tags"]
+
+        response = api_client.get(
+            f"/api/schedule/tasks/?tags={red.id},{green.id}&tags_mode=all"
+        )
+
+        assert fetched_ids(response) == [tagged_tasks["tasks"]["both"].id]
+
+    def test_exclude_tags(self, tagged_tasks, api_client):
+        red, _, _ = tagged_tasks["tags"]
+
+        response = api_client.get(f"/api/schedule/tasks/?exclude_tags={red.id}")
+
+        assert fetched_ids(response) == [tagged_tasks["tasks"]["untagged"].id]
+
+    def test_invalid_mode_returns_400(self, tagged_tasks, api_client):
+        red, _, _ = tagged_tasks["tags"]
+
+        response = api_client.get(f"/api/schedule/tasks/?tags={red.id}&tags_mode=some")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize("arguments", [["--repeat=0"], ["--query-tags=300"]])
+def test_benchmark_rejects_bad_arguments(arguments):
+    with pytest.raises(CommandError):
+        call_command("benchmark_tag_filters", *arguments)
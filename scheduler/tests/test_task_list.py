@@ -0,0 +1,61 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from scheduler.models import SubTask, Task
+from model_bakery import baker
+import pytest
+
+URL = "/api/schedule/tasks/"
+
+
+@pytest.fixture
+def checklist(authentication):
+    user = authentication()
+    task = baker.make(Task, user=user)
+    baker.make(SubTask, parent_task=task, is_completed=True, _quantity=3)
+    baker.make(SubTask, parent_task=task, is_completed=False, _quantity=4)
+    empty = baker.make(Task, user=user)
+    return task, empty
+
+
+def by_id(response):
+    return {task["id"]: task for task in response.data}
+
+
+@pytest.mark.django_db
+class TestTaskListProgress:
+    def test_full_list_counts_subtasks(self, checklist, api_client):
+        task, empty = checklist
+
+        response = api_client.get(URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        tasks = by_id(response)
+        assert len(tasks[task.id]["subTasks"]) == 7
+        assert tasks[task.id]["subtasks_total"] == 7
+        assert tasks[task.id]["subtasks_done"] == 3
+        assert tasks[empty.id]["subtasks_total"] == 0
+
+    def test_compact_list_skips_subtask_rows(self, checklist, api_client):
+        task, empty = checklist
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(URL, {"compact": "true"})
+
+        assert response.status_code == status.HTTP_200_OK
+        tasks = by_id(response)
+        assert "subTasks" not in tasks[task.id]
+        assert tasks[task.id]["subtasks_total"] == 7
+        assert tasks[task.id]["subtasks_done"] == 3
+        assert tasks[empty.id]["subtasks_done"] == 0
+        assert not any(
+            'FROM "scheduler_subtask"' in query["sql"] for query in ctx.captured_queries
+        )
+
+    def test_retrieve_counts_subtasks(self, checklist, api_client):
+        task, _ = checklist
+
+        response = api_client.get(f"{URL}{task.id}/", {"compact": "true"})
+
+        assert response.data["subtasks_total"] == 7
+        assert len(response.data["subTasks"]) == 7
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from scheduler.models import SubTask, Tag, TaskCategory, Task, TaggedItem
+from model_bakery import baker
+import pytest
+
+User = get_user_model()
+
+
+def selects_from(queries, table):
+    return [
+        q
+        for q in queries
+        if q["sql"].startswith("SELECT") and f'FROM "{table}"' in q["sql"]
+    ]
+
+
+@pytest.mark.django_db
+class TestTaskWriteOwnership:
+    def test_full_create_rejects_other_users_tags(self, authentication, api_client):
+        authentication()
+        foreign_tag = baker.make(Tag)
+
+        response = api_client.post(
+            "/api/schedule/tasks/full-create/",
+            {"title": "Task", "tags": [foreign_tag.id]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "tags" in response.data
+        assert not TaggedItem.objects.exists()
+
+    def test_update_rejects_other_users_tags(self, authentication, api_client):
+        user = authentication()
+        task = baker.make(Task, user=user)
+        foreign_tag = baker.make(Tag)
+
+        response = api_client.patch(
+            f"/api/schedule/tasks/{task.id}/update/",
+            {"tags": [foreign_tag.id]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_update_rejects_other_users_category(self, authentication, api_client):
+        user = authentication()
+        task = baker.make(Task, user=user)
+        foreign_category = baker.make(TaskCategory)
+
+        response = api_client.patch(
+            f"/api/schedule/tasks/{task.id}/",
+            {"category": foreign_category.id},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_validation_reads_each_model_once(self, authentication, api_client):
+        user = authentication()
+        category = baker.make(TaskCategory, user=user)
+        tags = baker.make(Tag, user=user, _quantity=5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.post(
+                "/api/schedule/tasks/full-create/",
+                {
+                    "title": "Task",
+                    "scheduled_date": "2030-01-01",
+                    "category": category.id,
+                    "tags": [tag.id for tag in tags],
+                },
+                format="json",
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(selects_from(ctx.captured_queries, "scheduler_taskcategory")) == 1
+        assert len(selects_from(ctx.captured_queries, "scheduler_tag")) <= 1
+
+
+@pytest.mark.django_db
+class TestTaskWriteResponses:
+    def test_full_create_response_is_built_without_reads(
+        self, authentication, api_client
+    ):
+        user = authentication()
+        tag = baker.make(Tag, user=user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.post(
+                "/api/schedule/tasks/full-create/",
+                {
+                    "title": "Task",
+                    "tags": [tag.id],
+                    "subTasks": [{"title": "one"}, {"title": "two"}],
+                },
+                format="json",
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [st["title"] for st in response.data["subTasks"]] == ["one", "two"]
+        assert all(st["id"] for st in response.data["subTasks"])
+        assert response.data["tags"] == [{"id": tag.id, "title": tag.title}]
+        assert not selects_from(ctx.captured_queries, "scheduler_subtask")
+        assert not selects_from(ctx.captured_queries, "scheduler_taggeditem")
+
+    def test_update_keeps_subtask_ids_and_skips_refetch(
+        self, authentication, api_client
+    ):
+        user = authentication()
+        task = baker.make(Task, user=user)
+        kept, dropped = baker.make(SubTask, parent_task=task, _quantity=2)
+        old_tag, new_tag = baker.make(Tag, user=user, _quantity=2)
+        baker.make(TaggedItem, task=task, tag=old_tag)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.patch(
+                f"/api/schedule/tasks/{task.id}/update/",
+                {
+                    "title": "Renamed",
+                    "tags": [new_tag.id],
+                    "subTasks": [
+                        {"id": kept.id, "title": kept.title, "is_completed": True},
+                        {"title": "new"},
+                    ],
+                },
+                format="json",
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["title"] == "Renamed"
+        assert response.data["subTasks"][0] == {
+            "id": kept.id,
+            "title": kept.title,
+            "is_completed": True,
+        }
+        assert response.data["subTasks"][1]["title"] == "new"
+        assert response.data["tags"] == [{"id": new_tag.id, "title": new_tag.title}]
+        assert not SubTask.objects.filter(id=dropped.id).exists()
+        # One prefetch read of each relation, none after the writes; the second
+        # tagged item read is QuerySet.delete() collecting the removed rows.
+        assert len(selects_from(ctx.captured_queries, "scheduler_subtask")) == 1
+        assert len(selects_from(ctx.captured_queries, "scheduler_taggeditem")) == 2
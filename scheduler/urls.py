@@ -7,6 +7,7 @@ router = routers.DefaultRouter()
 
 router.register("categories", views.TaskCategoryViewSet, basename="category")
 router.register("tasks", views.TaskViewSet, basename="task")
+router.register("archived-tasks", views.ArchivedTaskViewSet, basename="archived-task")
 router.register("tags", views.TagViewSet, basename="tag")
 
 tasks_router = routers.NestedDefaultRouter(router, "tasks", lookup="task")
@@ -19,7 +20,10 @@ taggedItems_router.register(
 
 urlpatterns = [
     path("tasks/full-create/", views.FullTaskCreateView.as_view()),
+    path("tasks/bulk-tags/", views.BulkTaggingView.as_view()),
     path("tasks/<int:pk>/update/", views.OptimizedTaskUpdateView.as_view()),
+    path("calendar-feed/", views.CalendarFeedView.as_view()),
+    path("calendar/<str:token>.ics", views.calendar_feed, name="calendar-feed-ics"),
     path("", include(router.urls)),
     path("", include(tasks_router.urls)),
     path("", include(taggedItems_router.urls)),
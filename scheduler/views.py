@@ -1,26 +1,55 @@
 from datetime import date, timedelta
+from heapq import merge
+from django.conf import settings
+from django.http import Http404, HttpResponseNotAllowed, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.db.models.aggregates import Count
-from django.db.models import Prefetch, Q
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Max, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.generics import CreateAPIView, UpdateAPIView
+from rest_framework.generics import CreateAPIView, GenericAPIView, UpdateAPIView
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 from rest_framework.response import Response
 from rest_framework import status
-from .filters import TaskFilter
-from .models import Tag, Task, TaskCategory, SubTask, TaggedItem
+from core.authentication import StatelessJWTAuthentication
+from realtime.events import DELETED, UPDATED, publish_change
+from .filters import ArchivedTaskFilter, TaskFilter
+from .ics import aiterate, render_calendar
+from .models import (
+    ArchivedTask,
+    ArchivedTaggedItem,
+    CalendarFeed,
+    Tag,
+    Task,
+    TaskCategory,
+    SubTask,
+    TaggedItem,
+    new_feed_token,
+)
 from .permissions import IsAuthenticatedAndOwner
 from .serializers import (
+    ArchivedTaskListSerializer,
+    ArchivedTaskSerializer,
     TaskCategorySerializer,
     TaskSerializer,
+    TaskListSerializer,
     TaskCreateSerializer,
     TaskUpdateSerializer,
     SubTaskSerializer,
+    SubTaskMoveSerializer,
+    SubTaskReorderSerializer,
+    SubTaskToggleSerializer,
     TagSerializer,
     TaggedItemSerializer,
     FullTaskCreateSerializer,
     OptimizedTaskUpdateSerializer,
+    BulkTaggingSerializer,
+    CalendarFeedSerializer,
 )
 
 
@@ -36,28 +65,45 @@ class TaskCategoryViewSet(ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class TaskViewSet(ModelViewSet):
-    permission_classes = [IsAuthenticatedAndOwner]
-    filter_backends = [DjangoFilterBackend]
-    filterset_class = TaskFilter
+class TaskQuerysetMixin:
+    def is_compact(self):
+        """`?compact=true` lists tasks with subtask counts but no subtask bodies."""
+        compact = self.request.query_params.get("compact", "")
+        return self.action == "list" and compact.lower() in ("1", "true")
 
-    def get_queryset(self):
+    def build_queryset(self, model, tagged_item_model):
+        """The user's tasks from `model` (live or archived) with their relations."""
         user = self.request.user
-        queryset = (
-            Task.objects.filter(user=user)
-            .select_related("category")
-            .prefetch_related(
-                "subTasks",
+        queryset = model.objects.filter(user=user).select_related("category")
+        if self.is_compact():
+            queryset = queryset.annotate(
+                subtasks_total=Count("subTasks"),
+                subtasks_done=Count("subTasks", filter=Q(subTasks__is_completed=True)),
+            )
+        else:
+            queryset = queryset.prefetch_related("subTasks")
+        if not settings.TASK_TAG_SNAPSHOT:
+            queryset = queryset.prefetch_related(
                 Prefetch(
                     "tagged_items",
-                    queryset=TaggedItem.objects.select_related("tag").filter(
+                    queryset=tagged_item_model.objects.select_related("tag").filter(
                         tag__user=user
                     ),
                     to_attr="prefetched_tagged_items",
                 ),
             )
-        )
+        return queryset
+
 
+class TaskViewSet(TaskQuerysetMixin, ModelViewSet):
+    permission_classes = [IsAuthenticatedAndOwner]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TaskFilter
+
+    def get_queryset(self):
+        return self.default_window(self.build_queryset(Task, TaggedItem))
+
+    def default_window(self, queryset):
         date_param = self.request.query_params.get("scheduled_date")
         if self.action == "list" and not date_param:
             # this will return the tasks for today, tommorow(for upcomming tasks),
@@ -74,11 +120,38 @@ class TaskViewSet(ModelViewSet):
 
         return queryset
 
+    def include_archived(self):
+        include = self.request.query_params.get("include_archived", "")
+        return include.lower() in ("1", "true")
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if self.include_archived():
+            # Same filters over the archive tables, appended after the live tasks.
+            queryset = self.default_window(
+                self.build_queryset(ArchivedTask, ArchivedTaggedItem)
+            )
+            archived = ArchivedTaskFilter(
+                request.query_params, queryset=queryset, request=request
+            ).qs
+            serializer_class = (
+                ArchivedTaskListSerializer
+                if self.is_compact()
+                else ArchivedTaskSerializer
+            )
+            serializer = serializer_class(
+                archived, many=True, context=self.get_serializer_context()
+            )
+            response.data = [*response.data, *serializer.data]
+        return response
+
     def get_serializer_class(self):
         if self.request.method == "POST":
             return TaskCreateSerializer
         if self.request.method in ("PUT", "PATCH"):
             return TaskUpdateSerializer
+        if self.is_compact():
+            return TaskListSerializer
         return TaskSerializer
 
     def perform_create(self, serializer):
@@ -90,6 +163,21 @@ class TaskViewSet(ModelViewSet):
         return context
 
 
+class ArchivedTaskViewSet(TaskQuerysetMixin, ReadOnlyModelViewSet):
+    permission_classes = [IsAuthenticatedAndOwner]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ArchivedTaskFilter
+
+    def get_queryset(self):
+        queryset = self.build_queryset(ArchivedTask, ArchivedTaggedItem)
+        return queryset.order_by("-scheduled_date", "-id")
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return ArchivedTaskListSerializer
+        return ArchivedTaskSerializer
+
+
 class SubTaskViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = SubTaskSerializer
@@ -104,8 +192,67 @@ class SubTaskViewSet(ModelViewSet):
     def get_serializer_context(self):
         return {"task_pk": self.kwargs["task_pk"]}
 
+    def publish(self, action, subtask_ids):
+        publish_change(
+            self.request.user.id,
+            "subtask",
+            action,
+            subtask_ids,
+            task_id=int(self.kwargs["task_pk"]),
+        )
+
+    def perform_destroy(self, instance):
+        # SubTask has no post_delete receiver (see realtime.signals).
+        subtask_id = instance.id
+        instance.delete()
+        self.publish(DELETED, [subtask_id])
+
+    def get_subtask_ids(self):
+        """Ids of the task's subtasks, with the ownership check in the same query."""
+        subtask_ids = set(
+            SubTask.objects.filter(
+                parent_task_id=self.kwargs["task_pk"],
+                parent_task__user=self.request.user,
+            ).values_list("id", flat=True)
+        )
+        if not subtask_ids:
+            get_object_or_404(Task, pk=self.kwargs["task_pk"], user=self.request.user)
+        return subtask_ids
+
+    @action(detail=False, methods=["post"])
+    def reorder(self, request, task_pk=None):
+        serializer = SubTaskReorderSerializer(
+            data=request.data, context={"subtask_ids": self.get_subtask_ids()}
+        )
+        serializer.is_valid(raise_exception=True)
+        subtasks = serializer.save()
+        self.publish(UPDATED, [subtask.id for subtask in subtasks])
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["patch"])
+    def toggle(self, request, task_pk=None):
+        serializer = SubTaskToggleSerializer(
+            data=request.data, context={"subtask_ids": self.get_subtask_ids()}
+        )
+        serializer.is_valid(raise_exception=True)
+        subtasks = serializer.save()
+        self.publish(UPDATED, [subtask.id for subtask in subtasks])
+        return Response(serializer.data)
+
+    @action(detail=True, methods=["post"])
+    def move(self, request, task_pk=None, pk=None):
+        subtask = self.get_object()
+        serializer = SubTaskMoveSerializer(
+            data=request.data, context={"subtask": subtask}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.publish(UPDATED, [subtask.id])
+        return Response(SubTaskSerializer(subtask).data)
+
 
 class TagViewSet(ModelViewSet):
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticatedAndOwner]
     serializer_class = TagSerializer
 
@@ -180,3 +327,109 @@ class OptimizedTaskUpdateView(UpdateAPIView):
     def patch(self, request, *args, **kwargs):
         kwargs["partial"] = True
         return self.update(request, *args, **kwargs)
+
+
+class BulkTaggingView(GenericAPIView):
+    """Add tags to, or remove them from, many tasks in one request."""
+
+    serializer_class = BulkTaggingSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tasks = serializer.save()
+
+        return Response(tasks, status=status.HTTP_200_OK)
+
+
+class CalendarFeedView(GenericAPIView):
+    """
+    The user's calendar feed URL. POST creates it or rotates its token,
+    DELETE turns the feed off.
+    """
+
+    serializer_class = CalendarFeedSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        feed = get_object_or_404(CalendarFeed, user=request.user)
+        return Response(self.get_serializer(feed).data)
+
+    def post(self, request, *args, **kwargs):
+        feed, _ = CalendarFeed.objects.update_or_create(
+            user=request.user, defaults={"token": new_feed_token()}
+        )
+        return Response(self.get_serializer(feed).data, status=status.HTTP_201_CREATED)
+
+    def delete(self, request, *args, **kwargs):
+        CalendarFeed.objects.filter(user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def calendar_feed(request, token):
+    """
+    The iCalendar feed for the user owning `token`.
+
+    The feed includes archived tasks. Feed readers poll often, so the token
+    lookup and the count and newest change of the user's live and archived
+    tasks come from a single aggregate query and make up the ETag and
+    Last-Modified validators; an unchanged feed is a 304 without touching
+    the tasks themselves. A changed feed is streamed from server-side
+    cursors over both tables, merged in date order.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+
+    live = Task.objects.filter(user=OuterRef("user")).values("user")
+    archived = ArchivedTask.objects.filter(user=OuterRef("user")).values("user")
+    feed = (
+        CalendarFeed.objects.filter(token=token)
+        .annotate(
+            task_count=Coalesce(Subquery(live.annotate(n=Count("id")).values("n")), 0),
+            last_modified=Subquery(live.annotate(at=Max("updated_at")).values("at")),
+            archived_count=Coalesce(
+                Subquery(archived.annotate(n=Count("id")).values("n")), 0
+            ),
+            # Archiving a task changes which table it is read from.
+            archived_modified=Subquery(
+                archived.annotate(at=Max("archived_at")).values("at")
+            ),
+        )
+        .first()
+    )
+    if feed is None:
+        raise Http404
+
+    last_modified = max(
+        filter(None, (feed.last_modified, feed.archived_modified)),
+        default=feed.created_at,
+    )
+    etag = quote_etag(
+        f"{feed.task_count}-{feed.archived_count}-{last_modified.timestamp():.6f}"
+    )
+    last_modified = int(last_modified.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        tasks = merge(
+            *(
+                model.objects.filter(user_id=feed.user_id)
+                .order_by("scheduled_date", "id")
+                .iterator(chunk_size=500)
+                for model in (Task, ArchivedTask)
+            ),
+            key=lambda task: (task.scheduled_date, task.id),
+        )
+        chunks = render_calendar(tasks, request.get_host())
+        if isinstance(request, ASGIRequest):
+            chunks = aiterate(chunks)
+        response = StreamingHttpResponse(
+            chunks, content_type="text/calendar; charset=utf-8"
+        )
+        response["Content-Disposition"] = 'inline; filename="tasks.ics"'
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=300)
+    return response